@@ -2,7 +2,14 @@
 Question Bank Agent - Agent #12
 Assigns daily problems based on interview frequency and skill level.
 """
-from app.services.openai_service import get_daily_problem
+from datetime import date
+from typing import Optional
+
+from app.services.openai_service import explain_daily_problem
+from app.services.problem_catalog import get_problem_catalog
+
+# Score a completed catalog problem contributes to recent performance
+COMPLETION_SCORES = {"Easy": 60, "Medium": 80, "Hard": 100}
 
 
 class QuestionBankAgent:
@@ -29,7 +36,7 @@ class QuestionBankAgent:
         Returns:
             Problem assignment with reasoning
         """
-        problem = await get_daily_problem(profile, target_role)
+        problem = await self.recommend_daily_problem(profile, target_role)
         
         return {
             "agent": self.name,
@@ -38,6 +45,89 @@ class QuestionBankAgent:
             "data": problem,
         }
     
+    async def recommend_daily_problem(
+        self,
+        profile: dict,
+        target_role: str,
+        completed_problems: Optional[list] = None,
+        explain: bool = True,
+    ) -> dict:
+        """
+        Pick today's problem from the local catalog (skill gaps, completed
+        problems and adaptive difficulty). Only the personalised reason is
+        written by the LLM, and only when `explain` is set.
+        """
+        catalog = get_problem_catalog()
+        completed = completed_problems or []
+        skill_gaps = profile.get("skillGaps", [])
+        
+        difficulty = self.calculate_next_difficulty(
+            profile.get("recentPerformance") or self._performance_from_completed(completed)
+        )
+        problem = catalog.recommend(
+            difficulty,
+            skill_gaps=skill_gaps,
+            completed=completed,
+            companies=profile.get("targetCompanies", []),
+        )
+        if problem is None:
+            return {}
+        
+        daily = self._format_daily_problem(problem, difficulty, skill_gaps, completed)
+        if explain:
+            reason = await explain_daily_problem(problem, skill_gaps, target_role)
+            if reason:
+                daily["reason"] = reason
+        return daily
+    
+    def _performance_from_completed(self, completed: list, window: int = 5) -> list:
+        """
+        Recent performance when no scores are recorded: each of the last few
+        completed catalog problems counts by its difficulty.
+        """
+        catalog = get_problem_catalog()
+        scores = []
+        for entry in completed[-window:]:
+            problem = catalog.find(entry)
+            if problem:
+                scores.append(COMPLETION_SCORES.get(problem.get("difficulty"), 60))
+        return scores
+    
+    def _format_daily_problem(self, problem: dict, difficulty: str, skill_gaps: list, completed: list) -> dict:
+        """Catalog entry in the dailyTask shape the dashboard expects."""
+        link = problem.get("link", "")
+        topics = problem.get("topics", [])
+        reason = (
+            f"{problem['title']} is one of the most asked {problem.get('category', '')} problems "
+            f"({problem.get('frequency', 0)}% frequency at {', '.join(problem.get('companies', [])[:3])})"
+        )
+        gap_topics = [t for t in topics if any(t.lower() in g.lower() or g.lower() in t.lower() for g in skill_gaps)]
+        if gap_topics:
+            reason += f" and practises {', '.join(gap_topics)}, one of your skill gaps"
+        if problem.get("difficulty") != difficulty:
+            reason += f". No unsolved {difficulty} problems are left, so this one is {problem.get('difficulty')}"
+        
+        return {
+            "id": f"daily-{problem['id']}",
+            "problemId": problem["id"],
+            "title": problem["title"],
+            "slug": link.rstrip("/").rsplit("/", 1)[-1],
+            "type": "problem",
+            "difficulty": problem.get("difficulty", difficulty),
+            "category": problem.get("category", ""),
+            "companies": problem.get("companies", []),
+            "frequency": problem.get("frequency", 0),
+            "estimatedTime": problem.get("estimatedTime", "30 min"),
+            "link": link,
+            "topics": topics,
+            "reason": reason + ".",
+            "date": date.today().isoformat(),
+            "relatedProblems": [
+                {"title": p["title"], "link": p.get("link", ""), "difficulty": p.get("difficulty", "")}
+                for p in get_problem_catalog().related(problem, completed)
+            ],
+        }
+    
     def get_spaced_repetition_problems(self, solved_problems: list, days_since_solve: dict) -> list:
         """
         Get problems due for review based on spaced repetition.
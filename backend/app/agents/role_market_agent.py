@@ -2,7 +2,7 @@
 Role Market Agent - Agent #2
 Analyzes job market and recommends suitable roles.
 """
-from app.services.openai_service import match_roles
+from app.services.role_matcher import get_role_matcher, score_requirements
 
 
 class RoleMarketAgent:
@@ -28,7 +28,9 @@ class RoleMarketAgent:
         Returns:
             List of matching roles with match scores
         """
-        roles = await match_roles(profile)
+        # Same local ranking as /roles; skill graph carries levels
+        skills = profile.get("skillGraph") or profile.get("skills", [])
+        roles = self.rank_catalog_roles(skills)
         
         return {
             "agent": self.name,
@@ -44,12 +46,15 @@ class RoleMarketAgent:
     def calculate_match_score(self, user_skills: list, role_requirements: list) -> int:
         """
         Calculate how well user skills match role requirements.
+        Skills may be names or dicts with a proficiency/level; see role_matcher.
         """
-        if not role_requirements:
-            return 0
-        
-        matched = sum(1 for req in role_requirements if req in user_skills)
-        return round((matched / len(role_requirements)) * 100)
+        return score_requirements(user_skills, role_requirements)
+    
+    def rank_catalog_roles(self, user_skills: list, top_k: int = 5) -> list:
+        """
+        Score the user against every role in the job catalog locally.
+        """
+        return get_role_matcher().match(user_skills, top_k)
 
 
 role_market_agent = RoleMarketAgent()
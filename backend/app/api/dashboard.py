@@ -1,7 +1,8 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import Optional, List
-from app.services.openai_service import get_daily_problem
+from datetime import date
+from app.agents.question_agent import question_bank_agent
 from app.services.supabase_service import (
     get_profile as get_supabase_profile,
     get_roadmap as get_supabase_roadmap,
@@ -9,6 +10,8 @@ from app.services.supabase_service import (
     calculate_streak,
     record_problem_completed,
     calculate_job_readiness,
+    get_daily_assignment,
+    save_daily_assignment,
 )
 
 router = APIRouter()
@@ -120,21 +123,40 @@ def _generate_progress_data(completed_tasks: int, total_tasks: int, problems_sol
 
 
 @router.get("/{user_id}/daily")
-async def get_daily_task(user_id: str):
+async def get_daily_task(user_id: str, explain: bool = True):
     """
     Get today's recommended LeetCode problem with full details.
+    Normally precomputed overnight by the daily batch; users it missed
+    (e.g. signed up today) get one computed now and stored for the day.
     """
-    # Get from Supabase
-    profile = await get_supabase_profile(user_id) or {}
-    roadmap = await get_supabase_roadmap(user_id) or {}
-    target_role = roadmap.get("targetRole", profile.get("targetRole", "Senior Frontend Engineer"))
-    completed_problems = completed_problems_db.get(user_id, [])
+    today = date.today()
     
     # Get real streak
     streak_data = await calculate_streak(user_id)
     
-    # Get AI-recommended daily problem with reasoning
-    daily = await get_daily_problem(profile, target_role, completed_problems)
+    try:
+        daily = await get_daily_assignment(user_id, today)
+    except Exception as e:
+        print(f"Error reading daily assignment: {e}")
+        daily = None
+    
+    if daily is None:
+        # Get from Supabase
+        profile = await get_supabase_profile(user_id) or {}
+        roadmap = await get_supabase_roadmap(user_id) or {}
+        target_role = roadmap.get("targetRole", profile.get("targetRole", "Senior Frontend Engineer"))
+        completed_problems = completed_problems_db.get(user_id, [])
+        
+        # Pick from the local problem catalog; the LLM only writes the reason
+        daily = await question_bank_agent.recommend_daily_problem(
+            profile, target_role, completed_problems, explain=explain
+        )
+        # Only store a real pick; an empty one is retried on the next request
+        if daily:
+            try:
+                await save_daily_assignment(user_id, today, daily)
+            except Exception as e:
+                print(f"Error saving daily assignment: {e}")
     
     return {
         "userId": user_id,
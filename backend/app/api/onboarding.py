@@ -0,0 +1,236 @@
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
+from typing import Optional, Union
+import asyncio
+import time
+import uuid
+
+from app.api.profile import SUPPORTED_EXTENSIONS, merge_parser_skills, build_profile
+from app.api.roadmap import _add_roadmap_metadata, _sse
+from app.api.roles import selected_roles_db
+from app.services.openai_service import explain_role_matches, stream_comprehensive_roadmap
+from app.services.prewarm import skills_with_levels
+from app.services.resume_cache import resume_cache
+from app.services.resume_parser import parse_resume_file, get_enhanced_prompt_context
+from app.services.role_matcher import get_role_matcher
+from app.services.supabase_service import create_profile, save_roadmap
+from app.services.upload_spool import SpooledUpload, spool_upload
+
+router = APIRouter()
+
+# In-memory storage: pipeline state per user, so clients can resume or
+# re-read any stage without sending its inputs again
+onboarding_db = {}
+_pipelines = set()
+
+
+class _RoadmapRequest:
+    """The fields _add_roadmap_metadata reads from a ComprehensiveRoadmapRequest."""
+
+    def __init__(self, user_id: str, target_role: str):
+        self.userId = user_id
+        self.targetRole = target_role
+
+
+async def _run_pipeline(
+    user_id: str,
+    content: Union[bytes, SpooledUpload],
+    filename: str,
+    target_role: Optional[str],
+    time_constraint: dict,
+    events: asyncio.Queue,
+) -> None:
+    """
+    parse -> extract skills -> { save profile | explain roles | roadmap -> save roadmap }
+
+    Once the profile exists, roles are ranked locally and saving the profile,
+    explaining the roles and generating the roadmap (for targetRole or the
+    best match) run concurrently. Every stage reports `stage` events;
+    roadmap weeks are forwarded as they arrive.
+    """
+    state = onboarding_db[user_id]
+
+    async def stage(name: str, work):
+        state["stages"][name] = "running"
+        await events.put(("stage", {"stage": name, "status": "running"}))
+        started = time.perf_counter()
+        try:
+            result = await work
+        except Exception:
+            state["stages"][name] = "failed"
+            raise
+        state["stages"][name] = "done"
+        await events.put(("stage", {
+            "stage": name,
+            "status": "done",
+            "elapsedMs": round((time.perf_counter() - started) * 1000),
+        }))
+        return result
+
+    async def extract(parsed_resume):
+        if parsed_resume.parsing_confidence > 0.5:
+            text_for_ai = get_enhanced_prompt_context(parsed_resume)
+            resume_sections = parsed_resume.sections
+        else:
+            text_for_ai = parsed_resume.raw_text
+            resume_sections = None
+        if not text_for_ai.strip():
+            raise Exception("No text could be extracted from the resume")
+        skill_data = await resume_cache.analyze(parsed_resume.content_hash, text_for_ai, resume_sections)
+        merge_parser_skills(skill_data, parsed_resume)
+        return skill_data
+
+    try:
+        parsed_resume = await stage("parse", parse_resume_file(content, filename))
+    finally:
+        if isinstance(content, SpooledUpload):
+            content.close()
+    skill_data = await stage("extract", extract(parsed_resume))
+
+    profile = build_profile(user_id, skill_data, parsed_resume)
+    skills = skills_with_levels(profile)
+    state["profile"] = profile
+    await events.put(("profile", {"userId": user_id, "profile": profile}))
+
+    # Local and instant; only the whyGoodFit explanations need the LLM
+    roles = get_role_matcher().match(skills)
+    if target_role:
+        role_title = target_role
+        matched = [r for r in roles if r["title"] == target_role]
+        missing_skills = matched[0]["gaps"] if matched else profile["skillGaps"]
+    elif roles:
+        role_title = roles[0]["title"]
+        missing_skills = roles[0]["gaps"]
+        selected_roles_db[user_id] = roles[0]["id"]
+    else:
+        raise Exception("No matching roles to build a roadmap for")
+
+    async def explain():
+        explanations = await explain_role_matches(skills, roles)
+        for role in roles:
+            role["whyGoodFit"] = explanations.get(role["id"], role["whyGoodFit"])
+        state["roles"] = roles
+        await events.put(("roles", {"roles": roles}))
+
+    async def roadmap():
+        async for event in stream_comprehensive_roadmap(
+            skills=skills,
+            target_role=role_title,
+            missing_skills=missing_skills,
+            time_constraint=time_constraint,
+            resume_text=profile["summary"],
+        ):
+            if event["type"] == "week":
+                await events.put(("week", event["week"]))
+                continue
+            result = _add_roadmap_metadata(event["roadmap"], _RoadmapRequest(user_id, role_title), skills, time_constraint)
+            await save_roadmap(user_id, result, role_title)
+            state["roadmap"] = result
+            return result
+
+    await asyncio.gather(
+        stage("profile", create_profile(user_id, profile)),
+        stage("roles", explain()),
+        stage("roadmap", roadmap()),
+    )
+
+
+@router.post("/stream")
+async def stream_onboarding(
+    file: Optional[UploadFile] = File(None),
+    resumeText: Optional[str] = Form(None),
+    userId: Optional[str] = Form(None),
+    targetRole: Optional[str] = Form(None),
+    weeks: int = Form(12),
+    hoursPerDay: float = Form(2.0),
+    intensity: str = Form("moderate"),
+):
+    """
+    Whole onboarding in one request: resume (file or pasted text) in, profile,
+    role matches and comprehensive roadmap out, streamed as Server-Sent Events.
+
+    Events: `stage` ({stage, status, elapsedMs}) as each of parse / extract /
+    profile / roles / roadmap starts and finishes, `profile`, `roles`, one
+    `week` per generated roadmap week, then `done` with everything (or `error`).
+    Without a targetRole the roadmap targets the best-matching role.
+    """
+    if file is not None:
+        filename = file.filename or ""
+        ext = '.' + filename.lower().split('.')[-1] if '.' in filename else ''
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unsupported file format. Supported formats: {', '.join(SUPPORTED_EXTENSIONS)}"
+            )
+        # Spooled (413 past max_upload_bytes); the pipeline closes it once parsed
+        content = await spool_upload(file)
+        if content.size == 0:
+            content.close()
+            raise HTTPException(status_code=400, detail="Empty file uploaded")
+    elif resumeText and resumeText.strip():
+        filename = "resume.txt"
+        content = resumeText.encode('utf-8')
+    else:
+        raise HTTPException(status_code=400, detail="Upload a resume file or send resumeText")
+
+    user_id = userId or f"user-{uuid.uuid4().hex[:8]}"
+    time_constraint = {"weeks": weeks, "hoursPerDay": hoursPerDay, "intensity": intensity}
+    onboarding_db[user_id] = {
+        "userId": user_id,
+        "stages": {},
+        "profile": None,
+        "roles": None,
+        "roadmap": None,
+        "timeConstraint": time_constraint,
+    }
+
+    # Started here rather than in the stream, so the pipeline (which closes
+    # the spooled upload) runs even if the response body is never iterated.
+    # Keep a reference: if the client disconnects the pipeline still
+    # finishes, and its results stay readable via GET /{user_id}
+    events: asyncio.Queue = asyncio.Queue()
+    pipeline = asyncio.create_task(
+        _run_pipeline(user_id, content, filename, targetRole, time_constraint, events)
+    )
+    _pipelines.add(pipeline)
+    pipeline.add_done_callback(_pipelines.discard)
+    pipeline.add_done_callback(lambda _: events.put_nowait(None))
+    if isinstance(content, SpooledUpload):
+        # Already closed once parsed; this covers a pipeline cancelled before it ran
+        pipeline.add_done_callback(lambda _: content.close())
+
+    async def event_stream():
+        yield _sse("stage", {"stage": "start", "status": "running", "userId": user_id})
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield _sse(*event)
+
+        if pipeline.cancelled():
+            yield _sse("error", {"success": False, "userId": user_id, "detail": "Onboarding was cancelled"})
+            return
+        error = pipeline.exception()
+        if error:
+            print(f"Error in onboarding pipeline: {error}")
+            yield _sse("error", {"success": False, "userId": user_id, "detail": f"Onboarding failed: {str(error)}"})
+        else:
+            yield _sse("done", {"success": True, **onboarding_db[user_id]})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{user_id}")
+async def get_onboarding_state(user_id: str):
+    """
+    Current pipeline state for a user: stage statuses plus whatever profile,
+    roles and roadmap have been produced so far.
+    """
+    state = onboarding_db.get(user_id)
+    if not state:
+        raise HTTPException(status_code=404, detail="No onboarding run for this user")
+    return state
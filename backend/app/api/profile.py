@@ -3,9 +3,11 @@ from pydantic import BaseModel
 from typing import Optional, List
 import uuid
 
-from app.services.openai_service import extract_skills_from_resume
 from app.services.supabase_service import create_profile, get_profile as get_profile_from_db
 from app.services.resume_parser import parse_resume_file, get_enhanced_prompt_context
+from app.services.prewarm import prewarm_manager
+from app.services.resume_cache import resume_cache
+from app.services.upload_spool import spool_upload
 
 router = APIRouter()
 
@@ -31,6 +33,45 @@ class ProfileResponse(BaseModel):
 SUPPORTED_EXTENSIONS = ['.pdf', '.docx', '.doc', '.txt']
 
 
+def merge_parser_skills(skill_data: dict, parsed_resume) -> None:
+    """Add skills the parser detected but the AI missed, at a default moderate level."""
+    ai_skill_names = [s.get("name", "").lower() for s in skill_data.get("skills", [])]
+    for parser_skill in parsed_resume.detected_skills:
+        if parser_skill.lower() not in ai_skill_names:
+            skill_data.setdefault("skills", []).append({
+                "id": str(uuid.uuid4())[:8],
+                "name": parser_skill,
+                "level": 60,  # Default moderate level
+                "category": "Technical",
+                "connections": [],
+                "evidence": "Detected from resume text"
+            })
+
+
+def build_profile(user_id: str, skill_data: dict, parsed_resume) -> dict:
+    """Comprehensive profile from AI analysis, falling back to parser data."""
+    return {
+        "id": str(uuid.uuid4()),
+        "userId": user_id,
+        "skills": [s.get("name") for s in skill_data.get("skills", [])],
+        "experience": skill_data.get("experience", []) or parsed_resume.detected_experience,
+        "education": skill_data.get("education", []) or parsed_resume.detected_education,
+        "skillGraph": skill_data.get("skills", []),
+        "summary": skill_data.get("summary", ""),
+        "strongestSkills": skill_data.get("strongestSkills", []),
+        "skillGaps": skill_data.get("skillGaps", []),
+        # Extended profile data
+        "projects": skill_data.get("projects", []) or parsed_resume.detected_projects,
+        "achievements": skill_data.get("achievements", []),
+        "certifications": skill_data.get("certifications", []) or [{"name": c} for c in parsed_resume.detected_certifications],
+        "totalYearsExperience": skill_data.get("totalYearsExperience", 0),
+        "seniorityLevel": skill_data.get("seniorityLevel", "Entry"),
+        # Parsing metadata
+        "parsingConfidence": parsed_resume.parsing_confidence,
+        "contactInfo": parsed_resume.contact_info,
+    }
+
+
 @router.post("/upload")
 async def upload_resume(file: UploadFile = File(...)):
     """
@@ -48,16 +89,17 @@ async def upload_resume(file: UploadFile = File(...)):
         )
     
     try:
-        # Read file content
-        content = await file.read()
-        
-        if len(content) == 0:
-            raise HTTPException(status_code=400, detail="Empty file uploaded")
-        
-        print(f"[ResumeParser] Processing file: {file.filename} ({len(content)} bytes)")
-        
-        # Step 1: Use robust parser to extract text and structure
-        parsed_resume = await parse_resume_file(content, file.filename)
+        # No copy: small files are read into memory, larger ones are mapped
+        # from the form parser's own temp file through a duplicated file
+        # descriptor (413 past max_upload_bytes)
+        async with await spool_upload(file) as upload:
+            if upload.size == 0:
+                raise HTTPException(status_code=400, detail="Empty file uploaded")
+            
+            print(f"[ResumeParser] Processing file: {file.filename} ({upload.size} bytes)")
+            
+            # Step 1: Use robust parser to extract text and structure
+            parsed_resume = await parse_resume_file(upload, file.filename)
         
         print(f"[ResumeParser] Parsing confidence: {parsed_resume.parsing_confidence:.0%}")
         print(f"[ResumeParser] Detected {len(parsed_resume.detected_skills)} skills, {len(parsed_resume.detected_experience)} experiences")
@@ -67,61 +109,34 @@ async def upload_resume(file: UploadFile = File(...)):
             # Good parsing - use structured context
             enhanced_context = get_enhanced_prompt_context(parsed_resume)
             resume_text_for_ai = enhanced_context
+            resume_sections = parsed_resume.sections
         else:
             # Poor parsing - use raw text
             resume_text_for_ai = parsed_resume.raw_text
+            resume_sections = None
         
         # Fallback if no text extracted
         if not resume_text_for_ai.strip():
             print("[ResumeParser] Warning: No text extracted, using demo data")
             resume_text_for_ai = "Demo resume: Software Engineer with JavaScript, React, Python skills"
         
-        # Step 3: Use GPT-4o-mini for comprehensive analysis
-        skill_data = await extract_skills_from_resume(resume_text_for_ai)
+        # Step 3: Use GPT-4o-mini for comprehensive analysis (cached per file)
+        skill_data = await resume_cache.analyze(parsed_resume.content_hash, resume_text_for_ai, resume_sections)
         
         # Step 4: Merge AI results with parser results for better accuracy
         # Add any skills detected by parser but missed by AI
-        ai_skill_names = [s.get("name", "").lower() for s in skill_data.get("skills", [])]
-        for parser_skill in parsed_resume.detected_skills:
-            if parser_skill.lower() not in ai_skill_names:
-                skill_data.setdefault("skills", []).append({
-                    "id": str(uuid.uuid4())[:8],
-                    "name": parser_skill,
-                    "level": 60,  # Default moderate level
-                    "category": "Technical",
-                    "connections": [],
-                    "evidence": "Detected from resume text"
-                })
+        merge_parser_skills(skill_data, parsed_resume)
         
         # Step 5: Create profile with unique IDs
-        profile_id = str(uuid.uuid4())
         user_id = f"user-{uuid.uuid4().hex[:8]}"
-        
-        # Build comprehensive profile from AI analysis + parser data
-        profile = {
-            "id": profile_id,
-            "userId": user_id,
-            "skills": [s.get("name") for s in skill_data.get("skills", [])],
-            "experience": skill_data.get("experience", []) or parsed_resume.detected_experience,
-            "education": skill_data.get("education", []) or parsed_resume.detected_education,
-            "skillGraph": skill_data.get("skills", []),
-            "summary": skill_data.get("summary", ""),
-            "strongestSkills": skill_data.get("strongestSkills", []),
-            "skillGaps": skill_data.get("skillGaps", []),
-            # Extended profile data
-            "projects": skill_data.get("projects", []) or parsed_resume.detected_projects,
-            "achievements": skill_data.get("achievements", []),
-            "certifications": skill_data.get("certifications", []) or [{"name": c} for c in parsed_resume.detected_certifications],
-            "totalYearsExperience": skill_data.get("totalYearsExperience", 0),
-            "seniorityLevel": skill_data.get("seniorityLevel", "Entry"),
-            # Parsing metadata
-            "parsingConfidence": parsed_resume.parsing_confidence,
-            "contactInfo": parsed_resume.contact_info,
-        }
+        profile = build_profile(user_id, skill_data, parsed_resume)
         
         # Store in Supabase
         await create_profile(user_id, profile)
         
+        # Start the likely next requests (role matches, top-role roadmap) in the background
+        prewarm_manager.start(user_id, profile)
+        
         print(f"[ResumeParser] Profile created: {len(profile['skills'])} skills, {len(profile['projects'])} projects")
         
         return {
@@ -132,7 +147,10 @@ async def upload_resume(file: UploadFile = File(...)):
                 "confidence": parsed_resume.parsing_confidence,
                 "sectionsDetected": list(parsed_resume.sections.keys()),
                 "skillsDetectedByParser": len(parsed_resume.detected_skills),
-                "contactInfo": parsed_resume.contact_info
+                "contactInfo": parsed_resume.contact_info,
+                "pagesParsed": parsed_resume.pages_parsed,
+                "truncated": parsed_resume.truncated,
+                "truncationReason": parsed_resume.truncation_reason or None,
             }
         }
         
@@ -172,51 +190,27 @@ async def analyze_resume_text(request: ResumeTextRequest):
         if parsed_resume.parsing_confidence > 0.3:
             enhanced_context = get_enhanced_prompt_context(parsed_resume)
             text_for_ai = enhanced_context
+            resume_sections = parsed_resume.sections
         else:
             text_for_ai = resume_text
+            resume_sections = None
         
-        # Step 3: Use GPT-4o-mini for comprehensive analysis
-        skill_data = await extract_skills_from_resume(text_for_ai)
+        # Step 3: Use GPT-4o-mini for comprehensive analysis (cached per file)
+        skill_data = await resume_cache.analyze(parsed_resume.content_hash, text_for_ai, resume_sections)
         
         # Step 4: Merge parser results with AI results
-        ai_skill_names = [s.get("name", "").lower() for s in skill_data.get("skills", [])]
-        for parser_skill in parsed_resume.detected_skills:
-            if parser_skill.lower() not in ai_skill_names:
-                skill_data.setdefault("skills", []).append({
-                    "id": str(uuid.uuid4())[:8],
-                    "name": parser_skill,
-                    "level": 60,
-                    "category": "Technical",
-                    "connections": [],
-                    "evidence": "Detected from resume text"
-                })
+        merge_parser_skills(skill_data, parsed_resume)
         
         # Step 5: Create profile
-        profile_id = str(uuid.uuid4())
         user_id = request.user_id or f"user-{uuid.uuid4().hex[:8]}"
-        
-        profile = {
-            "id": profile_id,
-            "userId": user_id,
-            "skills": [s.get("name") for s in skill_data.get("skills", [])],
-            "experience": skill_data.get("experience", []) or parsed_resume.detected_experience,
-            "education": skill_data.get("education", []) or parsed_resume.detected_education,
-            "skillGraph": skill_data.get("skills", []),
-            "summary": skill_data.get("summary", ""),
-            "strongestSkills": skill_data.get("strongestSkills", []),
-            "skillGaps": skill_data.get("skillGaps", []),
-            "projects": skill_data.get("projects", []) or parsed_resume.detected_projects,
-            "achievements": skill_data.get("achievements", []),
-            "certifications": skill_data.get("certifications", []) or [{"name": c} for c in parsed_resume.detected_certifications],
-            "totalYearsExperience": skill_data.get("totalYearsExperience", 0),
-            "seniorityLevel": skill_data.get("seniorityLevel", "Entry"),
-            "parsingConfidence": parsed_resume.parsing_confidence,
-            "contactInfo": parsed_resume.contact_info,
-        }
+        profile = build_profile(user_id, skill_data, parsed_resume)
         
         # Store in Supabase
         await create_profile(user_id, profile)
         
+        # Start the likely next requests (role matches, top-role roadmap) in the background
+        prewarm_manager.start(user_id, profile)
+        
         print(f"[ResumeParser] Profile created: {len(profile['skills'])} skills")
         
         return {
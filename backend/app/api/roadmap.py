@@ -1,9 +1,20 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
+import json
 
-from app.services.openai_service import generate_roadmap, generate_bonus_topics, generate_comprehensive_roadmap
+from openai import RateLimitError
+
+from app.services.openai_service import (
+    generate_roadmap,
+    generate_bonus_topics,
+    generate_comprehensive_roadmap,
+    stream_comprehensive_roadmap,
+    retry_after_seconds,
+)
+from app.services.prewarm import prewarm_manager
 from app.services.supabase_service import (
     save_roadmap, 
     get_roadmap as get_roadmap_from_db,
@@ -46,6 +57,54 @@ class TaskUpdate(BaseModel):
     weekId: Optional[str] = None
 
 
+def _comprehensive_inputs(request: ComprehensiveRoadmapRequest) -> tuple:
+    """Convert the request models to the plain dicts the generator expects."""
+    skills_list = [
+        {
+            "name": s.name,
+            "category": s.category,
+            "proficiency": s.proficiency
+        }
+        for s in request.skills
+    ]
+    
+    time_constraint = {
+        "weeks": request.timeConstraint.weeks,
+        "hoursPerDay": request.timeConstraint.hoursPerDay,
+        "intensity": request.timeConstraint.intensity
+    }
+    return skills_list, time_constraint
+
+
+def _add_roadmap_metadata(roadmap: dict, request: ComprehensiveRoadmapRequest, skills_list: list, time_constraint: dict) -> dict:
+    """Attach user metadata and empty progress tracking to a generated roadmap."""
+    roadmap["userId"] = request.userId
+    roadmap["targetRole"] = request.targetRole
+    roadmap["timeConstraint"] = time_constraint
+    roadmap["skillLevels"] = skills_list
+    roadmap["taskCompletionTimes"] = {
+        "weekStartTimes": {},
+        "completedTasks": {},
+    }
+    return roadmap
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+RATE_LIMITED_DETAIL = "The AI service is busy right now, please retry shortly"
+
+
+def _rate_limited(error: RateLimitError) -> HTTPException:
+    """429 with Retry-After for an OpenAI rate limit, instead of a generic 500."""
+    return HTTPException(
+        status_code=429,
+        detail=RATE_LIMITED_DETAIL,
+        headers={"Retry-After": str(retry_after_seconds(error))},
+    )
+
+
 @router.post("/generate-comprehensive")
 async def create_comprehensive_roadmap(request: ComprehensiveRoadmapRequest):
     """
@@ -53,21 +112,8 @@ async def create_comprehensive_roadmap(request: ComprehensiveRoadmapRequest):
     Considers skill proficiency levels and time constraints.
     """
     try:
-        # Convert skills to dict format
-        skills_list = [
-            {
-                "name": s.name,
-                "category": s.category,
-                "proficiency": s.proficiency
-            }
-            for s in request.skills
-        ]
-        
-        time_constraint = {
-            "weeks": request.timeConstraint.weeks,
-            "hoursPerDay": request.timeConstraint.hoursPerDay,
-            "intensity": request.timeConstraint.intensity
-        }
+        skills_list, time_constraint = _comprehensive_inputs(request)
+        prewarm_manager.on_roadmap_request(request.userId, request.targetRole, time_constraint)
         
         # Generate comprehensive roadmap using AI
         roadmap = await generate_comprehensive_roadmap(
@@ -79,14 +125,7 @@ async def create_comprehensive_roadmap(request: ComprehensiveRoadmapRequest):
         )
         
         # Add user metadata
-        roadmap["userId"] = request.userId
-        roadmap["targetRole"] = request.targetRole
-        roadmap["timeConstraint"] = time_constraint
-        roadmap["skillLevels"] = skills_list
-        roadmap["taskCompletionTimes"] = {
-            "weekStartTimes": {},
-            "completedTasks": {},
-        }
+        _add_roadmap_metadata(roadmap, request, skills_list, time_constraint)
         
         # Save to Supabase
         await save_roadmap(request.userId, roadmap, request.targetRole)
@@ -96,11 +135,61 @@ async def create_comprehensive_roadmap(request: ComprehensiveRoadmapRequest):
             "roadmap": roadmap,
         }
         
+    except RateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
         print(f"Error generating comprehensive roadmap: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate roadmap: {str(e)}")
 
 
+@router.post("/generate-comprehensive/stream")
+async def stream_comprehensive_roadmap_events(request: ComprehensiveRoadmapRequest):
+    """
+    Streaming version of /generate-comprehensive using Server-Sent Events.
+    Emits a `week` event for every week as soon as it is generated, then a single
+    `done` event with the saved roadmap (or an `error` event).
+    """
+    skills_list, time_constraint = _comprehensive_inputs(request)
+    prewarm_manager.on_roadmap_request(request.userId, request.targetRole, time_constraint)
+
+    async def event_stream():
+        try:
+            async for event in stream_comprehensive_roadmap(
+                skills=skills_list,
+                target_role=request.targetRole,
+                missing_skills=request.missingSkills,
+                time_constraint=time_constraint,
+                resume_text=request.resumeText
+            ):
+                if event["type"] == "week":
+                    yield _sse("week", event["week"])
+                    continue
+                
+                roadmap = _add_roadmap_metadata(event["roadmap"], request, skills_list, time_constraint)
+                
+                # Persist once, after the whole roadmap has arrived
+                await save_roadmap(request.userId, roadmap, request.targetRole)
+                
+                yield _sse("done", {"success": True, "roadmap": roadmap})
+        except RateLimitError as e:
+            # Headers are already sent: report it in the event instead
+            yield _sse("error", {
+                "success": False,
+                "status": 429,
+                "retryAfter": retry_after_seconds(e),
+                "detail": RATE_LIMITED_DETAIL,
+            })
+        except Exception as e:
+            print(f"Error streaming comprehensive roadmap: {e}")
+            yield _sse("error", {"success": False, "detail": f"Failed to generate roadmap: {str(e)}"})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/generate")
 async def create_roadmap(request: RoadmapRequest):
     """
@@ -138,6 +227,8 @@ async def create_roadmap(request: RoadmapRequest):
             "roadmap": roadmap,
         }
         
+    except RateLimitError as e:
+        raise _rate_limited(e)
     except Exception as e:
         print(f"Error generating roadmap: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate roadmap: {str(e)}")
@@ -2,7 +2,8 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 from typing import List
 
-from app.services.openai_service import match_roles, match_roles_with_skill_levels
+from app.services.openai_service import explain_role_matches
+from app.services.role_matcher import get_role_matcher
 
 router = APIRouter()
 
@@ -28,8 +29,21 @@ class SkillsWithLevelsRequest(BaseModel):
     skills: List[SkillWithLevel]
 
 
+async def _match_catalog_roles(skills: list, explain: bool, top_k: int = 5) -> list:
+    """
+    Rank the job catalog locally; the LLM is only asked for the whyGoodFit
+    narrative, and only when `explain` is set.
+    """
+    roles = get_role_matcher().match(skills, top_k)
+    if explain:
+        explanations = await explain_role_matches(skills, roles)
+        for role in roles:
+            role["whyGoodFit"] = explanations.get(role["id"], role["whyGoodFit"])
+    return roles
+
+
 @router.get("/{user_id}")
-async def get_roles(user_id: str):
+async def get_roles(user_id: str, explain: bool = False):
     """
     Get role recommendations for a user.
     """
@@ -37,8 +51,9 @@ async def get_roles(user_id: str):
     
     profile = await get_profile(user_id) or {}
     
-    # Get AI-matched roles
-    roles = await match_roles(profile)
+    # Skill graph carries levels; fall back to the plain skill names
+    skills = profile.get("skillGraph") or profile.get("skills", [])
+    roles = await _match_catalog_roles(skills, explain)
     
     return {
         "userId": user_id,
@@ -48,17 +63,11 @@ async def get_roles(user_id: str):
 
 
 @router.post("/recommendations")
-async def get_recommendations(request: SkillsRequest):
+async def get_recommendations(request: SkillsRequest, explain: bool = False):
     """
     Get role recommendations based on skills list.
     """
-    # Build a profile from skills
-    profile = {
-        "skills": [{"name": skill, "level": 70} for skill in request.skills],
-    }
-    
-    # Get AI-matched roles
-    roles = await match_roles(profile)
+    roles = await _match_catalog_roles(request.skills, explain)
     
     # Transform to frontend format
     formatted_roles = []
@@ -78,7 +87,7 @@ async def get_recommendations(request: SkillsRequest):
 
 
 @router.post("/recommendations-with-levels")
-async def get_recommendations_with_levels(request: SkillsWithLevelsRequest):
+async def get_recommendations_with_levels(request: SkillsWithLevelsRequest, explain: bool = True):
     """
     Get role recommendations based on skills WITH proficiency levels.
     This provides more accurate role matching based on skill depth.
@@ -93,8 +102,8 @@ async def get_recommendations_with_levels(request: SkillsWithLevelsRequest):
         for s in request.skills
     ]
     
-    # Get AI-matched roles with skill level consideration
-    roles = await match_roles_with_skill_levels(skills_list)
+    # Match against the job catalog with skill level consideration
+    roles = await _match_catalog_roles(skills_list, explain)
     
     # Transform to frontend format
     formatted_roles = []
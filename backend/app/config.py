@@ -14,6 +14,90 @@ class Settings(BaseSettings):
     # OpenAI
     openai_api_key: str = ""
     openai_model: str = "gpt-4o-mini"
+    openai_timeout_seconds: float = 60.0
+    openai_max_retries: int = 2
+    openai_max_connections: int = 100
+    openai_max_keepalive_connections: int = 20
+    openai_rpm_limit: int = 500
+    openai_tpm_limit: int = 200000
+
+    # Prompt token budgets
+    resume_prompt_tokens: int = 4000
+    resume_context_tokens: int = 4000
+    roadmap_skills_prompt_tokens: int = 300
+    # Resumes longer than resume_prompt_tokens are analysed in chunks of this
+    # size, in parallel, and the partial results merged
+    resume_chunk_tokens: int = 3000
+    resume_chunk_concurrency: int = 4
+
+    # Roadmaps with at least this many weeks are generated outline-first,
+    # then week by week in parallel
+    roadmap_fanout_min_weeks: int = 8
+    roadmap_fanout_concurrency: int = 6
+    # Extra calls allowed to finish the weeks of a truncated roadmap
+    roadmap_continuation_rounds: int = 3
+
+    # LLM response cache (empty path = memory tier only)
+    llm_cache_enabled: bool = True
+    llm_cache_max_entries: int = 1024
+    llm_cache_path: str = ""
+
+    # Parsed resumes and their LLM analysis by file content hash, so a
+    # re-uploaded file skips parsing and analysis (empty path = memory only)
+    resume_cache_enabled: bool = True
+    resume_cache_max_entries: int = 256
+    resume_cache_ttl_seconds: int = 7 * 24 * 3600
+    resume_cache_path: str = ""
+
+    # After a resume upload, speculatively run role matching and the most
+    # likely roadmap in the background so the next screens hit the cache.
+    # Off by default: the fan-out roadmap alone is ~13 LLM calls per upload,
+    # paid even when the user never opens the roadmap
+    prewarm_enabled: bool = False
+    prewarm_weeks: int = 12
+    prewarm_hours_per_day: float = 2.0
+    prewarm_intensity: str = "moderate"
+    prewarm_timeout_seconds: float = 300.0
+
+    # Nightly precompute of daily problems. Run it once per deployment from
+    # cron (python -m app.services.daily_batch); daily_batch_enabled runs it
+    # inside the API process instead, which is only safe with a single
+    # worker: every uvicorn/gunicorn worker would start its own scheduler.
+    # A relative checkpoint path is resolved against the backend directory.
+    daily_batch_enabled: bool = False
+    daily_batch_hour: int = 3
+    daily_batch_concurrency: int = 8
+    daily_batch_active_days: int = 14
+    daily_batch_checkpoint_path: str = "daily_batch_checkpoint.json"
+    daily_batch_checkpoint_every: int = 25
+
+    # PDF/DOCX text extraction runs in worker processes (0 = in a thread);
+    # hung or oversized documents get the worker killed and replaced
+    extraction_pool_size: int = 2
+    extraction_timeout_seconds: float = 30.0
+    extraction_memory_limit_mb: int = 1024
+    # PDF backends tried in this order until one's text scores at least
+    # pdf_min_quality (0-1); tune from the per-backend stats on /health/extraction
+    pdf_backend_order: str = "pymupdf,pypdf2,pdfminer,pdfplumber"
+    pdf_min_quality: float = 0.6
+    # Parsing budget, so long or hostile files cost no more than a resume:
+    # PDFs stop after pdf_max_pages pages, any resume text is cut at
+    # resume_max_chars, and from page pdf_early_exit_after_pages on a PDF
+    # stops once the pages read parse with resume_early_exit_confidence (0 = off)
+    pdf_max_pages: int = 10
+    resume_max_chars: int = 60000
+    pdf_early_exit_after_pages: int = 3
+    resume_early_exit_confidence: float = 1.0
+
+    # Resume uploads: bodies over the cap are rejected with 413 while still
+    # streaming in; files over the spool size are left in the form parser's
+    # temp file (under TMPDIR) and memory-mapped instead of held in memory
+    max_upload_bytes: int = 10 * 1024 * 1024
+    upload_spool_memory_bytes: int = 1024 * 1024
+
+    # Print one JSON line per LLM call to stdout, for log pipelines that
+    # ingest it (metrics are collected either way)
+    llm_call_logging: bool = False
     
     # Tavus
     tavus_api_key: str = ""
@@ -1,7 +1,20 @@
+import asyncio
+
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.api import profile, roadmap, interview, dashboard, roles, auth
+from app.api import profile, roadmap, interview, dashboard, roles, auth, onboarding
+from app.services import openai_service, supabase_service
+from app.services.daily_batch import daily_batch_scheduler
+from app.services.extraction_pool import get_extraction_pool
+from app.services.llm_cache import llm_cache
+from app.services.llm_metrics import llm_metrics
+from app.services.prewarm import prewarm_manager
+from app.services.resume_cache import resume_cache
+from app.services.rate_scheduler import rate_scheduler
+from app.services.single_flight import get_single_flight_stats
+from app.services.upload_spool import UploadLimitMiddleware
 
 settings = get_settings()
 
@@ -11,6 +24,9 @@ app = FastAPI(
     version="1.0.0",
 )
 
+# Reject oversized uploads before reading them (inside CORS, so the 413 carries CORS headers)
+app.add_middleware(UploadLimitMiddleware, max_bytes=settings.max_upload_bytes)
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -27,6 +43,31 @@ app.include_router(roadmap.router, prefix="/api/roadmap", tags=["Roadmap"])
 app.include_router(interview.router, prefix="/api/interview", tags=["Interview"])
 app.include_router(dashboard.router, prefix="/api/dashboard", tags=["Dashboard"])
 app.include_router(roles.router, prefix="/api/roles", tags=["Roles"])
+app.include_router(onboarding.router, prefix="/api/onboarding", tags=["Onboarding"])
+
+
+_background_tasks = []
+
+
+@app.on_event("startup")
+async def startup():
+    # Precompute each day's daily problems before the morning rush (needs
+    # Supabase). Off by default: with several workers each would run it, so
+    # production schedules `python -m app.services.daily_batch` from cron.
+    if settings.daily_batch_enabled and supabase_service.supabase:
+        _background_tasks.append(
+            asyncio.create_task(daily_batch_scheduler(completed_problems=dashboard.completed_problems_db))
+        )
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    for task in _background_tasks:
+        task.cancel()
+    prewarm_manager.cancel_all()
+    get_extraction_pool().shutdown()
+    # Release pooled OpenAI connections
+    await openai_service.close_client()
 
 
 @app.get("/")
@@ -42,3 +83,30 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/health/llm")
+async def llm_health():
+    """Rate scheduler queues, cache hit rates, request coalescing, per-caller call metrics and prewarming."""
+    return {
+        "scheduler": rate_scheduler.get_stats(),
+        "cache": llm_cache.get_stats(),
+        "singleFlight": get_single_flight_stats(),
+        "calls": llm_metrics.get_stats(),
+        "prewarm": prewarm_manager.get_stats(),
+    }
+
+
+@app.get("/health/extraction")
+async def extraction_health():
+    """Resume text extraction pool (saturation, queue wait, timeouts, restarts) and the resume cache."""
+    return {
+        **get_extraction_pool().get_stats(),
+        "resumeCache": resume_cache.get_stats(),
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """LLM call counters and latency histograms in Prometheus text format."""
+    return llm_metrics.render_prometheus()
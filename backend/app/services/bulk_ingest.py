@@ -0,0 +1,268 @@
+"""
+Bulk Ingest - Batch resume parsing (and optional analysis) to JSONL
+Parses every resume in a directory or zip archive across all cores, can run
+the LLM analysis on each with bounded concurrency, and appends one JSON line
+per file as soon as it is done. The output file doubles as the checkpoint:
+re-running the same command skips files already written and retries those
+whose record is retryable: "error" (parse or analysis failed) or "timeout"
+(extraction hit extraction_timeout_seconds). The later record for a file
+supersedes the earlier one. "ok" and "empty" (no text in the file) are final.
+
+Each parser process extracts through its own one-worker extraction pool, so
+the pool's per-document timeout and memory cap apply here too.
+
+Run from the backend directory:
+    python -m app.services.bulk_ingest resumes/ --out resumes.jsonl [--analyze]
+    python -m app.services.bulk_ingest partner.zip --out partner.jsonl --workers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.services.extraction_pool import get_extraction_pool
+from app.services.resume_cache import content_key, resume_cache
+from app.services.resume_parser import (
+    PARSER_VERSION,
+    ParsedResume,
+    parse_resume_file,
+    get_enhanced_prompt_context,
+)
+
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".doc", ".txt"}
+
+# Same threshold as /api/profile/upload for sending structured context
+STRUCTURED_CONTEXT_CONFIDENCE = 0.5
+
+# Progress line every this many files
+PROGRESS_EVERY = 100
+
+# Record statuses that a re-run processes again
+RETRY_STATUSES = {"error", "timeout"}
+
+
+def _list_inputs(source: str) -> List[str]:
+    """Supported files under a directory (recursive) or inside a zip, sorted."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            names = [i.filename for i in zf.infolist() if not i.is_dir()]
+    else:
+        root = Path(source)
+        names = [str(p.relative_to(root)) for p in root.rglob("*") if p.is_file()]
+    return sorted(n for n in names if Path(n).suffix.lower() in SUPPORTED_EXTENSIONS)
+
+
+class _Reader:
+    """Reads input files by name from a directory or a zip archive."""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._zip = zipfile.ZipFile(source) if zipfile.is_zipfile(source) else None
+
+    def read(self, name: str) -> bytes:
+        if self._zip is not None:
+            return self._zip.read(name)
+        with open(os.path.join(self.source, name), "rb") as f:
+            return f.read()
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+def _load_done(output_path: str) -> Dict[str, str]:
+    """
+    {file: contentHash} for files already done in the output (records in
+    RETRY_STATUSES are left out so they are retried). A last line cut off by an
+    interrupted run is truncated away so appending stays valid.
+    """
+    done: Dict[str, str] = {}
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("status") in RETRY_STATUSES:
+            done.pop(record["file"], None)
+            continue
+        done[record["file"]] = record.get("contentHash", "")
+    return done
+
+
+def _init_worker() -> None:
+    # This process is already one of the parallel workers; one extraction
+    # child is enough, and it can be killed when a document hangs
+    get_extraction_pool().size = 1
+
+
+def _parse_in_worker(filename: str, content: bytes) -> Tuple[dict, float]:
+    """Runs in a pool process: ParsedResume as a dict plus parse seconds."""
+    started = time.perf_counter()
+    parsed = asyncio.run(parse_resume_file(content, filename))
+    return asdict(parsed), time.perf_counter() - started
+
+
+async def _analyze(parsed: dict) -> dict:
+    resume = ParsedResume(**parsed)
+    if resume.parsing_confidence > STRUCTURED_CONTEXT_CONFIDENCE:
+        return await resume_cache.analyze(
+            resume.content_hash, get_enhanced_prompt_context(resume), resume.sections, fallback=False
+        )
+    # No mock fallback: a failed analysis is written as "error" and retried
+    return await resume_cache.analyze(resume.content_hash, resume.raw_text, fallback=False)
+
+
+async def run_bulk_ingest(
+    source: str,
+    output_path: str,
+    workers: Optional[int] = None,
+    analyze: bool = False,
+    llm_concurrency: int = 4,
+) -> dict:
+    """
+    Parse (and optionally analyse) every resume in `source`, appending one
+    JSON record per file to `output_path`. Files already recorded there are
+    skipped; identical files in one run are parsed once. Returns counts,
+    throughput and per-stage timings.
+    """
+    workers = workers or os.cpu_count() or 1
+    names = _list_inputs(source)
+    done = _load_done(output_path)
+    pending = [n for n in names if n not in done]
+
+    stats = {
+        "files": len(names),
+        "resumed": len(names) - len(pending),
+        "parsed": 0,
+        "analyzed": 0,
+        "duplicates": 0,
+        "empty": 0,
+        "failed": 0,
+    }
+    stage_seconds = {"read": 0.0, "parse": 0.0, "analyze": 0.0, "write": 0.0}
+    # Parses of this run by content hash, so duplicate files are parsed once
+    in_progress: Dict[str, asyncio.Future] = {}
+
+    loop = asyncio.get_running_loop()
+    reader = _Reader(source)
+    # Bounds files held in memory: enough to keep every worker and LLM slot busy
+    window = asyncio.Semaphore(workers * 2 + (llm_concurrency if analyze else 0))
+    llm_slots = asyncio.Semaphore(llm_concurrency)
+    started = time.perf_counter()
+    finished = 0
+
+    out = open(output_path, "a", encoding="utf-8")
+    executor = ProcessPoolExecutor(workers, mp_context=get_context("spawn"), initializer=_init_worker)
+
+    async def parse(name: str, content: bytes, key: str) -> dict:
+        # Identical bytes already parsed (or being parsed) in this run
+        if key in in_progress:
+            stats["duplicates"] += 1
+            return await in_progress[key]
+        future = loop.create_future()
+        in_progress[key] = future
+        try:
+            parsed, seconds = await loop.run_in_executor(executor, _parse_in_worker, name, content)
+            stage_seconds["parse"] += seconds
+            future.set_result(parsed)
+            return parsed
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # retrieved here; duplicates re-raise it
+            del in_progress[key]
+            raise
+
+    async def process(name: str) -> None:
+        nonlocal finished
+        async with window:
+            record = {"file": name}
+            try:
+                t = time.perf_counter()
+                content = await asyncio.to_thread(reader.read, name)
+                stage_seconds["read"] += time.perf_counter() - t
+                key = content_key(content, PARSER_VERSION, Path(name).suffix.lower().lstrip("."))
+                record["contentHash"] = key
+
+                parsed = await parse(name, content, key)
+                record["parsed"] = parsed
+                stats["parsed"] += 1
+
+                if parsed["extraction_error"]:
+                    # Extraction timed out or crashed: retried on the next run
+                    stats["failed"] += 1
+                    record["status"] = "timeout" if parsed["extraction_error"] == "timeout" else "error"
+                    record["error"] = parsed["extraction_error"]
+                elif not parsed["raw_text"].strip():
+                    # No text in the file (scanned or blank)
+                    stats["empty"] += 1
+                    record["status"] = "empty"
+                elif analyze:
+                    async with llm_slots:
+                        t = time.perf_counter()
+                        record["analysis"] = await _analyze(parsed)
+                        stage_seconds["analyze"] += time.perf_counter() - t
+                    stats["analyzed"] += 1
+                record.setdefault("status", "ok")
+            except Exception as e:
+                stats["failed"] += 1
+                record["status"] = "error"
+                record["error"] = str(e)
+
+            t = time.perf_counter()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            stage_seconds["write"] += time.perf_counter() - t
+
+            finished += 1
+            if finished % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                print(f"[BulkIngest] {finished}/{len(pending)} files, {finished / elapsed:.1f} files/s")
+
+    try:
+        await asyncio.gather(*(process(name) for name in pending))
+    finally:
+        executor.shutdown(cancel_futures=True)
+        out.close()
+        reader.close()
+
+    elapsed = time.perf_counter() - started
+    stats["elapsedSeconds"] = round(elapsed, 2)
+    stats["filesPerSecond"] = round(finished / elapsed, 2) if elapsed > 0 else 0.0
+    stats["stageSeconds"] = {stage: round(seconds, 2) for stage, seconds in stage_seconds.items()}
+    stats["avgParseMs"] = round(stage_seconds["parse"] / max(stats["parsed"] - stats["duplicates"], 1) * 1000, 1)
+    if analyze:
+        stats["avgAnalyzeMs"] = round(stage_seconds["analyze"] / max(stats["analyzed"], 1) * 1000, 1)
+    print(f"[BulkIngest] {json.dumps(stats)}")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse a directory or zip of resumes into JSONL")
+    parser.add_argument("source", help="Directory or .zip archive of resumes")
+    parser.add_argument("--out", required=True, help="JSONL output (appended; existing records are skipped)")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: all cores)")
+    parser.add_argument("--analyze", action="store_true", help="Also run the LLM resume analysis")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent LLM analyses")
+    args = parser.parse_args()
+
+    asyncio.run(run_bulk_ingest(
+        source=args.source,
+        output_path=args.out,
+        workers=args.workers,
+        analyze=args.analyze,
+        llm_concurrency=args.llm_concurrency,
+    ))
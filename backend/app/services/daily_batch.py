@@ -0,0 +1,175 @@
+"""
+Daily Batch - Nightly precompute of every active user's daily problem
+Runs the daily-problem recommender for all active users ahead of the morning
+rush and stores each result under (user_id, date), so the dashboard endpoint
+only has to read it. Work is spread over a bounded pool of workers and
+checkpointed to disk, so an interrupted run resumes where it stopped.
+
+Run once per deployment from the backend directory (e.g. from cron, shortly
+before the morning rush):
+    python -m app.services.daily_batch [--date YYYY-MM-DD]
+The in-process scheduler (settings.daily_batch_enabled) is for single-worker
+deployments only.
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.agents.question_agent import question_bank_agent
+from app.services.supabase_service import (
+    get_profile,
+    get_roadmap,
+    save_daily_assignment,
+    get_active_user_ids,
+)
+
+settings = get_settings()
+
+DEFAULT_TARGET_ROLE = "Senior Frontend Engineer"
+
+# Relative checkpoint paths are resolved here, not against the working directory
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class BatchCheckpoint:
+    """
+    Users already done for one day, persisted as JSON. Written via a temp
+    file and rename so a crash mid-write never corrupts it.
+    """
+
+    def __init__(self, path: str, day: date):
+        self.path = os.path.join(BACKEND_DIR, path) if path else path
+        self.day = day
+        self.done: set = set()
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    data = json.load(f)
+                # A checkpoint from another day is stale
+                if data.get("date") == day.isoformat():
+                    self.done = set(data.get("done", []))
+            except (OSError, ValueError) as e:
+                print(f"[DailyBatch] Ignoring unreadable checkpoint {self.path}: {e}")
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"date": self.day.isoformat(), "done": sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+
+async def _assign(user_id: str, day: date, completed: List[str]) -> None:
+    profile = await get_profile(user_id) or {}
+    roadmap = await get_roadmap(user_id) or {}
+    target_role = roadmap.get("targetRole", profile.get("targetRole", DEFAULT_TARGET_ROLE))
+
+    daily = await question_bank_agent.recommend_daily_problem(profile, target_role, completed)
+    if not daily:
+        # Nothing left to recommend; the dashboard will try again on request
+        raise Exception("No problem available")
+    daily["date"] = day.isoformat()
+    await save_daily_assignment(user_id, day, daily)
+
+
+async def run_daily_batch(
+    day: Optional[date] = None,
+    user_ids: Optional[List[str]] = None,
+    completed_problems: Optional[Dict[str, List[str]]] = None,
+    concurrency: Optional[int] = None,
+    checkpoint_path: Optional[str] = None,
+) -> dict:
+    """
+    Precompute `day`'s assignment (default: today) for every active user, or
+    for `user_ids` if given. completed_problems maps user_id -> solved
+    problem titles. Returns counts and timings for the run.
+    """
+    day = day or date.today()
+    concurrency = concurrency or settings.daily_batch_concurrency
+    checkpoint = BatchCheckpoint(
+        settings.daily_batch_checkpoint_path if checkpoint_path is None else checkpoint_path, day
+    )
+    completed_problems = completed_problems or {}
+
+    if user_ids is None:
+        user_ids = await get_active_user_ids(day - timedelta(days=settings.daily_batch_active_days))
+    pending = [u for u in user_ids if u not in checkpoint.done]
+
+    stats = {
+        "date": day.isoformat(),
+        "users": len(user_ids),
+        "resumed": len(user_ids) - len(pending),
+        "assigned": 0,
+        "failed": 0,
+    }
+    started = time.perf_counter()
+    queue: asyncio.Queue = asyncio.Queue()
+    for user_id in pending:
+        queue.put_nowait(user_id)
+
+    async def worker() -> None:
+        while True:
+            try:
+                user_id = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                await _assign(user_id, day, completed_problems.get(user_id, []))
+                stats["assigned"] += 1
+                checkpoint.done.add(user_id)
+                if stats["assigned"] % settings.daily_batch_checkpoint_every == 0:
+                    checkpoint.save()
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"[DailyBatch] Failed to assign {user_id}: {e}")
+
+    try:
+        await asyncio.gather(*(worker() for _ in range(min(concurrency, len(pending)) or 1)))
+    finally:
+        # Also runs on cancellation, so a restart skips what already finished
+        checkpoint.save()
+
+    stats["elapsedSeconds"] = round(time.perf_counter() - started, 2)
+    print(f"[DailyBatch] {json.dumps(stats)}")
+    return stats
+
+
+def _seconds_until(hour: int) -> float:
+    now = datetime.now()
+    next_run = now.replace(hour=hour, minute=0, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+async def daily_batch_scheduler(completed_problems: Optional[Dict[str, List[str]]] = None) -> None:
+    """
+    Run the batch every night at settings.daily_batch_hour (server local
+    time) for the day that is starting. Runs until cancelled.
+    """
+    while True:
+        await asyncio.sleep(_seconds_until(settings.daily_batch_hour))
+        try:
+            await run_daily_batch(completed_problems=completed_problems)
+        except Exception as e:
+            print(f"[DailyBatch] Run failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute daily problem assignments")
+    parser.add_argument("--date", help="Day to precompute (YYYY-MM-DD), default today")
+    parser.add_argument("--concurrency", type=int, default=None)
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default from settings)")
+    args = parser.parse_args()
+
+    asyncio.run(run_daily_batch(
+        day=date.fromisoformat(args.date) if args.date else None,
+        concurrency=args.concurrency,
+        checkpoint_path=args.checkpoint,
+    ))
@@ -0,0 +1,275 @@
+"""
+Extraction Pool - Managed worker processes for PDF/DOCX text extraction
+The PDF and DOCX libraries are CPU-bound and synchronous; run on the event
+loop, one large scanned PDF stalls every request in the worker. Documents
+are handed to a fixed set of long-lived worker processes instead. Each
+document gets a timeout, each worker a memory cap, and a worker that hangs,
+dies or overruns is killed and replaced. Requests wait in a queue for a free
+worker; queue wait, saturation and per-backend latency and text quality
+are tracked for /health/extraction.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from multiprocessing import reduction
+from typing import Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.text_extraction import EXTRACTORS, Source
+
+try:
+    import resource
+except ImportError:  # not on Windows: no memory cap
+    resource = None
+
+settings = get_settings()
+
+
+def _worker_main(conn, memory_limit_mb: int) -> None:
+    """
+    Worker process loop: receive (kind, content, options), send back
+    (ok, (text, attempts) | error). A file descriptor as content is
+    followed by the descriptor itself, passed over the pipe.
+    """
+    if memory_limit_mb and resource is not None:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        kind, content, options = job
+        if isinstance(content, int):
+            content = reduction.recv_handle(conn)
+        try:
+            conn.send((True, EXTRACTORS[kind](content, **options)))
+        except MemoryError:
+            conn.send((False, f"exceeded the {memory_limit_mb} MB memory limit"))
+        except Exception as e:
+            conn.send((False, str(e)))
+        finally:
+            if isinstance(content, int):
+                os.close(content)
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe."""
+
+    def __init__(self, context, memory_limit_mb: int):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(
+            target=_worker_main, args=(child_conn, memory_limit_mb), daemon=True
+        )
+        self.process.start()
+        child_conn.close()
+
+    def call(self, kind: str, content: Source, options: dict, timeout: float) -> tuple:
+        """Blocking round trip; run it in a thread."""
+        self.conn.send((kind, content, options))
+        if isinstance(content, int):
+            reduction.send_handle(self.conn, content, self.process.pid)
+        if not self.conn.poll(timeout):
+            raise TimeoutError(f"{kind} extraction took longer than {timeout:g}s")
+        try:
+            ok, value = self.conn.recv()
+        except EOFError:
+            raise Exception(f"extraction worker exited with code {self.process.exitcode}")
+        if not ok:
+            raise Exception(value)
+        return value
+
+    def kill(self) -> None:
+        self.process.kill()
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=2)
+        if self.process.is_alive():
+            self.process.kill()
+        self.conn.close()
+
+
+class ExtractionPool:
+    """
+    Fixed-size pool of extraction workers, started on first use.
+    run() waits (without blocking the loop) for an idle worker, sends it the
+    document and awaits the text.
+    """
+
+    def __init__(self, size: int, timeout: float, memory_limit_mb: int):
+        self.size = size
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        # Spawned workers do not inherit the server's event loop or threads
+        self._context = multiprocessing.get_context("spawn")
+        self._workers: List[_Worker] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._stats = {
+            "jobs": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "workerRestarts": 0,
+            "queueWaitSeconds": 0.0,
+            "maxQueueWaitSeconds": 0.0,
+            "extractSeconds": 0.0,
+        }
+        self._waiting = 0
+        # Per extraction backend: attempts, times chosen, stopped by the page
+        # budget, latency and quality
+        self._backends: Dict[str, dict] = {}
+
+    async def _start(self) -> None:
+        for _ in range(self.size):
+            worker = await asyncio.to_thread(_Worker, self._context, self.memory_limit_mb)
+            self._workers.append(worker)
+            self._idle.put_nowait(worker)
+
+    async def _replace(self, worker: _Worker) -> None:
+        """
+        Kill `worker` and put a fresh one on the idle queue. Killing joins
+        the process and starting one spawns an interpreter, so both run in
+        a thread. Should spawning fail, the dead worker goes back instead
+        and the next job that gets it tries again.
+        """
+        replacement = worker
+        try:
+            await asyncio.to_thread(worker.kill)
+            replacement = await asyncio.to_thread(_Worker, self._context, self.memory_limit_mb)
+            self._workers[self._workers.index(worker)] = replacement
+            self._stats["workerRestarts"] += 1
+        except Exception as e:
+            print(f"Extraction worker restart failed: {e}")
+        finally:
+            self._idle.put_nowait(replacement)
+
+    def _record_attempts(self, attempts: List[dict]) -> None:
+        for attempt in attempts:
+            stats = self._backends.setdefault(attempt["backend"], {
+                "attempts": 0, "selected": 0, "errors": 0, "truncated": 0, "seconds": 0.0, "quality": 0.0,
+            })
+            stats["attempts"] += 1
+            stats["selected"] += attempt["selected"]
+            stats["errors"] += attempt["error"] is not None
+            stats["truncated"] += attempt["truncated"] is not None
+            stats["seconds"] += attempt["seconds"]
+            stats["quality"] += attempt["quality"]
+
+    async def run(self, kind: str, content: Source, **options) -> Tuple[str, List[dict]]:
+        """
+        (text, attempts) of a `kind` ("pdf" or "docx") document, given as
+        bytes, a file path or an open file descriptor (only the path or a
+        duplicate of the descriptor crosses the pipe); `options` go to the
+        extractor. Raises on timeout or worker failure.
+        """
+        self._stats["jobs"] += 1
+        if self.size <= 0:
+            # Pool disabled: still keep the event loop free
+            started = time.perf_counter()
+            text, attempts = await asyncio.to_thread(EXTRACTORS[kind], content, **options)
+            self._stats["completed"] += 1
+            self._stats["extractSeconds"] += time.perf_counter() - started
+            self._record_attempts(attempts)
+            return text, attempts
+
+        if self._idle is None:
+            # The queue exists before the workers do, so concurrent first jobs
+            # wait on it; shielded so a cancelled first job still starts them all
+            self._idle = asyncio.Queue()
+            await asyncio.shield(self._start())
+
+        queued = time.perf_counter()
+        self._waiting += 1
+        try:
+            worker = await self._idle.get()
+        finally:
+            self._waiting -= 1
+        waited = time.perf_counter() - queued
+        self._stats["queueWaitSeconds"] += waited
+        self._stats["maxQueueWaitSeconds"] = max(self._stats["maxQueueWaitSeconds"], waited)
+
+        started = time.perf_counter()
+        replace = False
+        try:
+            text, attempts = await asyncio.to_thread(worker.call, kind, content, options, self.timeout)
+        except TimeoutError:
+            self._stats["timeouts"] += 1
+            self._stats["failed"] += 1
+            replace = True
+            raise
+        except asyncio.CancelledError:
+            # The worker may still be busy with this document
+            replace = True
+            raise
+        except Exception:
+            self._stats["failed"] += 1
+            replace = not worker.process.is_alive()
+            raise
+        finally:
+            self._stats["extractSeconds"] += time.perf_counter() - started
+            if replace:
+                # Shielded so a second cancellation cannot lose the worker slot
+                await asyncio.shield(self._replace(worker))
+            else:
+                self._idle.put_nowait(worker)
+
+        self._stats["completed"] += 1
+        self._record_attempts(attempts)
+        return text, attempts
+
+    def shutdown(self) -> None:
+        for worker in self._workers:
+            worker.stop()
+        self._workers = []
+        self._idle = None
+
+    def get_stats(self) -> dict:
+        busy = self.size - self._idle.qsize() if self._idle is not None else 0
+        finished = self._stats["completed"] + self._stats["failed"]
+        return {
+            "size": self.size,
+            "busy": busy,
+            "queued": self._waiting,
+            "saturation": round(busy / self.size, 2) if self.size > 0 else 0.0,
+            "timeoutSeconds": self.timeout,
+            "memoryLimitMb": self.memory_limit_mb,
+            **{k: v for k, v in self._stats.items() if not k.endswith("Seconds")},
+            "avgQueueWaitMs": round(self._stats["queueWaitSeconds"] / max(self._stats["jobs"], 1) * 1000, 1),
+            "maxQueueWaitMs": round(self._stats["maxQueueWaitSeconds"] * 1000, 1),
+            "avgExtractMs": round(self._stats["extractSeconds"] / max(finished, 1) * 1000, 1),
+            "backends": {
+                name: {
+                    "attempts": b["attempts"],
+                    "selected": b["selected"],
+                    "errors": b["errors"],
+                    "truncated": b["truncated"],
+                    "avgMs": round(b["seconds"] / b["attempts"] * 1000, 1),
+                    "avgQuality": round(b["quality"] / b["attempts"], 3),
+                }
+                for name, b in self._backends.items()
+            },
+        }
+
+
+_pool: Optional[ExtractionPool] = None
+
+
+def get_extraction_pool() -> ExtractionPool:
+    """Shared pool sized from settings; worker processes start on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ExtractionPool(
+            size=settings.extraction_pool_size,
+            timeout=settings.extraction_timeout_seconds,
+            memory_limit_mb=settings.extraction_memory_limit_mb,
+        )
+    return _pool
@@ -0,0 +1,137 @@
+"""
+Incremental JSON helpers for streamed LLM output
+Pulls finished elements of a top-level array (e.g. roadmap "weeks") out of a
+JSON document while it is still being generated.
+"""
+import json
+from typing import Any, List, Optional
+
+
+class JsonArrayStreamer:
+    """
+    Incremental scanner for one array inside the root object of a JSON document.
+
+    feed() takes the next text chunk and returns every element of the target
+    array that was completed by it, already parsed. The scanner only tracks
+    string/escape state and nesting depth, so each character is looked at once
+    no matter how the text is chunked.
+
+        streamer = JsonArrayStreamer("weeks")
+        for chunk in chunks:
+            for week in streamer.feed(chunk):
+                ...
+    """
+
+    def __init__(self, array_key: str):
+        self.array_key = array_key
+        self._chunks: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._root_string: List[str] = []
+        self._last_root_string = None
+        self._in_array = False
+        self._item: List[str] = []
+        self._in_item = False
+        self.items_emitted = 0
+
+    @property
+    def text(self) -> str:
+        """Everything fed so far."""
+        return "".join(self._chunks)
+
+    def feed(self, chunk: str) -> List[Any]:
+        completed = []
+        if not chunk:
+            return completed
+        self._chunks.append(chunk)
+
+        for ch in chunk:
+            if self._in_item:
+                self._item.append(ch)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_root_string = "".join(self._root_string)
+                elif self._depth == 1:
+                    self._root_string.append(ch)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._root_string = []
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and self._last_root_string == self.array_key:
+                    self._in_array = True
+                elif ch == "{" and self._in_array and self._depth == 2:
+                    self._in_item = True
+                    self._item = [ch]
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._in_item and self._depth == 2:
+                    self._in_item = False
+                    try:
+                        completed.append(json.loads("".join(self._item)))
+                        self.items_emitted += 1
+                    except json.JSONDecodeError:
+                        pass
+                elif self._in_array and self._depth == 1:
+                    self._in_array = False
+
+        return completed
+
+
+def parse_truncated_json(text: str) -> Optional[Any]:
+    """
+    Parse the longest valid prefix of a JSON document that was cut off mid-way
+    (e.g. a completion that stopped at max_tokens).
+
+    The text is cut back to the last point where a value was complete - just
+    before a separating comma, just after a closing bracket, or just after an
+    opening one - and every container still open there is closed. Returns None
+    if not even the root container was opened.
+    """
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    safe_end = -1
+    safe_closers = ""
+
+    for i, ch in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            safe_end, safe_closers = i + 1, "".join(reversed(stack))
+        elif ch in "}]":
+            if not stack:
+                break
+            stack.pop()
+            safe_end, safe_closers = i + 1, "".join(reversed(stack))
+            if not stack:
+                break
+        elif ch == "," and stack:
+            safe_end, safe_closers = i, "".join(reversed(stack))
+
+    if safe_end < 0:
+        return None
+    try:
+        return json.loads(text[:safe_end] + safe_closers)
+    except json.JSONDecodeError:
+        return None
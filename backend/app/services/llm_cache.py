@@ -0,0 +1,184 @@
+"""
+LLM Response Cache - Content-addressed cache for chat completions
+Bounded in-memory LRU tier with per-entry TTL, plus an optional SQLite tier
+that survives restarts and is shared between workers on the same host.
+"""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any
+
+from app.config import get_settings
+
+settings = get_settings()
+
+
+def make_cache_key(model: str, messages: list, temperature: Optional[float], response_format: Optional[dict]) -> str:
+    """
+    Hash of everything that determines the completion.
+    Keys are stable across processes (sorted JSON, no Python hash randomisation).
+    """
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "response_format": response_format,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _DiskTier:
+    """SQLite-backed persistent tier. All calls are blocking; run them off the event loop."""
+
+    def __init__(self, path: str, table: str = "llm_cache"):
+        self._table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self._table} WHERE key = ?", (key,)
+            ).fetchone()
+            if not row:
+                return None
+            if row[1] < time.time():
+                self._conn.execute(f"DELETE FROM {self._table} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return {"value": json.loads(row[0]), "expires_at": row[1]}
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(f"DELETE FROM {self._table} WHERE expires_at < ?", (time.time(),))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table}")
+            self._conn.commit()
+
+
+class LLMCache:
+    """
+    Two-tier cache for LLM responses.
+    - Memory tier: OrderedDict LRU bounded by max_entries, entries expire by TTL
+    - Disk tier (optional): SQLite file, consulted on memory miss and promoted on hit
+    Hit/miss counters are kept per calling function.
+    """
+
+    def __init__(self, max_entries: int = 1024, disk_path: str = "", table: str = "llm_cache"):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._disk: Optional[_DiskTier] = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        if disk_path:
+            try:
+                self._disk = _DiskTier(disk_path, table)
+            except Exception as e:
+                print(f"{table} disk tier disabled: {e}")
+
+    def _count(self, caller: str, field: str) -> None:
+        stats = self._stats.setdefault(
+            caller, {"hits": 0, "memoryHits": 0, "diskHits": 0, "misses": 0, "stores": 0}
+        )
+        stats[field] += 1
+
+    def _remember(self, key: str, value: Any, expires_at: float) -> None:
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str, caller: str = "unknown") -> Optional[Any]:
+        """Return the cached value or None. Memory first, then disk."""
+        entry = self._memory.get(key)
+        if entry is not None:
+            value, expires_at = entry
+            if expires_at >= time.time():
+                self._memory.move_to_end(key)
+                self._count(caller, "hits")
+                self._count(caller, "memoryHits")
+                return value
+            del self._memory[key]
+
+        if self._disk:
+            try:
+                disk_entry = await asyncio.to_thread(self._disk.get, key)
+            except Exception as e:
+                print(f"LLM cache disk read failed: {e}")
+                disk_entry = None
+            if disk_entry is not None:
+                self._remember(key, disk_entry["value"], disk_entry["expires_at"])
+                self._count(caller, "hits")
+                self._count(caller, "diskHits")
+                return disk_entry["value"]
+
+        self._count(caller, "misses")
+        return None
+
+    async def set(self, key: str, value: Any, ttl: float, caller: str = "unknown") -> None:
+        """Store a JSON-serialisable value for ttl seconds in every tier."""
+        expires_at = time.time() + ttl
+        self._remember(key, value, expires_at)
+        self._count(caller, "stores")
+
+        if self._disk:
+            try:
+                await asyncio.to_thread(self._disk.set, key, value, expires_at)
+            except Exception as e:
+                print(f"LLM cache disk write failed: {e}")
+
+    def clear(self) -> None:
+        self._memory.clear()
+        if self._disk:
+            self._disk.clear()
+
+    def get_stats(self) -> dict:
+        """Hit/miss counters per caller plus tier sizes."""
+        per_function = {}
+        for caller, stats in self._stats.items():
+            lookups = stats["hits"] + stats["misses"]
+            per_function[caller] = {
+                **stats,
+                "hitRate": round(stats["hits"] / lookups, 3) if lookups else 0.0,
+            }
+        return {
+            "memoryEntries": len(self._memory),
+            "maxEntries": self.max_entries,
+            "diskEnabled": self._disk is not None,
+            "functions": per_function,
+        }
+
+
+# Singleton instance
+llm_cache = LLMCache(
+    max_entries=settings.llm_cache_max_entries,
+    disk_path=settings.llm_cache_path,
+)
@@ -0,0 +1,246 @@
+"""
+LLM Metrics - Per-call telemetry for OpenAI chat completions
+Records wall time, queue time, token usage, finish reason, cache outcome and
+estimated cost for every call, labelled by the calling function. Exposed as
+Prometheus counters/histograms, as a JSON summary, and (with
+llm_call_logging on) as one JSON log line per call.
+"""
+import bisect
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+# USD per 1M tokens: (prompt, completion). Unknown models are counted as free.
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+@dataclass
+class LLMCall:
+    """
+    Telemetry for one chat completion, filled in as the call progresses and
+    handed to llm_metrics.observe() when it ends.
+
+    cache:  "hit" (served from llm_cache), "coalesced" (shared another caller's
+            in-flight request) or "miss" (this call went to OpenAI)
+    status: "ok", "error", "timeout", "rate_limited" or "cancelled"
+    """
+    caller: str
+    model: str
+    started: float = field(default_factory=time.perf_counter)
+    queue_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    finish_reason: Optional[str] = None
+    cache: str = "miss"
+    status: str = "ok"
+    streamed: bool = False
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+            lower = self.buckets[i] if i < len(self.buckets) else lower
+        return self.buckets[-1]
+
+
+def _labels(**labels) -> str:
+    """Render a Prometheus label set, escaping backslashes and quotes."""
+    escaped = {k: str(v).replace("\\", "\\\\").replace('"', '\\"') for k, v in labels.items()}
+    return ",".join(f'{k}="{v}"' for k, v in escaped.items())
+
+
+class LLMMetrics:
+    """In-process registry of LLM call counters and histograms."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        # (caller, model, cache, status, finish_reason) -> count
+        self._requests: Dict[Tuple[str, str, str, str, str], int] = {}
+        # (caller, model, cache) -> wall time histogram
+        self._duration: Dict[Tuple[str, str, str], Histogram] = {}
+        # (caller, model) -> queue wait histogram
+        self._queue: Dict[Tuple[str, str], Histogram] = {}
+        # (caller, model) -> [prompt tokens, completion tokens, cost usd]
+        self._usage: Dict[Tuple[str, str], List[float]] = {}
+
+    def observe(self, call: LLMCall) -> None:
+        """Record a finished call and, if llm_call_logging is on, print its structured log line."""
+        wall = time.perf_counter() - call.started
+        finish_reason = call.finish_reason or "none"
+
+        request_key = (call.caller, call.model, call.cache, call.status, finish_reason)
+        self._requests[request_key] = self._requests.get(request_key, 0) + 1
+        self._duration.setdefault((call.caller, call.model, call.cache), Histogram()).observe(wall)
+
+        cost = 0.0
+        if call.cache == "miss":
+            self._queue.setdefault((call.caller, call.model), Histogram()).observe(call.queue_seconds)
+            cost = estimate_cost(call.model, call.prompt_tokens, call.completion_tokens)
+            usage = self._usage.setdefault((call.caller, call.model), [0, 0, 0.0])
+            usage[0] += call.prompt_tokens
+            usage[1] += call.completion_tokens
+            usage[2] += cost
+
+        if settings.llm_call_logging:
+            print(json.dumps({
+                "event": "llm_call",
+                "caller": call.caller,
+                "model": call.model,
+                "status": call.status,
+                "cache": call.cache,
+                "finishReason": call.finish_reason,
+                "streamed": call.streamed,
+                "wallMs": round(wall * 1000, 1),
+                "queueMs": round(call.queue_seconds * 1000, 1),
+                "promptTokens": call.prompt_tokens,
+                "completionTokens": call.completion_tokens,
+                "costUsd": round(cost, 6),
+            }))
+
+    def get_stats(self) -> dict:
+        """Per-caller summary: call counts, latency percentiles, tokens, truncations and spend."""
+        callers: Dict[str, dict] = {}
+
+        def entry(caller: str) -> dict:
+            return callers.setdefault(caller, {
+                "calls": 0,
+                "errors": 0,
+                "cacheHits": 0,
+                "coalesced": 0,
+                "truncated": 0,
+                "promptTokens": 0,
+                "completionTokens": 0,
+                "costUsd": 0.0,
+            })
+
+        for (caller, _, cache, status, finish_reason), n in self._requests.items():
+            stats = entry(caller)
+            stats["calls"] += n
+            if status != "ok":
+                stats["errors"] += n
+            if cache == "hit":
+                stats["cacheHits"] += n
+            elif cache == "coalesced":
+                stats["coalesced"] += n
+            if finish_reason == "length":
+                stats["truncated"] += n
+
+        for (caller, _), (prompt, completion, cost) in self._usage.items():
+            stats = entry(caller)
+            stats["promptTokens"] += int(prompt)
+            stats["completionTokens"] += int(completion)
+            stats["costUsd"] = round(stats["costUsd"] + cost, 6)
+
+        for caller, stats in callers.items():
+            # Latency of calls that actually went to OpenAI
+            merged = Histogram()
+            for (c, _, cache), histogram in self._duration.items():
+                if c == caller and cache == "miss":
+                    merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                    merged.count += histogram.count
+                    merged.sum += histogram.sum
+            stats["latencyMs"] = {
+                "p50": round(merged.quantile(0.50) * 1000, 1),
+                "p95": round(merged.quantile(0.95) * 1000, 1),
+                "p99": round(merged.quantile(0.99) * 1000, 1),
+                "avg": round(merged.sum / merged.count * 1000, 1) if merged.count else 0.0,
+            }
+
+        return callers
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition of every counter and histogram."""
+        lines = [
+            "# HELP llm_requests_total Chat completion calls by caller, cache outcome, status and finish reason.",
+            "# TYPE llm_requests_total counter",
+        ]
+        for (caller, model, cache, status, finish_reason), n in sorted(self._requests.items()):
+            labels = _labels(caller=caller, model=model, cache=cache, status=status, finish_reason=finish_reason)
+            lines.append(f"llm_requests_total{{{labels}}} {n}")
+
+        lines += [
+            "# HELP llm_tokens_total Tokens billed by OpenAI, by caller and kind.",
+            "# TYPE llm_tokens_total counter",
+        ]
+        for (caller, model), (prompt, completion, _) in sorted(self._usage.items()):
+            lines.append(f"llm_tokens_total{{{_labels(caller=caller, model=model, kind='prompt')}}} {int(prompt)}")
+            lines.append(f"llm_tokens_total{{{_labels(caller=caller, model=model, kind='completion')}}} {int(completion)}")
+
+        lines += [
+            "# HELP llm_cost_usd_total Estimated spend in USD from MODEL_PRICING.",
+            "# TYPE llm_cost_usd_total counter",
+        ]
+        for (caller, model), (_, _, cost) in sorted(self._usage.items()):
+            lines.append(f"llm_cost_usd_total{{{_labels(caller=caller, model=model)}}} {cost:.6f}")
+
+        lines += self._render_histograms(
+            "llm_request_duration_seconds",
+            "Wall time of chat completion calls, including queueing.",
+            {_labels(caller=c, model=m, cache=k): h for (c, m, k), h in self._duration.items()},
+        )
+        lines += self._render_histograms(
+            "llm_queue_wait_seconds",
+            "Time spent waiting for rate scheduler admission.",
+            {_labels(caller=c, model=m): h for (c, m), h in self._queue.items()},
+        )
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(name: str, help_text: str, histograms: Dict[str, Histogram]) -> List[str]:
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for labels, histogram in sorted(histograms.items()):
+            cumulative = 0
+            for bound, n in zip(histogram.buckets, histogram.counts):
+                cumulative += n
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+            lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+        return lines
+
+
+# Singleton instance
+llm_metrics = LLMMetrics()
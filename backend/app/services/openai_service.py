@@ -1,25 +1,272 @@
+import asyncio
 import json
-from openai import OpenAI
+import math
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+from openai import AsyncOpenAI, RateLimitError
 from app.config import get_settings
+from app.services.llm_cache import llm_cache, make_cache_key
+from app.services.llm_metrics import llm_metrics, LLMCall
+from app.services.single_flight import SingleFlight
+from app.services.json_stream import JsonArrayStreamer, parse_truncated_json
+from app.services.resume_merge import merge_resume_extractions
+from app.services.skill_fingerprint import skill_fingerprint
+from app.services.token_budget import (
+    count_tokens,
+    chunk_sections,
+    fit_items,
+    estimate_roadmap_output_tokens,
+)
+from app.services.rate_scheduler import (
+    rate_scheduler,
+    estimate_tokens,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_DEFAULT,
+    PRIORITY_BACKGROUND,
+)
 
 settings = get_settings()
 
-client = OpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+# Overall deadline (seconds) for each caller, including client-side retries.
+# Anything not listed falls back to settings.openai_timeout_seconds.
+LLM_TIMEOUTS = {
+    "extract_skills_from_resume": 90.0,
+    "extract_skills_from_resume_chunk": 90.0,
+    "generate_roadmap": 120.0,
+    "generate_comprehensive_roadmap": 240.0,
+    "generate_roadmap_overview": 60.0,
+    "generate_roadmap_week": 90.0,
+    "continue_comprehensive_roadmap": 240.0,
+    "explain_role_matches": 30.0,
+    "generate_bonus_topics": 45.0,
+    "explain_daily_problem": 30.0,
+}
+
+# How long (seconds) an identical prompt may be answered from the cache.
+# Callers not listed are never cached.
+LLM_CACHE_TTLS = {
+    "extract_skills_from_resume": 24 * 3600,
+    "extract_skills_from_resume_chunk": 24 * 3600,
+    "generate_roadmap": 3600,
+    "generate_comprehensive_roadmap": 3600,
+    "generate_roadmap_overview": 3600,
+    "generate_roadmap_week": 3600,
+    "explain_role_matches": 6 * 3600,
+    "generate_bonus_topics": 3600,
+    "explain_daily_problem": 12 * 3600,
+}
+
+# Admission priority when the rate scheduler has a queue.
+# Callers not listed run at PRIORITY_DEFAULT.
+LLM_PRIORITIES = {
+    "extract_skills_from_resume": PRIORITY_INTERACTIVE,
+    "extract_skills_from_resume_chunk": PRIORITY_INTERACTIVE,
+    "explain_role_matches": PRIORITY_INTERACTIVE,
+    "generate_roadmap": PRIORITY_DEFAULT,
+    "generate_comprehensive_roadmap": PRIORITY_DEFAULT,
+    "generate_roadmap_overview": PRIORITY_DEFAULT,
+    "generate_roadmap_week": PRIORITY_DEFAULT,
+    "continue_comprehensive_roadmap": PRIORITY_DEFAULT,
+    "explain_daily_problem": PRIORITY_DEFAULT,
+    "generate_bonus_topics": PRIORITY_BACKGROUND,
+}
+
+
+# Retry-After sent to clients on a 429 from OpenAI that did not include one
+DEFAULT_RETRY_AFTER_SECONDS = 10
+
+
+def retry_after_seconds(error: RateLimitError) -> int:
+    """Seconds clients should wait after `error`: OpenAI's Retry-After when present."""
+    try:
+        return max(1, math.ceil(float(error.response.headers["retry-after"])))
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER_SECONDS
+
+
+# Overrides LLM_PRIORITIES for every call made in the current context
+# (including tasks it spawns); used to push speculative work to the back
+_priority_override: ContextVar[Optional[int]] = ContextVar("llm_priority_override", default=None)
+
+
+@contextmanager
+def llm_priority(priority: int) -> Iterator[None]:
+    """Run the LLM calls made inside this block at `priority`."""
+    token = _priority_override.set(priority)
+    try:
+        yield
+    finally:
+        _priority_override.reset(token)
+
 
+def _priority_for(caller: str) -> int:
+    override = _priority_override.get()
+    return override if override is not None else LLM_PRIORITIES.get(caller, PRIORITY_DEFAULT)
 
-async def extract_skills_from_resume(resume_text: str) -> dict:
+
+def _build_client() -> Optional[AsyncOpenAI]:
     """
-    Use GPT-4o-mini to extract comprehensive profile data from resume text.
-    This includes skills with proficiency levels, projects, achievements, certifications, etc.
+    Create the shared async OpenAI client with a pooled HTTP transport.
+    One client per process so every request reuses the same keep-alive connections.
     """
-    if not client:
-        # Return mock data if no API key
-        return get_mock_skill_graph()
-    
-    # Truncate resume text to avoid token limits (max ~15000 chars for safety)
-    truncated_resume = resume_text[:15000] if len(resume_text) > 15000 else resume_text
-    
-    prompt = f"""You are an expert resume analyzer. Analyze the following resume text and extract ALL relevant information.
+    if not settings.openai_api_key:
+        return None
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+        ),
+        timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=10.0),
+    )
+    return AsyncOpenAI(
+        api_key=settings.openai_api_key,
+        max_retries=settings.openai_max_retries,
+        http_client=http_client,
+    )
+
+
+client = _build_client()
+
+_llm_flight = SingleFlight("openai")
+
+
+async def close_client() -> None:
+    """Close the pooled HTTP connections (called on app shutdown)."""
+    if client:
+        await client.close()
+
+
+@dataclass
+class ChatResult:
+    """The parts of a chat completion the service uses; small enough to cache."""
+    content: str
+    finish_reason: Optional[str]
+    cached: bool = False
+
+
+async def _chat_completion(caller: str, cache_key: Optional[str] = None, **kwargs) -> ChatResult:
+    """
+    Run a chat completion on the shared async client without blocking the event loop.
+    The whole call (retries included) is bounded by the caller's deadline; if the
+    request task is cancelled (e.g. client disconnects) the HTTP call is cancelled too.
+    Responses for callers with a TTL in LLM_CACHE_TTLS are served from llm_cache.
+    Every call, cached or not, is recorded in llm_metrics under `caller`.
+
+    cache_key replaces the user prompt in the cache/coalescing key, so callers
+    whose prompts differ only cosmetically (e.g. skill order or casing) can pass
+    a canonical fingerprint and share one answer. The system prompt still
+    takes part in the key.
+    """
+    kwargs.setdefault("model", settings.openai_model)
+    cache_ttl = LLM_CACHE_TTLS.get(caller, 0) if settings.llm_cache_enabled else 0
+    key_messages = kwargs.get("messages", [])
+    if cache_key:
+        key_messages = [m for m in key_messages if m.get("role") == "system"]
+        key_messages.append({"role": "fingerprint", "content": f"{caller}:{cache_key}"})
+    key = make_cache_key(
+        kwargs["model"],
+        key_messages,
+        kwargs.get("temperature"),
+        kwargs.get("response_format"),
+    )
+
+    call = LLMCall(caller, kwargs["model"])
+    try:
+        if cache_ttl:
+            cached = await llm_cache.get(key, caller)
+            if cached is not None:
+                call.cache = "hit"
+                call.finish_reason = cached["finish_reason"]
+                return ChatResult(content=cached["content"], finish_reason=cached["finish_reason"], cached=True)
+
+        # Identical prompts already on the wire are awaited rather than re-sent;
+        # the call counts as coalesced unless our own request is the one that runs
+        call.cache = "coalesced"
+        result = await _llm_flight.do(key, lambda: _request_completion(caller, key, cache_ttl, kwargs, call))
+        call.finish_reason = result.finish_reason
+        return result
+    except asyncio.CancelledError:
+        call.status = "cancelled"
+        raise
+    except RateLimitError:
+        call.status = "rate_limited"
+        raise
+    except Exception:
+        if call.status == "ok":
+            call.status = "error"
+        raise
+    finally:
+        llm_metrics.observe(call)
+
+
+async def _request_completion(caller: str, key: str, cache_ttl: float, kwargs: dict, call: LLMCall) -> ChatResult:
+    timeout = LLM_TIMEOUTS.get(caller, settings.openai_timeout_seconds)
+    model = kwargs["model"]
+    call.cache = "miss"
+
+    # Wait for RPM/TPM budget; interactive callers jump ahead of background ones
+    estimated_tokens = estimate_tokens(kwargs.get("messages", []), kwargs.get("max_tokens"), model)
+    call.queue_seconds = await rate_scheduler.acquire(
+        model,
+        estimated_tokens,
+        _priority_for(caller),
+    )
+
+    # Tokens actually used; calls that fail or report no usage refund the
+    # whole reservation
+    used_tokens = 0
+    try:
+        try:
+            response = await asyncio.wait_for(
+                client.chat.completions.create(timeout=timeout, **kwargs),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            call.status = "timeout"
+            raise Exception(f"OpenAI request for {caller} timed out after {timeout:.0f}s")
+        except RateLimitError:
+            rate_scheduler.penalize(model)
+            raise
+
+        if response.usage:
+            used_tokens = response.usage.total_tokens
+            call.prompt_tokens = response.usage.prompt_tokens
+            call.completion_tokens = response.usage.completion_tokens
+    finally:
+        rate_scheduler.release(model, estimated_tokens, used_tokens)
+
+    choice = response.choices[0]
+    result = ChatResult(content=choice.message.content, finish_reason=choice.finish_reason)
+
+    # Only complete answers are worth replaying
+    if cache_ttl and result.finish_reason == "stop" and result.content:
+        await llm_cache.set(
+            key,
+            {"content": result.content, "finish_reason": result.finish_reason},
+            cache_ttl,
+            caller,
+        )
+
+    return result
+
+
+RESUME_ANALYSIS_SYSTEM_PROMPT = """You are an expert resume analyzer and career coach with deep knowledge of tech industry skills and roles.
+Your task is to extract comprehensive profile data from resumes.
+- Be thorough - extract EVERY skill, project, and achievement mentioned
+- Assess skill levels intelligently based on context, not just keywords
+- If experience years are mentioned, use them to inform skill levels
+- If certifications exist, boost related skill levels
+- Identify connections between related skills (e.g., React connects to JavaScript)
+- Always respond with valid JSON matching the exact structure requested."""
+
+
+def _build_resume_analysis_prompt(resume_text: str, part_note: str = "") -> str:
+    return f"""You are an expert resume analyzer. Analyze the following resume text and extract ALL relevant information.
 Your job is to:
 1. Identify ALL technical and soft skills mentioned or implied
 2. Assess proficiency level (0-100) based on context clues like years of experience, project complexity, certifications
@@ -35,8 +282,8 @@ IMPORTANT:
 - A skill with certifications = +10-20 boost
 - A skill used in multiple projects = higher level
 
-Resume Text:
-{truncated_resume}
+{part_note}Resume Text:
+{resume_text}
 
 Respond with this EXACT JSON structure:
 {{
@@ -103,52 +350,106 @@ Respond with this EXACT JSON structure:
 }}
 """
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert resume analyzer and career coach with deep knowledge of tech industry skills and roles.
-Your task is to extract comprehensive profile data from resumes.
-- Be thorough - extract EVERY skill, project, and achievement mentioned
-- Assess skill levels intelligently based on context, not just keywords
-- If experience years are mentioned, use them to inform skill levels
-- If certifications exist, boost related skill levels
-- Identify connections between related skills (e.g., React connects to JavaScript)
-- Always respond with valid JSON matching the exact structure requested.""",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.5,  # Lower temperature for more consistent extraction
-            max_tokens=4000,
+
+def _apply_extraction_defaults(result: dict) -> dict:
+    """Ensure all required fields exist with defaults."""
+    result.setdefault("skills", [])
+    result.setdefault("projects", [])
+    result.setdefault("achievements", [])
+    result.setdefault("certifications", [])
+    result.setdefault("experience", [])
+    result.setdefault("education", [])
+    result.setdefault("summary", "")
+    result.setdefault("strongestSkills", [])
+    result.setdefault("skillGaps", [])
+    result.setdefault("totalYearsExperience", 0)
+    result.setdefault("seniorityLevel", "Entry")
+
+    # Ensure each skill has required fields
+    for i, skill in enumerate(result["skills"]):
+        skill.setdefault("id", str(i + 1))
+        skill.setdefault("level", 50)
+        skill.setdefault("category", "Other")
+        skill.setdefault("connections", [])
+        skill.setdefault("yearsOfExperience", 0)
+    return result
+
+
+async def _analyze_resume_text(caller: str, resume_text: str, part_note: str = "") -> dict:
+    response = await _chat_completion(
+        caller,
+        messages=[
+            {"role": "system", "content": RESUME_ANALYSIS_SYSTEM_PROMPT},
+            {"role": "user", "content": _build_resume_analysis_prompt(resume_text, part_note)},
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.5,  # Lower temperature for more consistent extraction
+        max_tokens=4000,
+    )
+    return json.loads(response.content)
+
+
+async def _extract_skills_chunked(sections: Dict[str, str]) -> dict:
+    """
+    Map-reduce analysis of a resume too long for one prompt: the sections are
+    packed into token-bounded chunks, every chunk is analysed in parallel
+    (bounded by settings.resume_chunk_concurrency) and the partial results are
+    merged locally. Chunks that fail are skipped as long as one succeeds.
+    """
+    chunks = chunk_sections(
+        [(name, text) for name, text in sections.items() if text.strip()],
+        settings.resume_chunk_tokens,
+        settings.openai_model,
+    )
+    semaphore = asyncio.Semaphore(settings.resume_chunk_concurrency)
+
+    async def analyze(index: int, chunk: str) -> dict:
+        part_note = (
+            f"This is part {index + 1} of {len(chunks)} of a longer resume. "
+            "Extract only what appears in this part; the parts are merged afterwards.\n\n"
         )
-        
-        result = json.loads(response.choices[0].message.content)
-        
-        # Ensure all required fields exist with defaults
-        result.setdefault("skills", [])
-        result.setdefault("projects", [])
-        result.setdefault("achievements", [])
-        result.setdefault("certifications", [])
-        result.setdefault("experience", [])
-        result.setdefault("education", [])
-        result.setdefault("summary", "")
-        result.setdefault("strongestSkills", [])
-        result.setdefault("skillGaps", [])
-        result.setdefault("totalYearsExperience", 0)
-        result.setdefault("seniorityLevel", "Entry")
-        
-        # Ensure each skill has required fields
-        for i, skill in enumerate(result["skills"]):
-            skill.setdefault("id", str(i + 1))
-            skill.setdefault("level", 50)
-            skill.setdefault("category", "Other")
-            skill.setdefault("connections", [])
-            skill.setdefault("yearsOfExperience", 0)
-        
-        return result
+        async with semaphore:
+            return await _analyze_resume_text("extract_skills_from_resume_chunk", chunk, part_note)
+
+    results = await asyncio.gather(*(analyze(i, c) for i, c in enumerate(chunks)), return_exceptions=True)
+    parts = [r for r in results if isinstance(r, dict)]
+    failures = [r for r in results if isinstance(r, BaseException)]
+    if not parts:
+        raise failures[0] if failures else Exception("Resume produced no text to analyse")
+    if failures:
+        print(f"Resume analysis: {len(failures)} of {len(chunks)} chunks failed, merging the rest: {failures[0]}")
+
+    return merge_resume_extractions(parts)
+
+
+async def analyze_resume(resume_text: str, sections: Optional[Dict[str, str]] = None) -> dict:
+    """
+    Use GPT-4o-mini to extract comprehensive profile data from resume text.
+    This includes skills with proficiency levels, projects, achievements, certifications, etc.
+
+    Resumes longer than settings.resume_prompt_tokens are analysed in chunks
+    (by parsed section when `sections` is given) instead of being truncated.
+    Raises when no API key is configured or the analysis fails.
+    """
+    if not client:
+        raise Exception("OpenAI API key not configured. Please set OPENAI_API_KEY in environment variables.")
+
+    source = "\n".join(sections.values()) if sections else resume_text
+
+    if count_tokens(source, settings.openai_model) > settings.resume_prompt_tokens:
+        result = await _extract_skills_chunked(sections or {"resume": resume_text})
+    else:
+        result = await _analyze_resume_text("extract_skills_from_resume", resume_text)
+    return _apply_extraction_defaults(result)
+
+
+async def extract_skills_from_resume(resume_text: str, sections: Optional[Dict[str, str]] = None) -> dict:
+    """
+    analyze_resume, falling back to mock data when there is no API key or
+    the analysis fails.
+    """
+    try:
+        return await analyze_resume(resume_text, sections)
     except Exception as e:
         print(f"OpenAI API error: {e}")
         return get_mock_skill_graph()
@@ -226,8 +527,8 @@ Respond in this exact JSON format:
 """
 
     try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
+        response = await _chat_completion(
+            "generate_roadmap",
             messages=[
                 {
                     "role": "system",
@@ -244,27 +545,40 @@ Respond in this exact JSON format:
             temperature=0.7,
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
         return result
+    except RateLimitError:
+        # Surfaced as 429 by the endpoints
+        raise
     except Exception as e:
         print(f"OpenAI API error: {e}")
         raise Exception(f"Failed to generate roadmap: {str(e)}")
 
 
-async def generate_comprehensive_roadmap(
+def _format_skill_levels(skills: list) -> str:
+    """
+    Format skills with proficiency levels (concise "name:level%" list).
+    Strongest skills first, cut at settings.roadmap_skills_prompt_tokens.
+    """
+    ranked = sorted(skills, key=lambda s: s.get("proficiency", 50), reverse=True)
+    return ", ".join(fit_items(
+        [f"{s.get('name')}:{s.get('proficiency', 50)}%" for s in ranked],
+        settings.roadmap_skills_prompt_tokens,
+        settings.openai_model,
+    ))
+
+
+def _build_comprehensive_roadmap_messages(
     skills: list,
     target_role: str,
     missing_skills: list,
     time_constraint: dict,
     resume_text: str
-) -> dict:
+) -> list:
     """
-    Generate a comprehensive learning roadmap covering ALL subjects needed for the target role.
-    Considers user's existing skill levels and time constraints.
+    Build the chat messages for a comprehensive roadmap.
+    Shared by the blocking and the streaming generators so both hit the same cache entry.
     """
-    if not client:
-        raise Exception("OpenAI API key not configured. Please set OPENAI_API_KEY in environment variables.")
-    
     weeks = int(time_constraint.get("weeks", 12))
     hours_per_day = float(time_constraint.get("hoursPerDay", 2))
     intensity = time_constraint.get("intensity", "moderate")
@@ -273,21 +587,11 @@ async def generate_comprehensive_roadmap(
     total_hours = int(weeks * 7 * hours_per_day)
     hours_per_week = int(7 * hours_per_day)
     
-    # Limit skills to top 15 to avoid token overflow
-    limited_skills = skills[:500] if len(skills) > 20 else skills
-    
-    # Format skills with proficiency levels (concise format)
-    skills_with_levels = ", ".join([
-        f"{s.get('name')}:{s.get('proficiency', 50)}%"
-        for s in limited_skills
-    ])
+    skills_with_levels = _format_skill_levels(skills)
     
     # Limit missing skills list
     limited_missing = missing_skills[:10] if len(missing_skills) > 10 else missing_skills
     
-    # Truncate resume text significantly
-    truncated_resume = resume_text[:2000] if resume_text else "No resume provided"
-    
     prompt = f"""Create a learning roadmap for "{target_role}".
 
 User Skills: {skills_with_levels}
@@ -340,31 +644,74 @@ IMPORTANT:
 - Focus on high-impact items
 """
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": """You are an expert career coach. Create interview prep roadmaps with:
+    return [
+        {
+            "role": "system",
+            "content": """You are an expert career coach. Create interview prep roadmaps with:
 1. REAL LeetCode URLs (https://leetcode.com/problems/problem-name/)
 2. Cover DSA, System Design, Behavioral prep
 3. Respect time constraints
 4. Keep responses concise but complete
 Always respond with valid JSON.""",
-                },
-                {"role": "user", "content": prompt},
-            ],
+        },
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _normalize_comprehensive_roadmap(result: dict) -> dict:
+    """Ensure numeric values are integers (not floats)."""
+    if "estimatedHoursPerWeek" in result:
+        result["estimatedHoursPerWeek"] = int(result["estimatedHoursPerWeek"])
+    if "totalTasks" in result:
+        result["totalTasks"] = int(result["totalTasks"])
+    if "overview" in result:
+        if "totalHours" in result["overview"]:
+            result["overview"]["totalHours"] = int(result["overview"]["totalHours"])
+        if "totalWeeks" in result["overview"]:
+            result["overview"]["totalWeeks"] = int(result["overview"]["totalWeeks"])
+    return result
+
+
+async def generate_comprehensive_roadmap(
+    skills: list,
+    target_role: str,
+    missing_skills: list,
+    time_constraint: dict,
+    resume_text: str
+) -> dict:
+    """
+    Generate a comprehensive learning roadmap covering ALL subjects needed for the target role.
+    Considers user's existing skill levels and time constraints.
+    """
+    if not client:
+        raise Exception("OpenAI API key not configured. Please set OPENAI_API_KEY in environment variables.")
+    
+    # Long plans: outline first, then every week in parallel
+    if int(time_constraint.get("weeks", 12)) >= settings.roadmap_fanout_min_weeks:
+        return await _generate_fanout_roadmap(skills, target_role, missing_skills, time_constraint)
+    
+    messages = _build_comprehensive_roadmap_messages(
+        skills, target_role, missing_skills, time_constraint, resume_text
+    )
+
+    try:
+        response = await _chat_completion(
+            "generate_comprehensive_roadmap",
+            messages=messages,
             response_format={"type": "json_object"},
             temperature=0.7,
-            max_tokens=16000,
+            max_tokens=estimate_roadmap_output_tokens(int(time_constraint.get("weeks", 12))),
         )
         
-        content = response.choices[0].message.content
+        content = response.content
         
-        # Check if response was truncated
-        if response.choices[0].finish_reason == "length":
-            print("Warning: OpenAI response was truncated due to length limit")
+        # Truncated: keep the complete weeks and ask only for the rest
+        if response.finish_reason == "length":
+            print("Warning: OpenAI response was truncated due to length limit, continuing missing weeks")
+            result = _salvage_roadmap(content)
+            async for _ in _iter_continuation_weeks(result, skills, target_role, time_constraint):
+                pass
+            return _finalize_recovered_roadmap(result, target_role, time_constraint)
         
         try:
             result = json.loads(content)
@@ -374,98 +721,584 @@ Always respond with valid JSON.""",
             print(f"Response content (last 500 chars): {content[-500:] if content else 'Empty'}")
             raise Exception(f"Failed to parse roadmap response: {str(json_err)}")
         
-        # Ensure numeric values are integers (not floats)
-        if "estimatedHoursPerWeek" in result:
-            result["estimatedHoursPerWeek"] = int(result["estimatedHoursPerWeek"])
-        if "totalTasks" in result:
-            result["totalTasks"] = int(result["totalTasks"])
-        if "overview" in result:
-            if "totalHours" in result["overview"]:
-                result["overview"]["totalHours"] = int(result["overview"]["totalHours"])
-            if "totalWeeks" in result["overview"]:
-                result["overview"]["totalWeeks"] = int(result["overview"]["totalWeeks"])
-        
-        return result
+        return _normalize_comprehensive_roadmap(result)
+    except RateLimitError:
+        # Surfaced as 429 by the endpoints
+        raise
     except Exception as e:
         print(f"OpenAI API error: {e}")
         raise Exception(f"Failed to generate comprehensive roadmap: {str(e)}")
 
 
-async def match_roles_with_skill_levels(skills: list) -> list:
+async def stream_comprehensive_roadmap(
+    skills: list,
+    target_role: str,
+    missing_skills: list,
+    time_constraint: dict,
+    resume_text: str
+) -> AsyncIterator[dict]:
     """
-    Match roles based on skills WITH proficiency levels for better recommendations.
+    Streaming variant of generate_comprehensive_roadmap.
+    Yields {"type": "week", "week": {...}} as soon as each week object is complete
+    in the streamed completion, then {"type": "complete", "roadmap": {...}}.
+    A cached roadmap for the same prompt is replayed immediately.
     """
     if not client:
-        return get_mock_roles()
-    
-    # Format skills with levels
-    skills_formatted = "\n".join([
-        f"- {s.get('name')}: {s.get('proficiency', 50)}% proficiency ({s.get('category', 'General')})"
-        for s in skills
-    ])
-    
-    prompt = f"""Based on this candidate's skills WITH proficiency levels, recommend 5 suitable job roles.
+        raise Exception("OpenAI API key not configured. Please set OPENAI_API_KEY in environment variables.")
 
-Candidate Skills:
-{skills_formatted}
+    if int(time_constraint.get("weeks", 12)) >= settings.roadmap_fanout_min_weeks:
+        overview = await _generate_roadmap_overview(skills, target_role, missing_skills, time_constraint)
+        weeks = []
+        async for week in _iter_fanout_weeks(overview, skills, target_role, time_constraint):
+            weeks.append(week)
+            yield {"type": "week", "week": week}
+        yield {"type": "complete", "roadmap": _assemble_fanout_roadmap(overview, weeks, target_role, time_constraint)}
+        return
 
-For each role, provide:
-- Match score (based on skills AND proficiency levels - be realistic)
-- Required skills (indicate if candidate has them and at what level)
-- Specific skill gaps to address
-- Estimated time to be interview-ready
-- Salary range
-- Demand level
+    caller = "generate_comprehensive_roadmap"
+    kwargs = {
+        "model": settings.openai_model,
+        "messages": _build_comprehensive_roadmap_messages(
+            skills, target_role, missing_skills, time_constraint, resume_text
+        ),
+        "response_format": {"type": "json_object"},
+        "temperature": 0.7,
+        "max_tokens": estimate_roadmap_output_tokens(int(time_constraint.get("weeks", 12))),
+    }
+    cache_ttl = LLM_CACHE_TTLS.get(caller, 0) if settings.llm_cache_enabled else 0
+    key = make_cache_key(kwargs["model"], kwargs["messages"], kwargs["temperature"], kwargs["response_format"])
 
-Consider:
-- High proficiency (80%+) skills as strong matches
-- Medium proficiency (50-79%) skills need some improvement
-- Low proficiency (<50%) skills are gaps
+    content = None
+    if cache_ttl:
+        cached = await llm_cache.get(key, caller)
+        if cached is not None:
+            content = cached["content"]
+            llm_metrics.observe(LLMCall(
+                caller, kwargs["model"], cache="hit", finish_reason=cached["finish_reason"], streamed=True
+            ))
 
-Respond in this exact JSON format:
+    if content is None:
+        timeout = LLM_TIMEOUTS.get(caller, settings.openai_timeout_seconds)
+        deadline = asyncio.get_running_loop().time() + timeout
+        call = LLMCall(caller, kwargs["model"], streamed=True)
+        estimated_tokens = estimate_tokens(kwargs["messages"], kwargs["max_tokens"], kwargs["model"])
+
+        streamer = JsonArrayStreamer("weeks")
+        finish_reason = None
+        admitted = False
+        used_tokens = 0
+        try:
+            call.queue_seconds = await rate_scheduler.acquire(
+                kwargs["model"], estimated_tokens, _priority_for(caller)
+            )
+            admitted = True
+            stream = await client.chat.completions.create(
+                stream=True,
+                stream_options={"include_usage": True},
+                timeout=timeout,
+                **kwargs,
+            )
+            async for chunk in stream:
+                if asyncio.get_running_loop().time() > deadline:
+                    await stream.close()
+                    call.status = "timeout"
+                    raise Exception(f"OpenAI request for {caller} timed out after {timeout:.0f}s")
+                if chunk.usage:
+                    used_tokens = chunk.usage.total_tokens
+                    call.prompt_tokens = chunk.usage.prompt_tokens
+                    call.completion_tokens = chunk.usage.completion_tokens
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+                    call.finish_reason = finish_reason
+                for week in streamer.feed(choice.delta.content or ""):
+                    yield {"type": "week", "week": week}
+        except (asyncio.CancelledError, GeneratorExit):
+            call.status = "cancelled"
+            raise
+        except RateLimitError:
+            rate_scheduler.penalize(kwargs["model"])
+            call.status = "rate_limited"
+            raise
+        except Exception:
+            if call.status == "ok":
+                call.status = "error"
+            raise
+        finally:
+            # Failed or usage-less streams refund the whole reservation
+            if admitted:
+                rate_scheduler.release(kwargs["model"], estimated_tokens, used_tokens)
+            llm_metrics.observe(call)
+
+        content = streamer.text
+        if finish_reason == "length":
+            print("Warning: OpenAI response was truncated due to length limit, continuing missing weeks")
+            result = _salvage_roadmap(content)
+            async for week in _iter_continuation_weeks(result, skills, target_role, time_constraint):
+                yield {"type": "week", "week": week}
+            yield {"type": "complete", "roadmap": _finalize_recovered_roadmap(result, target_role, time_constraint)}
+            return
+        if cache_ttl and content:
+            await llm_cache.set(key, {"content": content, "finish_reason": finish_reason}, cache_ttl, caller)
+    else:
+        # Cache hit: replay the weeks so the client sees the same event sequence
+        for week in JsonArrayStreamer("weeks").feed(content):
+            yield {"type": "week", "week": week}
+
+    try:
+        result = json.loads(content)
+    except json.JSONDecodeError as json_err:
+        print(f"JSON parse error: {json_err}")
+        raise Exception(f"Failed to parse roadmap response: {str(json_err)}")
+
+    yield {"type": "complete", "roadmap": _normalize_comprehensive_roadmap(result)}
+
+
+def _salvage_roadmap(content: str, first_week: int = 1) -> dict:
+    """
+    Keep everything usable from a roadmap completion that hit max_tokens:
+    the top-level fields that were finished plus every fully written week,
+    numbered from `first_week` with the usual IDs (see _normalize_week).
+    """
+    result = parse_truncated_json(content or "")
+    if not isinstance(result, dict):
+        result = {}
+    # A half-written week would parse after repair, so only take closed ones
+    weeks = JsonArrayStreamer("weeks").feed(content or "")
+    result["weeks"] = [
+        _normalize_week(week, {"number": first_week + i}) for i, week in enumerate(weeks)
+    ]
+    return result
+
+
+async def _iter_continuation_weeks(
+    partial: dict,
+    skills: list,
+    target_role: str,
+    time_constraint: dict
+) -> AsyncIterator[dict]:
+    """
+    Ask for only the weeks missing from a truncated roadmap and append them to
+    partial["weeks"], yielding each new week. A continuation that is itself
+    truncated is salvaged the same way and continued again, up to
+    settings.roadmap_continuation_rounds calls.
+    """
+    total_weeks = int(time_constraint.get("weeks", 12))
+    hours_per_week = int(7 * float(time_constraint.get("hoursPerDay", 2)))
+    weeks = partial.setdefault("weeks", [])
+
+    for _ in range(settings.roadmap_continuation_rounds):
+        start = len(weeks) + 1
+        if start > total_weeks:
+            break
+
+        written = "\n".join(
+            f"Week {i + 1}: {w.get('title', '')} ({w.get('focus', '')})" for i, w in enumerate(weeks)
+        ) or "None yet"
+        subjects = ", ".join(s.get("name", "") for s in partial.get("overview", {}).get("subjects", []))
+
+        prompt = f"""Continue a {total_weeks}-week learning roadmap for "{target_role}".
+
+User Skills: {_format_skill_levels(skills)}
+Hours per week: {hours_per_week}
+Subjects to cover: {subjects or "DSA, System Design, Behavioral Prep, Coding Practice"}
+
+Weeks already written (do not repeat their topics):
+{written}
+
+Write ONLY weeks {start} to {total_weeks}.
+
+JSON format:
 {{
-    "roles": [
+    "weeks": [
         {{
-            "id": "1",
-            "title": "Senior Frontend Engineer",
-            "matchScore": 78,
-            "salary": "$150K - $200K",
-            "skills": [
-                {{"name": "JavaScript", "match": true, "candidateLevel": 85, "requiredLevel": 80}},
-                {{"name": "System Design", "match": false, "candidateLevel": 30, "requiredLevel": 70}}
+            "id": "w{start}",
+            "number": {start},
+            "title": "Week {start}: Topic",
+            "description": "What this week covers",
+            "focus": "Main skill area",
+            "tasks": [
+                {{
+                    "id": "w{start}t1",
+                    "title": "Two Sum",
+                    "type": "problem",
+                    "duration": "30 min",
+                    "reason": "Classic hash map problem",
+                    "completed": false,
+                    "link": "https://leetcode.com/problems/two-sum/",
+                    "difficulty": "Easy"
+                }}
+            ]
+        }}
+    ]
+}}
+
+IMPORTANT:
+- 3-5 tasks per week
+- Use REAL LeetCode URLs (https://leetcode.com/problems/problem-name/)
+- Keep task descriptions concise
+"""
+
+        response = await _chat_completion(
+            "continue_comprehensive_roadmap",
+            messages=[
+                {
+                    "role": "system",
+                    "content": "You are an expert career coach continuing an interview prep roadmap. Always respond with valid JSON.",
+                },
+                {"role": "user", "content": prompt},
             ],
-            "gaps": ["System Design", "Testing"],
-            "demand": "High",
-            "timeToReady": "6-8 weeks",
-            "whyGoodFit": "Strong JavaScript and React skills match role requirements",
-            "focusAreas": ["Improve system design knowledge", "Learn testing best practices"]
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=estimate_roadmap_output_tokens(total_weeks - start + 1),
+        )
+
+        if response.finish_reason == "length":
+            new_weeks = _salvage_roadmap(response.content, start)["weeks"]
+        else:
+            new_weeks = json.loads(response.content).get("weeks", [])
+
+        if not new_weeks:
+            break
+
+        for week in new_weeks:
+            number = len(weeks) + 1
+            if number > total_weeks:
+                break
+            week = _normalize_week(week, {"number": number})
+            weeks.append(week)
+            yield week
+
+
+def _finalize_recovered_roadmap(result: dict, target_role: str, time_constraint: dict) -> dict:
+    """Fill in the top-level fields a truncated response may never have reached."""
+    total_weeks = int(time_constraint.get("weeks", 12))
+    result.setdefault("overview", {})
+    result.setdefault("predictedReadyDate", f"{total_weeks} weeks")
+    result.setdefault("targetRole", target_role)
+    result.setdefault("estimatedHoursPerWeek", int(7 * float(time_constraint.get("hoursPerDay", 2))))
+    result["totalTasks"] = sum(len(w.get("tasks", [])) for w in result["weeks"])
+    return _normalize_comprehensive_roadmap(result)
+
+
+async def _generate_roadmap_overview(
+    skills: list,
+    target_role: str,
+    missing_skills: list,
+    time_constraint: dict
+) -> dict:
+    """
+    Phase 1 of a fan-out roadmap: subjects, milestones and a one-line plan per week.
+    Small output, so it returns in a few seconds regardless of plan length.
+    """
+    weeks = int(time_constraint.get("weeks", 12))
+    hours_per_day = float(time_constraint.get("hoursPerDay", 2))
+    total_hours = int(weeks * 7 * hours_per_day)
+    limited_missing = missing_skills[:10] if len(missing_skills) > 10 else missing_skills
+
+    prompt = f"""Plan a {weeks}-week interview preparation roadmap for "{target_role}".
+
+User Skills: {_format_skill_levels(skills)}
+Skills to Learn: {limited_missing}
+Duration: {weeks} weeks, {hours_per_day} hrs/day, Total: {total_hours} hours
+
+Cover: DSA, System Design (senior roles), Behavioral Prep, Coding Practice.
+Do NOT list tasks yet - only the outline.
+
+JSON format:
+{{
+    "overview": {{
+        "totalWeeks": {weeks},
+        "hoursPerDay": {hours_per_day},
+        "totalHours": {total_hours},
+        "subjects": [{{"id": "dsa", "name": "Data Structures & Algorithms", "weeks": 4, "priority": "high"}}],
+        "milestones": [{{"week": 4, "goal": "Complete DSA fundamentals"}}]
+    }},
+    "weekPlan": [
+        {{"number": 1, "title": "Week 1: Arrays & Hashing", "focus": "Data Structures", "description": "Master array manipulation"}}
+    ]
+}}
+
+IMPORTANT: weekPlan must contain exactly {weeks} entries, numbered 1 to {weeks}, progressing in difficulty.
+"""
+
+    response = await _chat_completion(
+        "generate_roadmap_overview",
+        messages=[
+            {
+                "role": "system",
+                "content": "You are an expert career coach planning interview prep roadmaps. Respect time constraints. Always respond with valid JSON.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.7,
+        max_tokens=300 + 60 * weeks,
+    )
+    result = json.loads(response.content)
+
+    # Make sure there is exactly one plan entry per week, numbered 1..N
+    plan = {}
+    for i, entry in enumerate(result.get("weekPlan", [])):
+        try:
+            plan[int(entry.get("number", i + 1))] = entry
+        except (TypeError, ValueError):
+            plan[i + 1] = entry
+    result["weekPlan"] = [
+        {
+            "number": n,
+            "title": plan.get(n, {}).get("title", f"Week {n}"),
+            "focus": plan.get(n, {}).get("focus", "Interview Preparation"),
+            "description": plan.get(n, {}).get("description", ""),
+        }
+        for n in range(1, weeks + 1)
+    ]
+    result.setdefault("overview", {})
+    return result
+
+
+async def _generate_roadmap_week(
+    week_plan: dict,
+    outline: str,
+    skills: list,
+    target_role: str,
+    hours_per_week: int
+) -> dict:
+    """Phase 2 of a fan-out roadmap: the tasks for a single week."""
+    number = week_plan["number"]
+
+    prompt = f"""Write week {number} of a learning roadmap for "{target_role}".
+
+User Skills: {_format_skill_levels(skills)}
+Hours available this week: {hours_per_week}
+
+Full plan (for context - only write week {number}, do not repeat other weeks' topics):
+{outline}
+
+This week: {week_plan["title"]} (focus: {week_plan["focus"]})
+
+JSON format:
+{{
+    "id": "w{number}",
+    "number": {number},
+    "title": "{week_plan["title"]}",
+    "description": "Master array manipulation",
+    "focus": "{week_plan["focus"]}",
+    "tasks": [
+        {{
+            "id": "w{number}t1",
+            "title": "Two Sum",
+            "type": "problem",
+            "duration": "30 min",
+            "reason": "Classic hash map problem",
+            "completed": false,
+            "link": "https://leetcode.com/problems/two-sum/",
+            "difficulty": "Easy"
         }}
     ]
 }}
+
+IMPORTANT:
+- 3-5 tasks
+- Use REAL LeetCode URLs (https://leetcode.com/problems/problem-name/)
+- Keep task descriptions concise
+"""
+
+    max_tokens = estimate_roadmap_output_tokens(1)
+    for _ in range(2):
+        response = await _chat_completion(
+            "generate_roadmap_week",
+            messages=[
+                {
+                    "role": "system",
+                    "content": """You are an expert career coach. Create interview prep roadmaps with:
+1. REAL LeetCode URLs (https://leetcode.com/problems/problem-name/)
+2. Cover DSA, System Design, Behavioral prep
+3. Respect time constraints
+4. Keep responses concise but complete
+Always respond with valid JSON.""",
+                },
+                {"role": "user", "content": prompt},
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.7,
+            max_tokens=max_tokens,
+        )
+        if response.finish_reason != "length":
+            week = json.loads(response.content)
+            if isinstance(week.get("week"), dict):
+                week = week["week"]
+            return _normalize_week(week, week_plan)
+        # Truncated: one retry with twice the room (truncated answers are
+        # never cached), then keep the tasks that were finished
+        print(f"Warning: roadmap week {number} was truncated, retrying with max_tokens={max_tokens * 2}")
+        max_tokens *= 2
+
+    week = _salvage_week(response.content)
+    if not week.get("tasks"):
+        raise Exception(f"Roadmap week {number} was truncated before its first task")
+    return _normalize_week(week, week_plan)
+
+
+def _salvage_week(content: str) -> dict:
+    """
+    The finished fields and tasks of a single-week completion that hit
+    max_tokens. The week may be the root object or wrapped as {"week": {...}}.
+    """
+    content = content or ""
+    week = parse_truncated_json(content)
+    if not isinstance(week, dict):
+        return {}
+    if isinstance(week.get("week"), dict):
+        week = week["week"]
+        content = content[content.index("{", content.index('"week"')):]
+    # A half-written task would parse after repair, so only take closed ones
+    week["tasks"] = JsonArrayStreamer("tasks").feed(content)
+    return week
+
+
+def _normalize_week(week: dict, week_plan: dict) -> dict:
+    """Force the w{n} / w{n}t{i} ID scheme so weeks from separate calls merge cleanly."""
+    number = week_plan["number"]
+    week["id"] = f"w{number}"
+    week["number"] = number
+    week.setdefault("title", week_plan.get("title", f"Week {number}"))
+    week.setdefault("focus", week_plan.get("focus", ""))
+    week.setdefault("description", week_plan.get("description", ""))
+
+    tasks = week.get("tasks") or []
+    for i, task in enumerate(tasks):
+        task["id"] = f"w{number}t{i + 1}"
+        task.setdefault("completed", False)
+    week["tasks"] = tasks
+    return week
+
+
+async def _iter_fanout_weeks(
+    overview: dict,
+    skills: list,
+    target_role: str,
+    time_constraint: dict
+) -> AsyncIterator[dict]:
+    """
+    Generate every week of the plan concurrently (bounded by
+    settings.roadmap_fanout_concurrency) and yield each week as it finishes.
+    Outstanding calls are cancelled if the consumer stops early or one week fails.
+    """
+    hours_per_week = int(7 * float(time_constraint.get("hoursPerDay", 2)))
+    outline = "\n".join(f"Week {w['number']}: {w['title']} ({w['focus']})" for w in overview["weekPlan"])
+    semaphore = asyncio.Semaphore(settings.roadmap_fanout_concurrency)
+
+    async def generate(week_plan: dict) -> dict:
+        async with semaphore:
+            return await _generate_roadmap_week(week_plan, outline, skills, target_role, hours_per_week)
+
+    tasks = [asyncio.create_task(generate(w)) for w in overview["weekPlan"]]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _assemble_fanout_roadmap(overview: dict, weeks: list, target_role: str, time_constraint: dict) -> dict:
+    """Merge the outline and the independently generated weeks into the usual roadmap shape."""
+    total_weeks = int(time_constraint.get("weeks", 12))
+    hours_per_week = int(7 * float(time_constraint.get("hoursPerDay", 2)))
+    weeks = sorted(weeks, key=lambda w: w["number"])
+
+    result = {
+        "overview": overview.get("overview", {}),
+        "weeks": weeks,
+        "predictedReadyDate": f"{total_weeks} weeks",
+        "targetRole": target_role,
+        "totalTasks": sum(len(w.get("tasks", [])) for w in weeks),
+        "estimatedHoursPerWeek": hours_per_week,
+    }
+    return _normalize_comprehensive_roadmap(result)
+
+
+async def _generate_fanout_roadmap(
+    skills: list,
+    target_role: str,
+    missing_skills: list,
+    time_constraint: dict
+) -> dict:
+    """Two-phase roadmap: one outline call, then all weeks in parallel."""
+    try:
+        overview = await _generate_roadmap_overview(skills, target_role, missing_skills, time_constraint)
+        weeks = [week async for week in _iter_fanout_weeks(overview, skills, target_role, time_constraint)]
+        return _assemble_fanout_roadmap(overview, weeks, target_role, time_constraint)
+    except RateLimitError:
+        # Surfaced as 429 by the endpoints
+        raise
+    except Exception as e:
+        print(f"OpenAI API error: {e}")
+        raise Exception(f"Failed to generate comprehensive roadmap: {str(e)}")
+
+
+async def explain_role_matches(skills: list, roles: list) -> Dict[str, str]:
+    """
+    Write the whyGoodFit narrative for roles that were already matched and
+    scored locally. Returns {role id: text}; empty if no API key or on error,
+    so callers keep their own summaries.
+    """
+    if not client or not roles:
+        return {}
+
+    skills_formatted = ", ".join(
+        f"{s.get('name')} ({s.get('proficiency', s.get('level', 50))}%)" if isinstance(s, dict) else str(s)
+        for s in skills
+    )
+    roles_formatted = "\n".join(
+        f"- id {r['id']}: {r['title']} ({r['matchScore']}% match). "
+        f"Has: {', '.join(r.get('matchedSkills', [])) or 'none'}. Missing: {', '.join(r.get('gaps', [])) or 'none'}"
+        for r in roles
+    )
+
+    prompt = f"""Candidate Skills: {skills_formatted}
+
+Roles already matched to this candidate:
+{roles_formatted}
+
+For each role, write one or two sentences on why it is a good fit and what to focus on.
+Do not change the match scores.
+
+Respond in this exact JSON format:
+{{
+    "explanations": [
+        {{"id": "1", "whyGoodFit": "Strong JavaScript and React skills match role requirements"}}
+    ]
+}}
 """
 
     try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
+        response = await _chat_completion(
+            "explain_role_matches",
+            cache_key=skill_fingerprint(skills, with_levels=True, extra={"roles": [r["id"] for r in roles]}),
             messages=[
                 {
                     "role": "system",
-                    "content": """You are an expert career advisor matching candidates to suitable roles.
-                    Consider both the skills AND their proficiency levels.
-                    Be realistic with match scores - high proficiency matters.
-                    Always respond with valid JSON.""",
+                    "content": "You are an expert career advisor explaining role recommendations. Be concise and specific. Always respond with valid JSON.",
                 },
                 {"role": "user", "content": prompt},
             ],
             response_format={"type": "json_object"},
             temperature=0.7,
+            max_tokens=150 * len(roles),
         )
-        
-        result = json.loads(response.choices[0].message.content)
-        return result.get("roles", [])
+        result = json.loads(response.content)
+        return {
+            str(e.get("id")): e.get("whyGoodFit", "")
+            for e in result.get("explanations", [])
+            if e.get("whyGoodFit")
+        }
     except Exception as e:
         print(f"OpenAI API error: {e}")
-        return get_mock_roles()
+        return {}
 
 
 async def generate_bonus_topics(week_focus: str, target_role: str) -> dict:
@@ -519,8 +1352,8 @@ Respond in this exact JSON format:
 """
 
     try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
+        response = await _chat_completion(
+            "generate_bonus_topics",
             messages=[
                 {
                     "role": "system",
@@ -537,7 +1370,7 @@ Respond in this exact JSON format:
             temperature=0.7,
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = json.loads(response.content)
         return result
     except Exception as e:
         print(f"OpenAI API error generating bonus topics: {e}")
@@ -576,162 +1409,43 @@ def get_mock_bonus_topics(focus: str) -> dict:
     }
 
 
-async def match_roles(profile: dict) -> list:
+async def explain_daily_problem(problem: dict, skill_gaps: list, target_role: str) -> Optional[str]:
     """
-    Use GPT-4o-mini to match profile to suitable roles.
+    Write the personalised `reason` for a daily problem that was picked locally.
+    Returns None if no API key or on error, so callers keep their own reason.
     """
     if not client:
-        return get_mock_roles()
-    
-    skills_str = ", ".join([s.get("name", "") for s in profile.get("skills", [])])
-    
-    prompt = f"""Based on this candidate's profile, recommend 4 suitable job roles.
+        return None
 
-Skills: {skills_str}
-Experience: {profile.get('experience', [])}
+    prompt = f"""Today's practice problem for a candidate preparing for "{target_role}":
+{problem.get('title')} ({problem.get('difficulty')}) - topics: {', '.join(problem.get('topics', []))}; asked at: {', '.join(problem.get('companies', []))}
 
-For each role, provide:
-- Match score (percentage)
-- Required skills (mark which ones the candidate has)
-- Skill gaps to address
-- Salary range
-- Demand level
+Candidate's skill gaps: {', '.join(skill_gaps) or 'none listed'}
 
-Respond in this exact JSON format:
-{{
-    "roles": [
-        {{
-            "id": "1",
-            "title": "Senior Frontend Engineer",
-            "company": "Example Co",
-            "matchScore": 78,
-            "salary": "$150K - $200K",
-            "skills": [
-                {{"name": "JavaScript", "match": true}},
-                {{"name": "System Design", "match": false}}
-            ],
-            "gaps": ["System Design", "Testing"],
-            "demand": "High"
-        }}
-    ]
-}}
-"""
-
-    try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are an expert career advisor matching candidates to suitable roles. Be realistic with match scores. Always respond with valid JSON.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.7,
-        )
-        
-        result = json.loads(response.choices[0].message.content)
-        return result.get("roles", [])
-    except Exception as e:
-        print(f"OpenAI API error: {e}")
-        return get_mock_roles()
-
-
-async def get_daily_problem(profile: dict, target_role: str, completed_problems: list = None) -> dict:
-    """
-    Use GPT-4o-mini to recommend a daily LeetCode problem with full details.
-    """
-    if not client:
-        return get_mock_daily_problem()
-    
-    skills = profile.get("skillGraph", profile.get("skills", []))
-    skill_gaps = profile.get("skillGaps", [])
-    completed = completed_problems or []
-    
-    prompt = f"""Recommend a LeetCode coding problem for today's practice.
-
-Target Role: {target_role}
-User's Skills: {[s.get('name') for s in skills]}
-Skill Gaps: {skill_gaps}
-Already Completed: {completed}
-
-Select a REAL LeetCode problem that:
-1. Is commonly asked in FAANG/tech company interviews
-2. Helps address the user's skill gaps
-3. Has NOT been completed yet (check the completed list)
-4. Progresses difficulty appropriately
-
-Provide the COMPLETE problem with:
-- Real LeetCode URL
-- Full problem description
-- Example inputs/outputs
-- Constraints
-- Detailed reasoning for why YOU chose this specific problem
+In 2-3 sentences, explain why this problem is a good pick for them today.
 
 Respond in this exact JSON format:
-{{
-    "id": "daily-1",
-    "title": "Two Sum",
-    "slug": "two-sum",
-    "type": "problem",
-    "difficulty": "Easy",
-    "companies": ["Google", "Amazon", "Meta", "Apple"],
-    "frequency": 95,
-    "estimatedTime": "30 min",
-    "link": "https://leetcode.com/problems/two-sum/",
-    "description": "Given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target. You may assume that each input would have exactly one solution, and you may not use the same element twice.",
-    "examples": [
-        {{
-            "input": "nums = [2,7,11,15], target = 9",
-            "output": "[0,1]",
-            "explanation": "Because nums[0] + nums[1] == 9, we return [0, 1]."
-        }}
-    ],
-    "constraints": [
-        "2 <= nums.length <= 10^4",
-        "-10^9 <= nums[i] <= 10^9",
-        "-10^9 <= target <= 10^9",
-        "Only one valid answer exists."
-    ],
-    "topics": ["Array", "Hash Table"],
-    "reason": "This problem is recommended because: 1) It's asked in 95% of Google interviews, 2) It teaches hash map optimization which addresses your Data Structures skill gap, 3) It's a perfect warm-up for the Two Pointers pattern you'll need for harder problems.",
-    "hints": [
-        "A really brute force way would be to search for all possible pairs of numbers but that would be too slow.",
-        "Try to use a hash map to find the complement in O(1) time."
-    ],
-    "relatedProblems": [
-        {{"title": "3Sum", "link": "https://leetcode.com/problems/3sum/", "difficulty": "Medium"}},
-        {{"title": "Two Sum II", "link": "https://leetcode.com/problems/two-sum-ii-input-array-is-sorted/", "difficulty": "Medium"}}
-    ]
-}}
+{{"reason": "..."}}
 """
 
     try:
-        response = client.chat.completions.create(
-            model=settings.openai_model,
+        response = await _chat_completion(
+            "explain_daily_problem",
             messages=[
                 {
                     "role": "system",
-                    "content": """You are an expert coding interview coach. You have deep knowledge of LeetCode problems and FAANG interview patterns.
-                    IMPORTANT: 
-                    - Only recommend REAL LeetCode problems with correct URLs
-                    - Provide the actual problem description as it appears on LeetCode
-                    - Give detailed reasoning explaining WHY this specific problem helps the user
-                    - Include real example test cases
-                    Always respond with valid JSON.""",
+                    "content": "You are an expert coding interview coach. Be specific and encouraging. Always respond with valid JSON.",
                 },
                 {"role": "user", "content": prompt},
             ],
             response_format={"type": "json_object"},
             temperature=0.7,
+            max_tokens=200,
         )
-        
-        result = json.loads(response.choices[0].message.content)
-        return result
+        return json.loads(response.content).get("reason") or None
     except Exception as e:
         print(f"OpenAI API error: {e}")
-        return get_mock_daily_problem()
+        return None
 
 
 # Mock data functions for demo mode
@@ -980,95 +1694,3 @@ def get_frontend_roadmap(target_role: str) -> dict:
             }
         ]
     }
-
-
-def get_mock_roles() -> list:
-    return [
-        {
-            "id": "1",
-            "title": "Senior Frontend Engineer",
-            "company": "Google",
-            "matchScore": 78,
-            "salary": "$150K - $200K",
-            "skills": [
-                {"name": "JavaScript", "match": True},
-                {"name": "React", "match": True},
-                {"name": "TypeScript", "match": True},
-                {"name": "System Design", "match": False},
-            ],
-            "gaps": ["System Design", "Testing"],
-            "demand": "High",
-        },
-        {
-            "id": "2",
-            "title": "Full Stack Developer",
-            "company": "Meta",
-            "matchScore": 72,
-            "salary": "$140K - $180K",
-            "skills": [
-                {"name": "JavaScript", "match": True},
-                {"name": "React", "match": True},
-                {"name": "Node.js", "match": True},
-                {"name": "GraphQL", "match": False},
-            ],
-            "gaps": ["GraphQL", "AWS"],
-            "demand": "High",
-        },
-    ]
-
-
-def get_mock_daily_problem() -> dict:
-    return {
-        "id": "daily-1",
-        "title": "Two Sum",
-        "slug": "two-sum",
-        "type": "problem",
-        "difficulty": "Easy",
-        "companies": ["Google", "Amazon", "Meta", "Apple", "Microsoft"],
-        "frequency": 95,
-        "estimatedTime": "30 min",
-        "link": "https://leetcode.com/problems/two-sum/",
-        "description": "Given an array of integers nums and an integer target, return indices of the two numbers such that they add up to target.\n\nYou may assume that each input would have exactly one solution, and you may not use the same element twice.\n\nYou can return the answer in any order.",
-        "examples": [
-            {
-                "input": "nums = [2,7,11,15], target = 9",
-                "output": "[0,1]",
-                "explanation": "Because nums[0] + nums[1] == 9, we return [0, 1]."
-            },
-            {
-                "input": "nums = [3,2,4], target = 6",
-                "output": "[1,2]",
-                "explanation": "nums[1] + nums[2] == 6"
-            },
-            {
-                "input": "nums = [3,3], target = 6",
-                "output": "[0,1]",
-                "explanation": "nums[0] + nums[1] == 6"
-            }
-        ],
-        "constraints": [
-            "2 <= nums.length <= 10^4",
-            "-10^9 <= nums[i] <= 10^9",
-            "-10^9 <= target <= 10^9",
-            "Only one valid answer exists."
-        ],
-        "topics": ["Array", "Hash Table"],
-        "reason": "This problem is specifically chosen for you because:\n\n1. **Interview Frequency**: Two Sum appears in 95% of technical interviews at Google, Amazon, and Meta. It's often the first problem asked as a warm-up.\n\n2. **Skill Building**: It teaches the crucial pattern of using hash maps for O(n) lookups, which is fundamental for solving more complex problems.\n\n3. **Foundation for Harder Problems**: Mastering Two Sum prepares you for 3Sum, 4Sum, and Two Sum II which are commonly asked follow-up questions.\n\n4. **Matches Your Profile**: Based on your JavaScript skills, this problem will help you practice efficient data structure usage in your primary language.",
-        "hints": [
-            "A really brute force way would be to search for all possible pairs of numbers but that would be too slow. Try O(n^2) first if you're stuck.",
-            "Try to use a hash map to reduce the time complexity. Can you find the complement of each number in O(1)?",
-            "One pass through the array while building the hash map is enough!"
-        ],
-        "relatedProblems": [
-            {"title": "3Sum", "link": "https://leetcode.com/problems/3sum/", "difficulty": "Medium"},
-            {"title": "Two Sum II - Input Array Is Sorted", "link": "https://leetcode.com/problems/two-sum-ii-input-array-is-sorted/", "difficulty": "Medium"},
-            {"title": "Two Sum III - Data structure design", "link": "https://leetcode.com/problems/two-sum-iii-data-structure-design/", "difficulty": "Easy"},
-            {"title": "4Sum", "link": "https://leetcode.com/problems/4sum/", "difficulty": "Medium"}
-        ],
-        "optimalSolution": {
-            "approach": "Hash Map",
-            "timeComplexity": "O(n)",
-            "spaceComplexity": "O(n)",
-            "explanation": "Use a hash map to store each number's complement as you iterate through the array."
-        }
-    }
@@ -0,0 +1,147 @@
+"""
+Prewarm Service - Speculative work after a resume upload
+Right after a profile is created the user almost always asks for role
+recommendations and then a roadmap for the top role. This starts both in
+the background, at background LLM priority, so their answers are already in
+the response caches (or in flight, and coalesced) when the requests arrive.
+The speculation is cancelled as soon as the user picks a different path.
+Off unless PREWARM_ENABLED is set, since it spends LLM calls on every upload.
+"""
+import asyncio
+import time
+from typing import Dict
+
+from app.config import get_settings
+from app.services.openai_service import (
+    explain_role_matches,
+    generate_comprehensive_roadmap,
+    llm_priority,
+)
+from app.services.rate_scheduler import PRIORITY_BACKGROUND
+from app.services.role_matcher import get_role_matcher
+
+settings = get_settings()
+
+
+def skills_with_levels(profile: dict) -> list:
+    """The profile's skill graph in the {name, category, proficiency} shape the API receives."""
+    skills = []
+    for skill in profile.get("skillGraph", []):
+        if not isinstance(skill, dict) or not skill.get("name"):
+            continue
+        try:
+            proficiency = int(skill.get("level", 50))
+        except (TypeError, ValueError):
+            proficiency = 50
+        skills.append({
+            "name": skill["name"],
+            "category": skill.get("category", "General"),
+            "proficiency": proficiency,
+        })
+    return skills
+
+
+def predicted_time_constraint() -> dict:
+    return {
+        "weeks": settings.prewarm_weeks,
+        "hoursPerDay": settings.prewarm_hours_per_day,
+        "intensity": settings.prewarm_intensity,
+    }
+
+
+class PrewarmManager:
+    """
+    One speculative pipeline per user: role matching (+ whyGoodFit text),
+    then the comprehensive roadmap for the top matched role with the default
+    time constraint. Keeps the prediction so a diverging request can cancel it.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._predictions: Dict[str, dict] = {}
+        self._stats = {"started": 0, "completed": 0, "cancelled": 0, "failed": 0}
+
+    def start(self, user_id: str, profile: dict) -> None:
+        """Start prewarming for a freshly created profile (replaces any earlier run)."""
+        if not settings.prewarm_enabled:
+            return
+        self.cancel(user_id)
+        self._stats["started"] += 1
+        self._tasks[user_id] = asyncio.create_task(self._run(user_id, profile))
+
+    def cancel(self, user_id: str) -> None:
+        task = self._tasks.pop(user_id, None)
+        self._predictions.pop(user_id, None)
+        if task and not task.done():
+            task.cancel()
+
+    def cancel_all(self) -> None:
+        for user_id in list(self._tasks):
+            self.cancel(user_id)
+
+    def on_roadmap_request(self, user_id: str, target_role: str, time_constraint: dict) -> None:
+        """
+        A real roadmap request arrived. If it matches the prediction the
+        speculative calls are left running - the request coalesces onto them
+        or hits their cached results - otherwise they are cancelled.
+        """
+        prediction = self._predictions.get(user_id)
+        if prediction is None:
+            return
+        matches = (
+            prediction["targetRole"] == target_role
+            and int(prediction["timeConstraint"]["weeks"]) == int(time_constraint.get("weeks", 0))
+            and float(prediction["timeConstraint"]["hoursPerDay"]) == float(time_constraint.get("hoursPerDay", 0))
+        )
+        if matches:
+            self._predictions.pop(user_id, None)
+        else:
+            self.cancel(user_id)
+
+    async def _run(self, user_id: str, profile: dict) -> None:
+        started = time.perf_counter()
+        try:
+            with llm_priority(PRIORITY_BACKGROUND):
+                await asyncio.wait_for(self._prewarm(user_id, profile), timeout=settings.prewarm_timeout_seconds)
+            self._stats["completed"] += 1
+            print(f"[Prewarm] {user_id} warmed in {time.perf_counter() - started:.1f}s")
+        except asyncio.CancelledError:
+            self._stats["cancelled"] += 1
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            print(f"[Prewarm] {user_id} failed: {e}")
+        finally:
+            if self._tasks.get(user_id) is asyncio.current_task():
+                del self._tasks[user_id]
+                self._predictions.pop(user_id, None)
+
+    async def _prewarm(self, user_id: str, profile: dict) -> None:
+        skills = skills_with_levels(profile)
+        if not skills:
+            return
+
+        # Same calls /api/roles/recommendations-with-levels makes
+        roles = get_role_matcher().match(skills)
+        if not roles:
+            return
+        # Most likely next step: a roadmap for the best match with the default plan
+        top_role = roles[0]
+        time_constraint = predicted_time_constraint()
+        self._predictions[user_id] = {"targetRole": top_role["title"], "timeConstraint": time_constraint}
+
+        await explain_role_matches(skills, roles)
+        await generate_comprehensive_roadmap(
+            skills=skills,
+            target_role=top_role["title"],
+            missing_skills=top_role["gaps"],
+            time_constraint=time_constraint,
+            resume_text=profile.get("summary", ""),
+        )
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "inFlight": len(self._tasks)}
+
+
+# Singleton instance
+prewarm_manager = PrewarmManager()
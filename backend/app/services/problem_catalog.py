@@ -0,0 +1,143 @@
+"""
+Problem Catalog - In-memory index over app/data/problems.json
+Per-topic, per-category, per-difficulty and per-company lookups, each list
+pre-sorted by interview frequency, plus a local daily-problem recommender
+that works from the user's skill gaps and completed problems.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+PROBLEMS_PATH = Path(__file__).resolve().parent.parent / "data" / "problems.json"
+
+DIFFICULTIES = ["Easy", "Medium", "Hard"]
+
+# How much a skill-gap hit counts against interview frequency (0-100)
+GAP_MATCH_BONUS = 50
+COMPANY_MATCH_BONUS = 15
+
+
+def _norm(value: str) -> str:
+    return re.sub(r"\s+", " ", str(value or "").strip().lower())
+
+
+def _words(value: str) -> set:
+    """Loose word set for matching gaps like "Hash Map" against topic "Hash Maps"."""
+    return {w.rstrip("s") for w in re.findall(r"[a-z0-9+#]+", _norm(value)) if len(w) > 1}
+
+
+class ProblemCatalog:
+    """
+    Problems indexed by id, title, topic, category, difficulty and company.
+    Every index list is ordered by frequency (most asked first).
+    """
+
+    def __init__(self, problems: Optional[List[dict]] = None):
+        if problems is None:
+            with open(PROBLEMS_PATH, encoding="utf-8") as f:
+                problems = json.load(f)
+        self.problems = sorted(problems, key=lambda p: -p.get("frequency", 0))
+        self.by_id: Dict[str, dict] = {}
+        self.by_title: Dict[str, dict] = {}
+        self._by_topic: Dict[str, List[dict]] = {}
+        self._by_category: Dict[str, List[dict]] = {}
+        self._by_difficulty: Dict[str, List[dict]] = {}
+        self._by_company: Dict[str, List[dict]] = {}
+        # Match words for each problem: its topics and category
+        self._terms: Dict[str, set] = {}
+
+        for problem in self.problems:
+            self.by_id[str(problem["id"])] = problem
+            self.by_title[_norm(problem["title"])] = problem
+            for topic in problem.get("topics", []):
+                self._by_topic.setdefault(_norm(topic), []).append(problem)
+            self._by_category.setdefault(_norm(problem.get("category")), []).append(problem)
+            self._by_difficulty.setdefault(_norm(problem.get("difficulty")), []).append(problem)
+            for company in problem.get("companies", []):
+                self._by_company.setdefault(_norm(company), []).append(problem)
+            terms = _words(problem.get("category", ""))
+            for topic in problem.get("topics", []):
+                terms |= _words(topic)
+            self._terms[str(problem["id"])] = terms
+
+    def by_topic(self, topic: str) -> List[dict]:
+        return self._by_topic.get(_norm(topic), [])
+
+    def by_category(self, category: str) -> List[dict]:
+        return self._by_category.get(_norm(category), [])
+
+    def by_difficulty(self, difficulty: str) -> List[dict]:
+        return self._by_difficulty.get(_norm(difficulty), [])
+
+    def by_company(self, company: str) -> List[dict]:
+        return self._by_company.get(_norm(company), [])
+
+    def find(self, id_or_title: str) -> Optional[dict]:
+        return self.by_id.get(str(id_or_title)) or self.by_title.get(_norm(id_or_title))
+
+    def recommend(
+        self,
+        difficulty: str,
+        skill_gaps: Iterable[str] = (),
+        completed: Iterable[str] = (),
+        companies: Iterable[str] = (),
+    ) -> Optional[dict]:
+        """
+        Pick the next problem: not completed (ids or titles), at `difficulty`
+        or the nearest difficulty that still has problems, ranked by
+        frequency plus a bonus for topics that hit a skill gap or a target
+        company. When everything has been solved, the most asked problem is
+        returned for review.
+        """
+        if not self.problems:
+            return None
+
+        done = {_norm(c) for c in completed or []}
+
+        def is_open(problem: dict) -> bool:
+            return str(problem["id"]) not in done and _norm(problem["title"]) not in done
+
+        remaining = [p for p in self.problems if is_open(p)]
+        if not remaining:
+            return self.problems[0]
+
+        gap_terms = [_words(g) for g in skill_gaps or []]
+        target_companies = {_norm(c) for c in companies or []}
+
+        def score(problem: dict) -> float:
+            terms = self._terms[str(problem["id"])]
+            value = problem.get("frequency", 0)
+            # A gap matches when at least half of its words name the problem's topics
+            if any(gap and len(gap & terms) * 2 >= len(gap) for gap in gap_terms):
+                value += GAP_MATCH_BONUS
+            if target_companies & {_norm(c) for c in problem.get("companies", [])}:
+                value += COMPANY_MATCH_BONUS
+            return value
+
+        # Nearest difficulty first: Medium -> Medium, then Easy/Hard
+        target = DIFFICULTIES.index(difficulty) if difficulty in DIFFICULTIES else 0
+        for level in sorted(DIFFICULTIES, key=lambda d: abs(DIFFICULTIES.index(d) - target)):
+            candidates = [p for p in self.by_difficulty(level) if is_open(p)]
+            if candidates:
+                return max(candidates, key=score)
+        return max(remaining, key=score)
+
+    def related(self, problem: dict, completed: Iterable[str] = (), limit: int = 2) -> List[dict]:
+        """Other problems in the same category, most asked first."""
+        done = {_norm(c) for c in completed or []}
+        return [
+            p for p in self.by_category(problem.get("category", ""))
+            if p is not problem and str(p["id"]) not in done and _norm(p["title"]) not in done
+        ][:limit]
+
+
+_catalog: Optional[ProblemCatalog] = None
+
+
+def get_problem_catalog() -> ProblemCatalog:
+    """Shared catalog, indexed from problems.json on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = ProblemCatalog()
+    return _catalog
@@ -0,0 +1,199 @@
+"""
+Rate Scheduler - Admission control for OpenAI chat completions
+Keeps requests-per-minute and tokens-per-minute token buckets per model and
+admits queued calls in priority order, so bursts wait in line instead of
+coming back as 429s.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional
+
+from app.config import get_settings
+from app.services.token_budget import estimate_request_tokens
+
+settings = get_settings()
+
+# Priority lanes (lower runs first)
+PRIORITY_INTERACTIVE = 0  # user is staring at a spinner (resume upload, role matching)
+PRIORITY_DEFAULT = 1
+PRIORITY_BACKGROUND = 2  # nice-to-have work (bonus topics, prewarming)
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_DEFAULT: "default",
+    PRIORITY_BACKGROUND: "background",
+}
+
+# Per-model overrides of (requests per minute, tokens per minute)
+MODEL_LIMITS: Dict[str, tuple] = {}
+
+
+def estimate_tokens(messages: List[dict], max_tokens: Optional[int] = None, model: Optional[str] = None) -> int:
+    """
+    Token cost of a chat completion as OpenAI meters it:
+    prompt tokens (counted with the model's tokenizer) + requested max_tokens.
+    """
+    return estimate_request_tokens(messages, max_tokens, model or settings.openai_model)
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at capacity per 60 seconds."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.refill_rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.refill_rate)
+        self.updated = now
+
+    def time_until(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self) -> None:
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class _ModelLane:
+    """Buckets, priority queue and dispatcher for one model."""
+
+    def __init__(self, model: str):
+        rpm, tpm = MODEL_LIMITS.get(model, (settings.openai_rpm_limit, settings.openai_tpm_limit))
+        self.model = model
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.queue: list = []
+        self.dispatcher: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()
+
+
+class RateScheduler:
+    """
+    Priority admission queue in front of the OpenAI client.
+
+    acquire() enqueues the call and returns once both the RPM and TPM buckets
+    for the model can pay for it. The head of the queue is always the highest
+    priority (then oldest) waiter, so interactive work overtakes background work.
+    """
+
+    def __init__(self):
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._seq = itertools.count()
+        self._stats = {
+            name: {"admitted": 0, "totalWaitMs": 0.0, "maxWaitMs": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+        self.rate_limited = 0
+
+    def _lane(self, model: str) -> _ModelLane:
+        lane = self._lanes.get(model)
+        if lane is None:
+            lane = _ModelLane(model)
+            self._lanes[model] = lane
+        return lane
+
+    async def acquire(self, model: str, tokens: int, priority: int = PRIORITY_DEFAULT) -> float:
+        """Wait for admission. Returns the time spent queued in seconds."""
+        lane = self._lane(model)
+        future = asyncio.get_running_loop().create_future()
+        enqueued_at = time.monotonic()
+        heapq.heappush(lane.queue, (priority, next(self._seq), tokens, future))
+
+        if lane.dispatcher is None or lane.dispatcher.done():
+            lane.dispatcher = asyncio.create_task(self._dispatch(lane))
+        lane.wakeup.set()
+
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The dispatcher skips cancelled futures; give back anything already paid
+            if future.done() and not future.cancelled():
+                self.release(model, tokens, 0)
+            raise
+
+        waited = time.monotonic() - enqueued_at
+        stats = self._stats[PRIORITY_NAMES.get(priority, "default")]
+        stats["admitted"] += 1
+        stats["totalWaitMs"] += waited * 1000
+        stats["maxWaitMs"] = max(stats["maxWaitMs"], waited * 1000)
+        return waited
+
+    async def _dispatch(self, lane: _ModelLane) -> None:
+        while lane.queue:
+            priority, seq, tokens, future = lane.queue[0]
+            if future.done():
+                heapq.heappop(lane.queue)
+                continue
+
+            wait = max(lane.requests.time_until(1), lane.tokens.time_until(tokens))
+            if wait <= 0:
+                heapq.heappop(lane.queue)
+                lane.requests.consume(1)
+                lane.tokens.consume(tokens)
+                future.set_result(None)
+                continue
+
+            # Sleep until the head can be paid for, or until a new arrival
+            # (which may have a higher priority) wakes us up
+            lane.wakeup.clear()
+            try:
+                await asyncio.wait_for(lane.wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def release(self, model: str, estimated: int, actual: int) -> None:
+        """Refund the difference once the real token usage is known (actual=0 refunds it all)."""
+        if estimated > actual:
+            self._lane(model).tokens.refund(estimated - actual)
+
+    def penalize(self, model: str) -> None:
+        """OpenAI returned 429: empty the request bucket so the queue backs off."""
+        self.rate_limited += 1
+        self._lane(model).requests.drain()
+
+    def get_stats(self) -> dict:
+        """Queue depth per model/priority and wait time per priority lane."""
+        queues = {}
+        for model, lane in self._lanes.items():
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _, future in lane.queue:
+                if not future.done():
+                    depth[PRIORITY_NAMES.get(priority, "default")] += 1
+            queues[model] = {
+                "depth": depth,
+                "requestsAvailable": int(lane.requests.tokens),
+                "tokensAvailable": int(lane.tokens.tokens),
+            }
+
+        lanes = {}
+        for name, stats in self._stats.items():
+            lanes[name] = {
+                "admitted": stats["admitted"],
+                "avgWaitMs": round(stats["totalWaitMs"] / stats["admitted"], 1) if stats["admitted"] else 0.0,
+                "maxWaitMs": round(stats["maxWaitMs"], 1),
+            }
+
+        return {"queues": queues, "lanes": lanes, "rateLimited": self.rate_limited}
+
+
+# Singleton instance
+rate_scheduler = RateScheduler()
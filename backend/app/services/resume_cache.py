@@ -0,0 +1,106 @@
+"""
+Resume Cache - Parsed resumes and their LLM analysis by file content
+Users retry uploads, re-run onboarding and recruiters upload duplicates.
+Parsing results are keyed by a SHA-256 of the file bytes, file type and
+parser version; the LLM analysis additionally by the model and the exact
+text it was given. Same two tiers as the LLM response cache: an in-memory
+LRU plus an optional SQLite file.
+"""
+import copy
+import hashlib
+from typing import Dict, Optional
+
+from app.config import get_settings
+from app.services.llm_cache import LLMCache
+from app.services.openai_service import analyze_resume, get_mock_skill_graph
+
+settings = get_settings()
+
+
+def content_key(content: bytes, *parts: str) -> str:
+    """SHA-256 over `parts` (e.g. parser version, file type) and the file bytes."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(content)
+    return digest.hexdigest()
+
+
+class ResumeCache:
+    """
+    Parsed resumes (as dicts) and analysis results. Values are deep-copied
+    on the way in and out, so callers may mutate what they get back.
+    """
+
+    def __init__(self, enabled: bool, max_entries: int, ttl: float, disk_path: str = ""):
+        self.enabled = enabled
+        self.ttl = ttl
+        self._cache = LLMCache(max_entries=max_entries, disk_path=disk_path, table="resume_cache")
+
+    async def get_parsed(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        value = await self._cache.get(f"parsed:{key}", caller="parsed_resume")
+        return copy.deepcopy(value)
+
+    async def set_parsed(self, key: str, parsed: dict) -> None:
+        if self.enabled:
+            await self._cache.set(f"parsed:{key}", copy.deepcopy(parsed), self.ttl, caller="parsed_resume")
+
+    async def analyze(
+        self,
+        content_hash: str,
+        resume_text: str,
+        sections: Optional[Dict[str, str]] = None,
+        fallback: bool = True,
+    ) -> dict:
+        """
+        analyze_resume, answered from the cache when the same file was
+        analysed from the same text with the same model before. Only real
+        analyses are cached: when the analysis fails (or no API key is
+        configured) the mock skill graph is returned uncached, or the error
+        re-raised with `fallback=False`.
+        """
+        key = "analysis:" + content_key(
+            resume_text.encode("utf-8"), content_hash, settings.openai_model, "sections" if sections else "text"
+        )
+        if self.enabled:
+            cached = await self._cache.get(key, caller="resume_analysis")
+            if cached is not None:
+                return copy.deepcopy(cached)
+
+        try:
+            analysis = await analyze_resume(resume_text, sections)
+        except Exception as e:
+            if not fallback:
+                raise
+            print(f"OpenAI API error: {e}")
+            return get_mock_skill_graph()
+
+        if self.enabled:
+            await self._cache.set(key, copy.deepcopy(analysis), self.ttl, caller="resume_analysis")
+        return analysis
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def get_stats(self) -> dict:
+        stats = self._cache.get_stats()
+        return {
+            "enabled": self.enabled,
+            "memoryEntries": stats["memoryEntries"],
+            "maxEntries": stats["maxEntries"],
+            "diskEnabled": stats["diskEnabled"],
+            "parsed": stats["functions"].get("parsed_resume", {}),
+            "analysis": stats["functions"].get("resume_analysis", {}),
+        }
+
+
+# Singleton instance
+resume_cache = ResumeCache(
+    enabled=settings.resume_cache_enabled,
+    max_entries=settings.resume_cache_max_entries,
+    ttl=settings.resume_cache_ttl_seconds,
+    disk_path=settings.resume_cache_path,
+)
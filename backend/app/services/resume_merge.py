@@ -0,0 +1,169 @@
+"""
+Resume Merge Service - Combine per-chunk resume analyses
+Long resumes are analysed in several parallel LLM calls; this merges the
+partial skill/project/experience results into one extraction and removes
+the duplicates that appear when a skill or job is mentioned in several chunks.
+"""
+from typing import Callable, Dict, List
+
+# Least to most senior; unknown labels rank below all of these
+SENIORITY_ORDER = ["Entry", "Junior", "Mid", "Mid-Senior", "Senior", "Lead", "Staff", "Principal"]
+
+
+def _key(*values) -> tuple:
+    return tuple(str(v or "").strip().lower() for v in values)
+
+
+def _union(*lists) -> list:
+    """Concatenate lists keeping the first occurrence of each item (case-insensitive for strings)."""
+    seen = set()
+    merged = []
+    for items in lists:
+        for item in items or []:
+            marker = item.strip().lower() if isinstance(item, str) else repr(item)
+            if marker and marker not in seen:
+                seen.add(marker)
+                merged.append(item)
+    return merged
+
+
+def _as_number(value, default=0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def _larger(a, b, default=0):
+    """Whichever of two numeric-ish values is larger, as originally given."""
+    return b if _as_number(b, default) > _as_number(a, default) else a
+
+
+def _merge_records(parts: List[dict], field: str, key: Callable[[dict], tuple], combine: Callable[[dict, dict], None]) -> List[dict]:
+    """Dedupe the dicts in parts[*][field] by `key`, folding duplicates with `combine`."""
+    merged: Dict[tuple, dict] = {}
+    for part in parts:
+        for record in part.get(field) or []:
+            if not isinstance(record, dict):
+                continue
+            k = key(record)
+            if not any(k):
+                continue
+            if k in merged:
+                combine(merged[k], record)
+            else:
+                merged[k] = dict(record)
+    return list(merged.values())
+
+
+def _combine_skill(existing: dict, other: dict) -> None:
+    existing["level"] = _larger(existing.get("level", 50), other.get("level", 50), 50)
+    existing["yearsOfExperience"] = _larger(existing.get("yearsOfExperience", 0), other.get("yearsOfExperience", 0))
+    existing["_connections"] = _union(existing.get("_connections"), other.get("_connections"))
+    evidence = [e for e in _union([existing.get("evidence")], [other.get("evidence")]) if e]
+    if evidence:
+        existing["evidence"] = "; ".join(evidence)
+    if existing.get("category") in (None, "", "Other") and other.get("category"):
+        existing["category"] = other["category"]
+
+
+def _combine_project(existing: dict, other: dict) -> None:
+    existing["technologies"] = _union(existing.get("technologies"), other.get("technologies"))
+    for field in ("description", "impact", "role"):
+        if len(str(other.get(field) or "")) > len(str(existing.get(field) or "")):
+            existing[field] = other[field]
+
+
+def _combine_experience(existing: dict, other: dict) -> None:
+    existing["highlights"] = _union(existing.get("highlights"), other.get("highlights"))
+    for field in ("duration", "startDate", "endDate"):
+        if not existing.get(field) and other.get(field):
+            existing[field] = other[field]
+
+
+def _keep_longest(existing: dict, other: dict) -> None:
+    for field, value in other.items():
+        if len(str(value or "")) > len(str(existing.get(field) or "")):
+            existing[field] = value
+
+
+def _merge_skills(parts: List[dict]) -> List[dict]:
+    """Merge skills by name and rewrite the id-based connections for the merged ids."""
+    # Connections point at ids that are only unique within one chunk, so
+    # resolve them to names before merging
+    for part in parts:
+        names_by_id = {str(s.get("id")): s.get("name", "") for s in part.get("skills") or [] if isinstance(s, dict)}
+        for skill in part.get("skills") or []:
+            if isinstance(skill, dict):
+                skill["_connections"] = [
+                    names_by_id[str(c)] for c in skill.get("connections") or [] if str(c) in names_by_id
+                ]
+
+    skills = _merge_records(parts, "skills", lambda s: _key(s.get("name")), _combine_skill)
+    skills.sort(key=lambda s: _as_number(s.get("level"), 50), reverse=True)
+
+    ids_by_name = {}
+    for i, skill in enumerate(skills):
+        skill["id"] = str(i + 1)
+        ids_by_name[_key(skill.get("name"))] = skill["id"]
+    for skill in skills:
+        connections = [ids_by_name.get(_key(name)) for name in skill.pop("_connections", [])]
+        skill["connections"] = [c for c in _union(connections) if c and c != skill["id"]]
+    return skills
+
+
+def _renumber(records: List[dict], prefix: str) -> List[dict]:
+    for i, record in enumerate(records):
+        record["id"] = f"{prefix}{i + 1}"
+    return records
+
+
+def merge_resume_extractions(parts: List[dict]) -> dict:
+    """
+    Merge the analyses of several chunks of one resume into a single
+    extract_skills_from_resume result.
+
+    Skills merge by name (highest level and years win, connections are
+    re-pointed at the merged ids), projects/achievements/certifications by
+    name or title, experience by (company, role) and education by
+    (degree, institution). Years of experience and seniority take the maximum.
+    """
+    parts = [p for p in parts if isinstance(p, dict)]
+    skills = _merge_skills(parts)
+    skill_names = {_key(s.get("name")) for s in skills}
+    levels = {_key(s.get("name")): _as_number(s.get("level"), 50) for s in skills}
+
+    strongest = _union(*(p.get("strongestSkills") for p in parts))
+    strongest.sort(key=lambda name: levels.get(_key(name), 0), reverse=True)
+    strongest_count = max((len(p.get("strongestSkills") or []) for p in parts), default=0)
+
+    years = 0
+    for part in parts:
+        years = _larger(years, part.get("totalYearsExperience", 0))
+
+    seniority = [p.get("seniorityLevel") for p in parts if p.get("seniorityLevel")]
+    seniority.sort(key=lambda level: SENIORITY_ORDER.index(level) if level in SENIORITY_ORDER else -1)
+
+    return {
+        "skills": skills,
+        "projects": _renumber(
+            _merge_records(parts, "projects", lambda r: _key(r.get("name")), _combine_project), "p"
+        ),
+        "achievements": _renumber(
+            _merge_records(parts, "achievements", lambda r: _key(r.get("title")), _keep_longest), "a"
+        ),
+        "certifications": _renumber(
+            _merge_records(parts, "certifications", lambda r: _key(r.get("name")), _keep_longest), "c"
+        ),
+        "experience": _merge_records(
+            parts, "experience", lambda r: _key(r.get("company"), r.get("role")), _combine_experience
+        ),
+        "education": _merge_records(
+            parts, "education", lambda r: _key(r.get("degree"), r.get("institution")), _keep_longest
+        ),
+        "summary": max((str(p.get("summary") or "") for p in parts), key=len, default=""),
+        "strongestSkills": strongest[:strongest_count],
+        "skillGaps": [g for g in _union(*(p.get("skillGaps") for p in parts)) if _key(g) not in skill_names],
+        "totalYearsExperience": years,
+        "seniorityLevel": seniority[-1] if seniority else "Entry",
+    }
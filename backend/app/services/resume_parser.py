@@ -3,9 +3,69 @@ Robust Resume Parser Service for SkillSurge
 Supports PDF, DOCX, and TXT files with intelligent section detection
 """
 import re
-import io
-from typing import Optional, Dict, List, Tuple
-from dataclasses import dataclass
+from functools import partial
+from typing import Optional, Dict, List, Tuple, Union
+from dataclasses import asdict, dataclass
+
+from app.config import get_settings
+from app.services.extraction_pool import get_extraction_pool
+from app.services.resume_cache import content_key, resume_cache
+from app.services.skill_automaton import SkillAutomaton
+from app.services.text_extraction import clean_lines
+from app.services.token_budget import allocate_budget
+from app.services.upload_spool import SpooledUpload
+
+settings = get_settings()
+
+# Bump whenever parsing output changes, so cached ParsedResumes are not reused
+PARSER_VERSION = "2"
+
+# Which sections survive first when the prompt budget is tight (lower = kept first)
+SECTION_PROMPT_PRIORITY = {
+    'experience': 0,
+    'skills': 0,
+    'projects': 1,
+    'summary': 1,
+    'certifications': 2,
+    'education': 2,
+    'achievements': 2,
+    'header': 3,
+    'publications': 3,
+    'languages': 4,
+    'interests': 5,
+    'references': 6,
+}
+
+
+# How far extraction got: pages read, why it stopped early, and the error
+# when the extraction pool itself failed
+_NO_EXTRACTION = {"pages": 0, "truncated": None, "error": None}
+
+
+def _extraction_failure(error: Exception) -> dict:
+    return {**_NO_EXTRACTION, "error": "timeout" if isinstance(error, TimeoutError) else str(error)}
+
+
+def _compile_section_patterns(patterns: Dict[str, str], anywhere: bool = False) -> "re.Pattern":
+    """
+    One case-insensitive alternation with a named group per section, in
+    SECTION_PATTERNS order, so `match.lastgroup` classifies a line in a
+    single scan. By default the first section matching at the start of the
+    line wins (like re.match over the patterns in turn); with `anywhere`,
+    the first section whose pattern occurs anywhere in the line (like
+    re.search in turn).
+    """
+    alternatives = []
+    for name, pattern in patterns.items():
+        body = pattern[4:] if pattern.startswith('(?i)') else pattern
+        if anywhere:
+            # The lookahead tries every position for this section before the
+            # next section is considered; the empty group records the winner
+            alternatives.append(f'(?=.*?(?:{body}))(?P<{name}>)')
+        else:
+            alternatives.append(f'(?P<{name}>{body})')
+    prefix = '^' if anywhere else ''
+    return re.compile(prefix + '(?:' + '|'.join(alternatives) + ')', re.IGNORECASE)
 
 
 @dataclass
@@ -20,6 +80,11 @@ class ParsedResume:
     detected_projects: List[Dict]
     detected_certifications: List[str]
     parsing_confidence: float  # 0-1 score of parsing quality
+    content_hash: str = ""  # resume cache key of the source file
+    pages_parsed: int = 0  # PDF pages read (0 for other formats)
+    truncated: bool = False  # parsing stopped before the end of the file
+    truncation_reason: str = ""  # max_pages, max_chars or early_exit
+    extraction_error: str = ""  # no text because extraction failed ("timeout" or the error)
 
 
 class ResumeParser:
@@ -41,6 +106,9 @@ class ResumeParser:
         'interests': r'(?i)^interests?|hobbies|activities',
         'references': r'(?i)^references?',
     }
+    # Section header at the start of a line / anywhere in a header-like line
+    _SECTION_START_RE = _compile_section_patterns(SECTION_PATTERNS)
+    _SECTION_ANYWHERE_RE = _compile_section_patterns(SECTION_PATTERNS, anywhere=True)
     
     # Common technical skills to detect
     TECH_SKILLS = [
@@ -81,29 +149,73 @@ class ResumeParser:
     # URL pattern
     URL_PATTERN = r'https?://[^\s<>"{}|\\^`\[\]]+'
     
+    _EMAIL_RE = re.compile(EMAIL_PATTERN)
+    _PHONE_RE = re.compile(PHONE_PATTERN)
+    _LINKEDIN_RE = re.compile(LINKEDIN_PATTERN, re.IGNORECASE)
+    _GITHUB_RE = re.compile(GITHUB_PATTERN, re.IGNORECASE)
+    _URL_RE = re.compile(URL_PATTERN)
+    
+    # Other spellings of TECH_SKILLS entries. Matching is by whole word, so
+    # "React.js" already finds React but "ReactJS" needs an alias
+    SKILL_ALIASES = {
+        'ReactJS': 'React', 'VueJS': 'Vue', 'AngularJS': 'Angular', 'NextJS': 'Next.js',
+        'NuxtJS': 'Nuxt', 'NodeJS': 'Node.js', 'ExpressJS': 'Express',
+        'Golang': 'Go', 'Postgres': 'PostgreSQL', 'Mongo': 'MongoDB', 'K8s': 'Kubernetes',
+        'sklearn': 'Scikit-learn', 'Scikit learn': 'Scikit-learn',
+        'Amazon Web Services': 'AWS', 'Google Cloud': 'GCP',
+    }
+
+    # Every TECH_SKILLS entry and alias, found in one pass over the text
+    _SKILL_AUTOMATON = SkillAutomaton(TECH_SKILLS, SKILL_ALIASES)
+    
+    # Experience: date ranges like "Jan 2020 - Present" and "Company -" style headers
+    _DATE = r'(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s*)?(?:\d{4}|\d{1,2}/\d{2,4})'
+    _DATE_RANGE_RE = re.compile(rf'({_DATE})\s*[-–—to]+\s*({_DATE}|Present|Current|Now)', re.IGNORECASE)
+    _JOB_HEADER_RE = re.compile(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s*[-–—|,]')
+    
+    # Education
+    _DEGREE_RE = re.compile(
+        r'(?:Bachelor|Master|Ph\.?D\.?|B\.?S\.?|M\.?S\.?|B\.?A\.?|M\.?A\.?|M\.?B\.?A\.?|B\.?E\.?|B\.?Tech|M\.?Tech|Associate)[\'s]*\.?\s*(?:of|in)?\s*(?:Science|Arts|Engineering|Business|Computer|Technology)?[^,\n]*',
+        re.IGNORECASE,
+    )
+    _YEAR_RE = re.compile(r'(19|20)\d{2}')
+    _GPA_RE = re.compile(r'(?:GPA|CGPA)[\s:]*(\d+\.?\d*)', re.IGNORECASE)
+    
     def __init__(self):
         self.supported_formats = ['pdf', 'docx', 'doc', 'txt', 'rtf']
     
-    async def parse(self, file_content: bytes, filename: str) -> ParsedResume:
+    async def parse(self, file_content: Union[bytes, SpooledUpload], filename: str) -> ParsedResume:
         """
-        Main entry point for parsing a resume file
+        Main entry point for parsing a resume file (bytes, or a spooled
+        upload whose temp file the extractors read directly)
         """
         ext = filename.lower().split('.')[-1] if '.' in filename else ''
+        if isinstance(file_content, SpooledUpload):
+            source, data = file_content.source, file_content.view
+        else:
+            source = data = file_content
         
+        # PDF and DOCX text comes back already cleaned (a streaming stage of
+        # extraction); plain text is cleaned here. PDFs are read under the
+        # page budget and report how far they got.
+        extraction = _NO_EXTRACTION
         if ext == 'pdf':
-            raw_text = await self._extract_pdf_text(file_content)
+            cleaned_text, extraction = await self._extract_pdf_text(source)
         elif ext in ['docx', 'doc']:
-            raw_text = await self._extract_docx_text(file_content)
+            cleaned_text, extraction = await self._extract_docx_text(source)
         elif ext == 'txt':
-            raw_text = self._extract_txt_text(file_content)
+            cleaned_text = self._clean_text(self._extract_txt_text(data))
         else:
             # Try PDF first, then plain text
-            raw_text = await self._extract_pdf_text(file_content)
-            if not raw_text.strip():
-                raw_text = self._extract_txt_text(file_content)
+            cleaned_text, extraction = await self._extract_pdf_text(source)
+            if not cleaned_text.strip():
+                cleaned_text = self._clean_text(self._extract_txt_text(data))
         
-        # Clean and normalize the text
-        cleaned_text = self._clean_text(raw_text)
+        # Everything below is linear in the text; cap it for every format
+        truncation_reason = extraction["truncated"] or ""
+        if len(cleaned_text) > settings.resume_max_chars:
+            cleaned_text = cleaned_text[:settings.resume_max_chars]
+            truncation_reason = truncation_reason or "max_chars"
         
         # Parse structured data
         sections = self._detect_sections(cleaned_text)
@@ -126,121 +238,69 @@ class ResumeParser:
             detected_education=education,
             detected_projects=projects,
             detected_certifications=certifications,
-            parsing_confidence=confidence
+            parsing_confidence=confidence,
+            pages_parsed=extraction["pages"],
+            truncated=bool(truncation_reason),
+            truncation_reason=truncation_reason,
+            extraction_error="" if cleaned_text.strip() else extraction["error"] or "",
         )
     
-    async def _extract_pdf_text(self, content: bytes) -> str:
+    async def _extract_pdf_text(self, content: Union[bytes, str]) -> Tuple[str, dict]:
         """
-        Extract text from PDF using multiple methods for robustness
+        Extract text from PDF bytes or a file path, fastest backend first,
+        escalating only on poor text quality (in the extraction pool, off
+        the event loop). Pages are read under the parsing budget; returns
+        the text and {pages, truncated, error} for the backend whose text
+        was used. `error` is set only when the pool failed (timeout, worker
+        crash or memory cap), not for a document no backend can read.
         """
-        text = ""
-        
-        # Method 1: PyPDF2 (primary)
+        stop_when = None
+        if settings.resume_early_exit_confidence > 0:
+            stop_when = partial(_resume_looks_complete, min_confidence=settings.resume_early_exit_confidence)
         try:
-            import PyPDF2
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(content))
-            for page in pdf_reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
+            text, attempts = await get_extraction_pool().run(
+                "pdf",
+                content,
+                backends=[b.strip() for b in settings.pdf_backend_order.split(",") if b.strip()],
+                min_quality=settings.pdf_min_quality,
+                max_pages=settings.pdf_max_pages,
+                max_chars=settings.resume_max_chars,
+                stop_when=stop_when,
+                stop_after_pages=settings.pdf_early_exit_after_pages,
+            )
         except Exception as e:
-            print(f"PyPDF2 extraction failed: {e}")
-        
-        # Method 2: pdfplumber (better for complex layouts)
-        if not text.strip():
-            try:
-                import pdfplumber
-                with pdfplumber.open(io.BytesIO(content)) as pdf:
-                    for page in pdf.pages:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text += page_text + "\n"
-            except ImportError:
-                pass  # pdfplumber not installed
-            except Exception as e:
-                print(f"pdfplumber extraction failed: {e}")
-        
-        # Method 3: pdfminer (most robust for text extraction)
-        if not text.strip():
-            try:
-                from pdfminer.high_level import extract_text as pdfminer_extract
-                text = pdfminer_extract(io.BytesIO(content))
-            except ImportError:
-                pass  # pdfminer not installed
-            except Exception as e:
-                print(f"pdfminer extraction failed: {e}")
-        
-        # Method 4: PyMuPDF/fitz (fastest and handles many edge cases)
-        if not text.strip():
-            try:
-                import fitz  # PyMuPDF
-                doc = fitz.open(stream=content, filetype="pdf")
-                for page in doc:
-                    text += page.get_text() + "\n"
-                doc.close()
-            except ImportError:
-                pass  # PyMuPDF not installed
-            except Exception as e:
-                print(f"PyMuPDF extraction failed: {e}")
-        
-        return text
+            print(f"PDF extraction failed: {e}")
+            return "", _extraction_failure(e)
+        selected = next((a for a in attempts if a["selected"]), _NO_EXTRACTION)
+        return text, {**_NO_EXTRACTION, "pages": selected["pages"], "truncated": selected["truncated"]}
     
-    async def _extract_docx_text(self, content: bytes) -> str:
+    async def _extract_docx_text(self, content: Union[bytes, str]) -> Tuple[str, dict]:
         """
-        Extract text from DOCX files
+        Extract text from DOCX bytes or a file path (in the extraction pool,
+        off the event loop), in the same (text, extraction) shape as PDFs
         """
-        text = ""
-        
         try:
-            from docx import Document
-            doc = Document(io.BytesIO(content))
-            
-            # Extract paragraphs
-            for para in doc.paragraphs:
-                text += para.text + "\n"
-            
-            # Extract from tables
-            for table in doc.tables:
-                for row in table.rows:
-                    row_text = "\t".join([cell.text for cell in row.cells])
-                    text += row_text + "\n"
-                    
-        except ImportError:
-            print("python-docx not installed, trying alternative method")
-            # Fallback: try to extract as XML
-            try:
-                import zipfile
-                import xml.etree.ElementTree as ET
-                
-                with zipfile.ZipFile(io.BytesIO(content)) as zf:
-                    doc_xml = zf.read('word/document.xml')
-                    tree = ET.fromstring(doc_xml)
-                    # Extract all text nodes
-                    for elem in tree.iter():
-                        if elem.text:
-                            text += elem.text + " "
-            except Exception as e:
-                print(f"DOCX XML extraction failed: {e}")
+            text, _ = await get_extraction_pool().run("docx", content)
+            return text, _NO_EXTRACTION
         except Exception as e:
             print(f"DOCX extraction failed: {e}")
-        
-        return text
+            return "", _extraction_failure(e)
     
-    def _extract_txt_text(self, content: bytes) -> str:
+    def _extract_txt_text(self, content) -> str:
         """
-        Extract text from plain text files
+        Extract text from plain text files (bytes or a memory-mapped view)
         """
         # Try different encodings
         encodings = ['utf-8', 'latin-1', 'cp1252', 'ascii']
         
         for encoding in encodings:
             try:
-                return content.decode(encoding)
+                return str(content, encoding)
             except (UnicodeDecodeError, AttributeError):
                 continue
         
         # Last resort: decode with errors ignored
-        return content.decode('utf-8', errors='ignore')
+        return str(content, 'utf-8', errors='ignore')
     
     def _clean_text(self, text: str) -> str:
         """
@@ -249,26 +309,8 @@ class ResumeParser:
         if not text:
             return ""
         
-        # Remove excessive whitespace but preserve structure
-        lines = text.split('\n')
-        cleaned_lines = []
-        
-        for line in lines:
-            # Remove excessive spaces within lines
-            line = re.sub(r' {3,}', '  ', line)
-            # Remove control characters except newlines
-            line = re.sub(r'[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]', '', line)
-            # Strip trailing/leading whitespace
-            line = line.strip()
-            
-            if line:
-                cleaned_lines.append(line)
-        
-        # Join lines, collapsing multiple blank lines
-        result = '\n'.join(cleaned_lines)
-        result = re.sub(r'\n{3,}', '\n\n', result)
-        
-        return result
+        # Collapse space runs, drop control characters and blank lines
+        return '\n'.join(clean_lines((text,)))
     
     def _detect_sections(self, text: str) -> Dict[str, str]:
         """
@@ -283,27 +325,18 @@ class ResumeParser:
             line_stripped = line.strip()
             
             # Check if this line is a section header
-            section_found = None
-            for section_name, pattern in self.SECTION_PATTERNS.items():
-                if re.match(pattern, line_stripped):
-                    section_found = section_name
-                    break
+            match = self._SECTION_START_RE.match(line_stripped)
             
             # Also check for common header formats: ALL CAPS, ending with colon
-            if not section_found and line_stripped:
+            if not match and line_stripped:
                 # ALL CAPS line with 2+ words is likely a header
                 if line_stripped.isupper() and len(line_stripped.split()) <= 4:
-                    for section_name, pattern in self.SECTION_PATTERNS.items():
-                        if re.search(pattern, line_stripped):
-                            section_found = section_name
-                            break
+                    match = self._SECTION_ANYWHERE_RE.match(line_stripped)
                 # Line ending with colon
                 elif line_stripped.endswith(':'):
-                    header_text = line_stripped[:-1]
-                    for section_name, pattern in self.SECTION_PATTERNS.items():
-                        if re.search(pattern, header_text):
-                            section_found = section_name
-                            break
+                    match = self._SECTION_ANYWHERE_RE.match(line_stripped[:-1])
+            
+            section_found = match.lastgroup if match else None
             
             if section_found:
                 # Save previous section
@@ -327,22 +360,22 @@ class ResumeParser:
         contact = {}
         
         # Email
-        email_match = re.search(self.EMAIL_PATTERN, text)
+        email_match = self._EMAIL_RE.search(text)
         if email_match:
             contact['email'] = email_match.group()
         
         # Phone
-        phone_match = re.search(self.PHONE_PATTERN, text)
+        phone_match = self._PHONE_RE.search(text)
         if phone_match:
             contact['phone'] = phone_match.group()
         
         # LinkedIn
-        linkedin_match = re.search(self.LINKEDIN_PATTERN, text, re.IGNORECASE)
+        linkedin_match = self._LINKEDIN_RE.search(text)
         if linkedin_match:
             contact['linkedin'] = linkedin_match.group()
         
         # GitHub
-        github_match = re.search(self.GITHUB_PATTERN, text, re.IGNORECASE)
+        github_match = self._GITHUB_RE.search(text)
         if github_match:
             contact['github'] = github_match.group()
         
@@ -351,9 +384,9 @@ class ResumeParser:
         for line in lines[:5]:  # Check first 5 lines
             line = line.strip()
             # Skip if it looks like contact info
-            if line and not re.search(self.EMAIL_PATTERN, line) and \
-               not re.search(self.PHONE_PATTERN, line) and \
-               not re.search(self.URL_PATTERN, line):
+            if line and not self._EMAIL_RE.search(line) and \
+               not self._PHONE_RE.search(line) and \
+               not self._URL_RE.search(line):
                 # Check if it looks like a name (2-4 words, capitalized)
                 words = line.split()
                 if 1 <= len(words) <= 4:
@@ -365,38 +398,13 @@ class ResumeParser:
     
     def _detect_skills(self, text: str) -> List[str]:
         """
-        Detect technical skills mentioned in the resume
+        Detect technical skills mentioned in the resume (whole words,
+        case-insensitive, plus SKILL_ALIASES). Entries of skill lists are
+        matched the same way: a spelling variant missing from the aliases
+        is not found, and a longer word no longer matches a skill inside it
+        ("JavaScript" is not Java).
         """
-        found_skills = []
-        text_lower = text.lower()
-        
-        for skill in self.TECH_SKILLS:
-            # Use word boundary matching for accuracy
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if re.search(pattern, text, re.IGNORECASE):
-                found_skills.append(skill)
-        
-        # Also look for skills in parentheses or after colons (common skill list format)
-        skill_list_patterns = [
-            r'(?:skills?|technologies?|tech stack|stack)[\s:]+([^\n]+)',
-            r'\(([^)]+)\)',  # Parenthetical mentions
-        ]
-        
-        for pattern in skill_list_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # Split by common delimiters
-                potential_skills = re.split(r'[,;|/•·]', match)
-                for ps in potential_skills:
-                    ps = ps.strip()
-                    if ps and len(ps) < 30:  # Reasonable skill name length
-                        # Check if it matches any known skill
-                        for known in self.TECH_SKILLS:
-                            if known.lower() in ps.lower():
-                                if known not in found_skills:
-                                    found_skills.append(known)
-        
-        return found_skills
+        return self._SKILL_AUTOMATON.find(text)
     
     def _parse_experience(self, experience_text: str) -> List[Dict]:
         """
@@ -406,10 +414,6 @@ class ResumeParser:
         if not experience_text:
             return experiences
         
-        # Pattern for date ranges
-        date_pattern = r'(?:(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\.?\s*)?(?:\d{4}|\d{1,2}/\d{2,4})'
-        date_range_pattern = rf'({date_pattern})\s*[-–—to]+\s*({date_pattern}|Present|Current|Now)'
-        
         # Split by likely job entries (look for patterns like company names, dates)
         lines = experience_text.split('\n')
         current_job = {}
@@ -421,14 +425,14 @@ class ResumeParser:
                 continue
             
             # Check for date range (indicates new job)
-            date_match = re.search(date_range_pattern, line, re.IGNORECASE)
+            date_match = self._DATE_RANGE_RE.search(line)
             
             # Check if line looks like a job title or company
             looks_like_header = (
                 line.isupper() or 
                 '|' in line or 
                 date_match or
-                re.match(r'^[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s*[-–—|,]', line)
+                self._JOB_HEADER_RE.match(line)
             )
             
             if looks_like_header and (current_job or date_match):
@@ -451,7 +455,7 @@ class ResumeParser:
                     current_job['endDate'] = date_match.group(2)
                     current_job['duration'] = f"{date_match.group(1)} - {date_match.group(2)}"
                     # Remove date from line for further parsing
-                    line = re.sub(date_range_pattern, '', line).strip()
+                    line = self._DATE_RANGE_RE.sub('', line).strip()
                 
                 # Try to split company and role
                 if '|' in line:
@@ -494,9 +498,6 @@ class ResumeParser:
         if not education_text:
             return education
         
-        # Common degree patterns
-        degree_pattern = r'(?:Bachelor|Master|Ph\.?D\.?|B\.?S\.?|M\.?S\.?|B\.?A\.?|M\.?A\.?|M\.?B\.?A\.?|B\.?E\.?|B\.?Tech|M\.?Tech|Associate)[\'s]*\.?\s*(?:of|in)?\s*(?:Science|Arts|Engineering|Business|Computer|Technology)?[^,\n]*'
-        
         lines = education_text.split('\n')
         current_edu = {}
         
@@ -506,13 +507,13 @@ class ResumeParser:
                 continue
             
             # Check for degree
-            degree_match = re.search(degree_pattern, line, re.IGNORECASE)
+            degree_match = self._DEGREE_RE.search(line)
             
             # Check for year
-            year_match = re.search(r'(19|20)\d{2}', line)
+            year_match = self._YEAR_RE.search(line)
             
             # Check for GPA
-            gpa_match = re.search(r'(?:GPA|CGPA)[\s:]*(\d+\.?\d*)', line, re.IGNORECASE)
+            gpa_match = self._GPA_RE.search(line)
             
             if degree_match or (line.isupper() and len(line.split()) <= 6):
                 # Save previous education
@@ -575,10 +576,10 @@ class ResumeParser:
                 current_description = []
                 
                 # Check for GitHub link
-                github_match = re.search(self.URL_PATTERN, line)
+                github_match = self._URL_RE.search(line)
                 if github_match:
                     current_project['link'] = github_match.group()
-                    current_project['name'] = re.sub(self.URL_PATTERN, '', line).strip()
+                    current_project['name'] = self._URL_RE.sub('', line).strip()
             else:
                 # Description line
                 bullet = line.lstrip('•-●○*▪► ').strip()
@@ -653,11 +654,41 @@ class ResumeParser:
 resume_parser = ResumeParser()
 
 
-async def parse_resume_file(content: bytes, filename: str) -> ParsedResume:
+def _resume_looks_complete(text: str, min_confidence: float) -> bool:
     """
-    Parse a resume file and return structured data
+    Early exit for PDF extraction: the raw text of the pages read so far
+    already parses with at least `min_confidence`. Runs in the extraction
+    worker, which imports this module to unpickle it.
     """
-    return await resume_parser.parse(content, filename)
+    cleaned = resume_parser._clean_text(text)
+    sections = resume_parser._detect_sections(cleaned)
+    confidence = resume_parser._calculate_confidence(
+        sections,
+        resume_parser._detect_skills(cleaned),
+        resume_parser._parse_experience(sections.get('experience', '')),
+    )
+    return confidence >= min_confidence
+
+
+async def parse_resume_file(content: Union[bytes, SpooledUpload], filename: str) -> ParsedResume:
+    """
+    Parse a resume file (bytes or a spooled upload) and return structured
+    data. Identical files are answered from the resume cache.
+    """
+    ext = filename.lower().split('.')[-1] if '.' in filename else ''
+    data = content.view if isinstance(content, SpooledUpload) else content
+    key = content_key(data, PARSER_VERSION, ext)
+    
+    cached = await resume_cache.get_parsed(key)
+    if cached is not None:
+        return ParsedResume(**cached)
+    
+    parsed = await resume_parser.parse(content, filename)
+    parsed.content_hash = key
+    # Empty text may be a transient extraction failure (timeout); retry next time
+    if parsed.raw_text.strip():
+        await resume_cache.set_parsed(key, asdict(parsed))
+    return parsed
 
 
 def get_enhanced_prompt_context(parsed: ParsedResume) -> str:
@@ -674,10 +705,18 @@ def get_enhanced_prompt_context(parsed: ParsedResume) -> str:
     if parsed.detected_skills:
         context_parts.append(f"\nPRE-DETECTED SKILLS: {', '.join(parsed.detected_skills)}")
     
-    # Sections
-    for section_name, content in parsed.sections.items():
-        if content.strip():
-            context_parts.append(f"\n=== {section_name.upper()} ===\n{content[:3000]}")
+    # Sections, fitted into the token budget by priority
+    sections = allocate_budget(
+        [
+            (name, content, SECTION_PROMPT_PRIORITY.get(name, 3))
+            for name, content in parsed.sections.items()
+            if content.strip()
+        ],
+        settings.resume_context_tokens,
+        settings.openai_model,
+    )
+    for section_name, content in sections.items():
+        context_parts.append(f"\n=== {section_name.upper()} ===\n{content}")
     
     # If we have parsed experience, include it
     if parsed.detected_experience:
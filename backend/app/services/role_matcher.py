@@ -0,0 +1,173 @@
+"""
+Role Matcher - Local, deterministic role matching over app/data/jobs.json
+The job catalog is compiled once into a skill vocabulary and, per role, the
+indices of the skills it lists; a user's proficiency vector is scored
+against every role in one plain-Python pass over those index lists.
+"""
+import json
+import math
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.services.skill_fingerprint import normalize_skill_name
+
+JOBS_PATH = Path(__file__).resolve().parent.parent / "data" / "jobs.json"
+
+# Proficiency a role expects for each listed skill (the catalog lists names only)
+REQUIRED_LEVEL = 70
+# Below this a skill counts as a gap even if the candidate lists it
+MATCH_LEVEL = 50
+# Rough learning pace used for timeToReady: proficiency points per week
+POINTS_PER_WEEK = 20
+
+
+def _skill_levels(skills: Iterable, default_level: int = REQUIRED_LEVEL) -> Dict[str, float]:
+    """
+    {normalized name: level 0-100} from plain names or dicts with
+    "proficiency"/"level". Plain names are taken to meet the requirement.
+    """
+    levels: Dict[str, float] = {}
+    for skill in skills or []:
+        if isinstance(skill, dict):
+            name = skill.get("name", "")
+            level = skill.get("proficiency", skill.get("level", default_level))
+        else:
+            name, level = skill, default_level
+        name = normalize_skill_name(name)
+        if not name:
+            continue
+        try:
+            level = float(level)
+        except (TypeError, ValueError):
+            level = default_level
+        levels[name] = max(levels.get(name, 0.0), min(max(level, 0.0), 100.0))
+    return levels
+
+
+def _coverage(level: float) -> float:
+    """Share of a requirement met by a skill at `level`."""
+    return min(level / REQUIRED_LEVEL, 1.0)
+
+
+def score_requirements(skills: Iterable, requirements: Iterable[str]) -> int:
+    """Match score 0-100 of a skill list against one arbitrary requirement list."""
+    levels = _skill_levels(skills)
+    required = {normalize_skill_name(r) for r in requirements or []} - {""}
+    if not required:
+        return 0
+    return round(sum(_coverage(levels.get(r, 0.0)) for r in required) / len(required) * 100)
+
+
+def _time_to_ready(deficit: float) -> str:
+    if deficit <= 0:
+        return "Ready now"
+    weeks = max(1, math.ceil(deficit / POINTS_PER_WEEK))
+    return f"{weeks}-{weeks + 2} weeks"
+
+
+class RoleMatcher:
+    """
+    Scores a candidate against every role in the job catalog.
+
+    A candidate becomes a coverage vector (level / REQUIRED_LEVEL, capped
+    at 1) over the catalog's skill vocabulary, so the match score of a role
+    is the mean coverage of the skills it lists.
+    """
+
+    def __init__(self, jobs: Optional[List[dict]] = None):
+        if jobs is None:
+            with open(JOBS_PATH, encoding="utf-8") as f:
+                jobs = json.load(f)
+        self.jobs = jobs
+        self.vocabulary: Dict[str, int] = {}
+        self.display_names: List[str] = []
+        self.role_skills: List[List[int]] = []
+
+        for job in jobs:
+            indices = []
+            for skill in job.get("skills", []):
+                name = normalize_skill_name(skill)
+                if name not in self.vocabulary:
+                    self.vocabulary[name] = len(self.display_names)
+                    self.display_names.append(skill)
+                if self.vocabulary[name] not in indices:
+                    indices.append(self.vocabulary[name])
+            self.role_skills.append(indices)
+
+    def _levels_vector(self, levels: Dict[str, float]) -> List[float]:
+        vector = [0.0] * len(self.display_names)
+        for name, level in levels.items():
+            index = self.vocabulary.get(name)
+            if index is not None:
+                vector[index] = level
+        return vector
+
+    def _scores(self, vector: List[float]) -> List[float]:
+        coverage = [_coverage(level) for level in vector]
+        return [
+            sum(coverage[i] for i in indices) / len(indices) * 100 if indices else 0.0
+            for indices in self.role_skills
+        ]
+
+    def match(self, skills: Iterable, top_k: int = 5) -> List[dict]:
+        """
+        Top-k roles for a skill list, best first, in the same shape the LLM
+        matcher returns (matchScore, skills with candidate/required levels,
+        gaps, timeToReady, focusAreas). whyGoodFit is a plain summary that
+        callers may replace with generated text.
+        """
+        vector = self._levels_vector(_skill_levels(skills))
+        scores = self._scores(vector)
+        ranked = sorted(range(len(self.jobs)), key=lambda row: (-scores[row], row))[:top_k]
+
+        roles = []
+        for row in ranked:
+            job = self.jobs[row]
+            required = []
+            matched = []
+            gaps = []
+            deficit = 0.0
+            for index in self.role_skills[row]:
+                level = vector[index]
+                name = self.display_names[index]
+                is_match = level >= MATCH_LEVEL
+                required.append({
+                    "name": name,
+                    "match": is_match,
+                    "candidateLevel": round(level),
+                    "requiredLevel": REQUIRED_LEVEL,
+                })
+                (matched if is_match else gaps).append(name)
+                deficit += max(REQUIRED_LEVEL - level, 0.0)
+
+            roles.append({
+                "id": job.get("id", str(row + 1)),
+                "title": job.get("title", ""),
+                "company": job.get("company", ""),
+                "location": job.get("location", ""),
+                "matchScore": round(scores[row]),
+                "salary": job.get("salary", ""),
+                "demand": job.get("demand", ""),
+                "experience": job.get("experience", ""),
+                "skills": required,
+                "matchedSkills": matched,
+                "gaps": gaps,
+                "timeToReady": _time_to_ready(deficit),
+                "whyGoodFit": (
+                    f"Matches {len(matched)} of {len(required)} required skills"
+                    + (f": {', '.join(matched)}" if matched else "")
+                ),
+                "focusAreas": [f"Build up {gap}" for gap in gaps],
+            })
+        return roles
+
+
+_matcher: Optional[RoleMatcher] = None
+
+
+def get_role_matcher() -> RoleMatcher:
+    """Shared matcher, compiled from jobs.json on first use."""
+    global _matcher
+    if _matcher is None:
+        _matcher = RoleMatcher()
+    return _matcher
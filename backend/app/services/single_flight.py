@@ -0,0 +1,77 @@
+"""
+Single-flight request coalescing
+Concurrent callers asking for the same key share one in-flight upstream call
+instead of each starting their own.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+# Every group created in the process, for stats reporting
+_groups: Dict[str, "SingleFlight"] = {}
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls.
+
+    The first caller for a key (the leader) starts the work as a separate task;
+    everyone arriving while it runs awaits the same task. The task is shielded,
+    so one caller being cancelled (e.g. a closed browser tab) does not cancel
+    the work for the others; only when every waiter has gone is it cancelled.
+    Once it finishes the key is forgotten, so later calls start fresh -
+    caching results is the caller's job.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._waiters: Dict[str, int] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        _groups[name] = self
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn() once per key at a time and return its result to every waiter."""
+        self.calls += 1
+
+        task = self._in_flight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _t, k=key: self._forget(k, _t))
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            self._waiters[key] -= 1
+            if not self._waiters[key]:
+                del self._waiters[key]
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved when every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "inFlight": len(self._in_flight),
+        }
+
+
+def get_single_flight_stats() -> dict:
+    """Stats for every single-flight group, keyed by group name."""
+    return {name: group.get_stats() for name, group in _groups.items()}
@@ -0,0 +1,106 @@
+"""
+Skill Automaton - Multi-pattern skill detection in one pass
+An Aho-Corasick automaton over a skill taxonomy: every known skill in a text
+is found in a single left-to-right scan, so the cost depends on the length
+of the text (plus matches), not on how many skills the taxonomy lists.
+Matching is case-insensitive with word-boundary semantics; spelling
+variants ("ReactJS", "Golang") are matched through aliases.
+"""
+from typing import Dict, Iterable, List, Optional
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == '_'
+
+
+class SkillAutomaton:
+    """
+    Aho-Corasick over lowercased skill names.
+
+    A match only counts when the characters on either side are not word
+    characters, so "Go" is found in "Go, Rust" but not in "Google", and
+    "C++" is found before a space or comma. `aliases` maps other spellings
+    to a skill name; a match on an alias reports that skill.
+    """
+
+    def __init__(self, skills: Iterable[str], aliases: Optional[Dict[str, str]] = None):
+        # Display names in taxonomy order; results keep this order
+        self.skills: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # (skill index, pattern length) for every pattern ending at a state,
+        # including those reached through failure links
+        self._output: List[List[tuple]] = [[]]
+
+        seen = {}
+        for skill in skills:
+            pattern = skill.lower()
+            if not pattern or pattern in seen:
+                continue
+            seen[pattern] = len(self.skills)
+            self._add(pattern, len(self.skills))
+            self.skills.append(skill)
+        for alias, skill in (aliases or {}).items():
+            pattern = alias.lower()
+            index = seen.get(skill.lower())
+            if not pattern or pattern in seen or index is None:
+                continue
+            seen[pattern] = index
+            self._add(pattern, index)
+        self._link()
+
+    def _add(self, pattern: str, index: int) -> None:
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+        self._output[state].append((index, len(pattern)))
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs are merged along them."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    def find(self, text: str) -> List[str]:
+        """Skills that occur in `text` as whole words, in taxonomy order."""
+        if not text:
+            return []
+        text = text.lower()
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        end = len(text)
+        found = set()
+        state = 0
+
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not output[state]:
+                continue
+            for index, length in output[state]:
+                if index in found:
+                    continue
+                start = i - length + 1
+                if start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if i + 1 < end and _is_word_char(text[i + 1]):
+                    continue
+                found.add(index)
+
+        return [self.skills[index] for index in sorted(found)]
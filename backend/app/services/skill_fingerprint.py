@@ -0,0 +1,97 @@
+"""
+Skill Fingerprint - Canonical identity of a skill profile
+Reduces a skill list to normalized, sorted names with proficiency bands so
+requests that differ only in ordering, casing, aliases or small level changes
+map to the same key and can share one cached role-matching answer.
+"""
+import hashlib
+import json
+import re
+from typing import Dict, Iterable, Optional
+
+# Spellings that mean the same skill
+SKILL_ALIASES = {
+    "js": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "node": "node.js",
+    "nodejs": "node.js",
+    "expressjs": "express",
+    "express.js": "express",
+    "nextjs": "next.js",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "mongo": "mongodb",
+    "py": "python",
+    "python3": "python",
+    "c sharp": "c#",
+    "csharp": "c#",
+    "cpp": "c++",
+    "amazon web services": "aws",
+    "gcp": "google cloud",
+    "ml": "machine learning",
+    "dsa": "data structures & algorithms",
+    "data structures and algorithms": "data structures & algorithms",
+}
+
+# (lower bound, band) from highest to lowest - the same thresholds the
+# role-matching prompt uses for strong / needs improvement / gap
+PROFICIENCY_BANDS = ((80, "advanced"), (50, "intermediate"), (0, "beginner"))
+
+_BAND_RANK = {band: i for i, (_, band) in enumerate(reversed(PROFICIENCY_BANDS))}
+
+
+def normalize_skill_name(name: str) -> str:
+    """Lowercase, collapse whitespace and resolve common aliases."""
+    name = re.sub(r"\s+", " ", str(name or "").strip().lower())
+    return SKILL_ALIASES.get(name, name)
+
+
+def proficiency_band(level) -> str:
+    try:
+        level = float(level)
+    except (TypeError, ValueError):
+        level = 50
+    for lower, band in PROFICIENCY_BANDS:
+        if level >= lower:
+            return band
+    return PROFICIENCY_BANDS[-1][1]
+
+
+def canonical_skills(skills: Iterable, with_levels: bool = True, default_level: int = 50) -> Dict[str, Optional[str]]:
+    """
+    Sorted {normalized name: band} for a skill list. Skills may be plain
+    names or dicts with "name" and "proficiency"/"level"; a skill listed
+    twice keeps its higher band. Bands are None when with_levels is False.
+    """
+    result: Dict[str, Optional[str]] = {}
+    for skill in skills or []:
+        if isinstance(skill, dict):
+            name = skill.get("name", "")
+            level = skill.get("proficiency", skill.get("level", default_level))
+        else:
+            name, level = skill, default_level
+        name = normalize_skill_name(name)
+        if not name:
+            continue
+        band = proficiency_band(level) if with_levels else None
+        if name not in result or (band and _BAND_RANK[band] > _BAND_RANK.get(result[name], -1)):
+            result[name] = band
+    return dict(sorted(result.items()))
+
+
+def skill_fingerprint(skills: Iterable, with_levels: bool = True, extra: Optional[dict] = None) -> str:
+    """
+    Stable hash of a skill profile. `extra` adds other inputs that change the
+    answer (e.g. experience) to the fingerprint.
+    """
+    payload = {"skills": canonical_skills(skills, with_levels)}
+    if extra:
+        payload["extra"] = extra
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
@@ -3,8 +3,11 @@ Supabase Service - Database operations for SkillSurge
 """
 from supabase import create_client, Client
 from app.config import get_settings
+from app.services.single_flight import SingleFlight
 from typing import Optional
 from datetime import datetime, date, timedelta
+import asyncio
+import copy
 import json
 
 settings = get_settings()
@@ -17,6 +20,9 @@ if settings.supabase_url and settings.supabase_service_key:
     except Exception as e:
         print(f"Failed to initialize Supabase client: {e}")
 
+# Concurrent reads of the same row share one query
+_read_flight = SingleFlight("supabase")
+
 
 async def create_profile(user_id: str, profile_data: dict) -> dict:
     """
@@ -80,12 +86,20 @@ async def create_profile(user_id: str, profile_data: dict) -> dict:
 async def get_profile(user_id: str) -> Optional[dict]:
     """
     Get a user profile from Supabase with full knowledge graph data.
+    Concurrent requests for the same user are coalesced into one query.
     """
     if not supabase:
         raise Exception("Supabase not configured")
     
+    profile = await _read_flight.do(f"profile:{user_id}", lambda: _fetch_profile(user_id))
+    # Each caller gets its own copy since endpoints mutate what they fetch
+    return copy.deepcopy(profile)
+
+
+async def _fetch_profile(user_id: str) -> Optional[dict]:
     try:
-        result = supabase.table("profiles").select("*").eq("user_id", user_id).execute()
+        query = supabase.table("profiles").select("*").eq("user_id", user_id)
+        result = await asyncio.to_thread(query.execute)
         
         if result.data and len(result.data) > 0:
             profile = result.data[0]
@@ -173,12 +187,19 @@ async def save_roadmap(user_id: str, roadmap_data: dict, target_role: str) -> di
 async def get_roadmap(user_id: str) -> Optional[dict]:
     """
     Get a user's roadmap from Supabase.
+    Concurrent requests for the same user are coalesced into one query.
     """
     if not supabase:
         raise Exception("Supabase not configured")
     
+    roadmap = await _read_flight.do(f"roadmap:{user_id}", lambda: _fetch_roadmap(user_id))
+    return copy.deepcopy(roadmap)
+
+
+async def _fetch_roadmap(user_id: str) -> Optional[dict]:
     try:
-        result = supabase.table("roadmaps").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1).execute()
+        query = supabase.table("roadmaps").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(1)
+        result = await asyncio.to_thread(query.execute)
         
         if result.data and len(result.data) > 0:
             roadmap = result.data[0]
@@ -456,6 +477,70 @@ async def get_completed_problems(user_id: str) -> list:
         raise e
 
 
+async def save_daily_assignment(user_id: str, day: date, assignment: dict) -> dict:
+    """
+    Store the precomputed daily problem for (user_id, day). Re-running the
+    batch for the same day overwrites the earlier assignment.
+    """
+    if not supabase:
+        raise Exception("Supabase not configured")
+    
+    try:
+        record = {
+            "user_id": user_id,
+            "date": day.isoformat(),
+            "assignment": json.dumps(assignment),
+        }
+        query = supabase.table("daily_assignments").upsert(record, on_conflict="user_id,date")
+        result = await asyncio.to_thread(query.execute)
+        return {"success": bool(result.data)}
+    except Exception as e:
+        print(f"Supabase error saving daily assignment: {e}")
+        raise e
+
+
+async def get_daily_assignment(user_id: str, day: date) -> Optional[dict]:
+    """
+    Get the precomputed daily problem for (user_id, day), or None if the
+    batch has not produced one.
+    """
+    if not supabase:
+        raise Exception("Supabase not configured")
+    
+    try:
+        query = supabase.table("daily_assignments").select("assignment").eq("user_id", user_id).eq("date", day.isoformat()).limit(1)
+        result = await asyncio.to_thread(query.execute)
+        if result.data:
+            assignment = result.data[0].get("assignment")
+            return json.loads(assignment) if isinstance(assignment, str) else assignment
+        return None
+    except Exception as e:
+        print(f"Supabase error getting daily assignment: {e}")
+        raise e
+
+
+async def get_active_user_ids(since: date) -> list:
+    """
+    Users with any recorded progress on or after `since`, plus users whose
+    profile was created since then (new users have no progress yet).
+    """
+    if not supabase:
+        raise Exception("Supabase not configured")
+    
+    try:
+        progress_query = supabase.table("user_progress").select("user_id").gte("date", since.isoformat())
+        profiles_query = supabase.table("profiles").select("user_id").gte("created_at", since.isoformat())
+        progress, profiles = await asyncio.gather(
+            asyncio.to_thread(progress_query.execute),
+            asyncio.to_thread(profiles_query.execute),
+        )
+        user_ids = {row["user_id"] for row in (progress.data or []) + (profiles.data or [])}
+        return sorted(user_ids)
+    except Exception as e:
+        print(f"Supabase error listing active users: {e}")
+        raise e
+
+
 async def calculate_job_readiness(
     user_id: str, 
     target_role: str,
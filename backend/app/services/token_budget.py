@@ -0,0 +1,188 @@
+"""
+Token Budget Service - Tokenizer-accurate prompt sizing
+Counts real tokens per model (tiktoken when available) and splits a token
+budget across prompt sections by priority, instead of slicing characters.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# Rough size of one roadmap task / week in completion tokens (measured on gpt-4o-mini output)
+TOKENS_PER_TASK = 90
+TOKENS_PER_WEEK = 80
+ROADMAP_OVERHEAD_TOKENS = 400
+
+# Hard ceiling for a single completion
+MAX_COMPLETION_TOKENS = 16000
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """
+    Tokenizer for the model, or None if tiktoken (or its BPE files) is unavailable.
+    Cached per model, including failures, so a missing tokenizer costs one lookup.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        print(f"tiktoken unavailable for {model}, using estimate: {e}")
+        return None
+
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"tiktoken unavailable for {model}, using estimate: {e}")
+        return None
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Number of tokens `text` costs for `model` (~4 chars per token without tiktoken)."""
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return (len(text) + 3) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def count_message_tokens(messages: List[dict], model: str) -> int:
+    """Prompt tokens for a chat request, including the per-message framing."""
+    return sum(count_tokens(str(m.get("content", "")), model) + 4 for m in messages) + 3
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Cut `text` to at most `max_tokens` tokens, on a token boundary."""
+    if max_tokens <= 0 or not text:
+        return ""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def allocate_budget(sections: List[Tuple[str, str, int]], budget: int, model: str) -> Dict[str, str]:
+    """
+    Fit prompt sections into `budget` tokens.
+
+    sections: (name, text, priority) - lower priority number is more important.
+    More important sections are kept whole first; the section where the budget
+    runs out is truncated and anything after it is dropped. The returned dict
+    keeps the original section order.
+    """
+    remaining = budget
+    fitted: Dict[str, str] = {}
+
+    for index in sorted(range(len(sections)), key=lambda i: sections[i][2]):
+        name, text, _ = sections[index]
+        if remaining <= 0:
+            break
+        cost = count_tokens(text, model)
+        if cost <= remaining:
+            fitted[name] = text
+            remaining -= cost
+        else:
+            fitted[name] = truncate_to_tokens(text, remaining, model)
+            remaining = 0
+
+    return {name: fitted[name] for name, _, _ in sections if fitted.get(name)}
+
+
+def _split_oversized(text: str, max_tokens: int, model: str) -> List[str]:
+    """Hard-split a single line that is larger than a whole chunk."""
+    encoding = _get_encoding(model)
+    if encoding is None:
+        step = max_tokens * 4
+        return [text[i:i + step] for i in range(0, len(text), step)]
+    tokens = encoding.encode(text, disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def chunk_sections(sections: List[Tuple[str, str]], max_tokens: int, model: str) -> List[str]:
+    """
+    Pack (name, text) sections into chunks of at most `max_tokens` tokens.
+
+    Whole sections are packed together while they fit. A section that is too
+    big on its own is split on line boundaries, and every piece repeats the
+    section heading so each chunk can be read without the others.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+
+    def flush():
+        nonlocal current, used
+        if current:
+            chunks.append("\n\n".join(current))
+        current, used = [], 0
+
+    for name, text in sections:
+        heading = f"=== {name.upper()} ==="
+        block = f"{heading}\n{text.strip()}"
+        cost = count_tokens(block, model)
+        if cost <= max_tokens:
+            if used + cost > max_tokens:
+                flush()
+            current.append(block)
+            used += cost
+            continue
+
+        # Too big for one chunk: give it chunks of its own, split by line
+        flush()
+        heading_cost = count_tokens(heading, model) + 1
+        room = max(max_tokens - heading_cost, 1)
+        lines: List[str] = []
+        lines_cost = 0
+        for line in text.strip().splitlines():
+            line_cost = count_tokens(line, model) + 1
+            pieces = [line] if line_cost <= room else _split_oversized(line, room, model)
+            for piece in pieces:
+                piece_cost = count_tokens(piece, model) + 1
+                if lines and lines_cost + piece_cost > room:
+                    chunks.append(heading + "\n" + "\n".join(lines))
+                    lines, lines_cost = [], 0
+                lines.append(piece)
+                lines_cost += piece_cost
+        # The last piece stays open so small sections that follow can share it
+        if lines:
+            current = [heading + "\n" + "\n".join(lines)]
+            used = heading_cost + lines_cost
+
+    flush()
+    return chunks
+
+
+def fit_items(items: List[str], budget: int, model: str, separator: str = ", ") -> List[str]:
+    """Take items in order while their joined size stays within `budget` tokens."""
+    kept = []
+    used = 0
+    separator_cost = count_tokens(separator, model)
+    for item in items:
+        cost = count_tokens(item, model) + (separator_cost if kept else 0)
+        if used + cost > budget:
+            break
+        kept.append(item)
+        used += cost
+    return kept
+
+
+def estimate_roadmap_output_tokens(weeks: int, tasks_per_week: int = 5, headroom: float = 1.3) -> int:
+    """
+    max_tokens for a roadmap completion sized from the expected output
+    rather than a fixed ceiling.
+    """
+    expected = ROADMAP_OVERHEAD_TOKENS + weeks * (TOKENS_PER_WEEK + tasks_per_week * TOKENS_PER_TASK)
+    return min(MAX_COMPLETION_TOKENS, int(expected * headroom))
+
+
+def estimate_request_tokens(messages: List[dict], max_tokens: Optional[int], model: str) -> int:
+    """Prompt plus requested completion: what a call is charged against the TPM limit."""
+    return count_message_tokens(messages, model) + (max_tokens or 1000)
@@ -0,0 +1,154 @@
+"""
+Upload Spool - Size-capped resume uploads without holding them in memory
+UploadLimitMiddleware rejects multipart bodies over the upload cap, from the
+Content-Length header when there is one and otherwise as soon as the
+streamed body passes it. spool_upload() then takes the file over from the
+form parser without copying it: small files are read into memory, larger
+ones stay in the parser's temp file, which is read through a read-only
+memory map, and extraction workers are handed a duplicate of its file
+descriptor rather than a pickled copy of the bytes.
+"""
+import asyncio
+import io
+import mmap
+import os
+from typing import Optional, Union
+
+from fastapi import HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+
+from app.config import get_settings
+
+settings = get_settings()
+
+# Allowance for the multipart framing and other form fields around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+def _too_large_detail(max_bytes: int) -> str:
+    return f"File too large. Maximum upload size is {max_bytes // (1024 * 1024)} MB"
+
+
+class SpooledUpload:
+    """
+    An uploaded file: bytes when small, otherwise an open descriptor of a
+    temp file on disk, owned by this object so it outlives the request's
+    form. `source` is what the extractors take (the bytes, or the
+    descriptor, which a worker process maps itself); `view` is a buffer
+    over the contents for hashing and decoding. close() unmaps and closes
+    the descriptor.
+    """
+
+    def __init__(self, filename: str, size: int, data: Optional[bytes] = None, fd: Optional[int] = None):
+        self.filename = filename
+        self.size = size
+        self.fd = fd
+        self._data = data
+        self._map: Optional[mmap.mmap] = None
+
+    @property
+    def source(self) -> Union[bytes, int]:
+        if self.fd is None:
+            return self._data
+        if os.name != "posix":
+            # Descriptors are only passed to worker processes on POSIX
+            return bytes(self.view)
+        return self.fd
+
+    @property
+    def view(self) -> Union[bytes, mmap.mmap]:
+        if self.fd is None:
+            return self._data
+        if self._map is None:
+            self._map = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self._data = b""
+
+    async def __aenter__(self) -> "SpooledUpload":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+def _spool(file, filename: str, max_bytes: int, memory_bytes: int) -> SpooledUpload:
+    size = file.seek(0, io.SEEK_END)
+    if size > max_bytes:
+        raise HTTPException(status_code=413, detail=_too_large_detail(max_bytes))
+    file.seek(0)
+    if size > memory_bytes:
+        # The form parser's SpooledTemporaryFile keeps parts under 1 MB in
+        # memory; roll it over so the file is on disk exactly once
+        if hasattr(file, "rollover"):
+            file.rollover()
+        try:
+            fd = file.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            pass  # in-memory file object: fall through to reading it
+        else:
+            file.flush()
+            return SpooledUpload(filename, size, fd=os.dup(fd))
+    return SpooledUpload(filename, size, data=file.read())
+
+
+async def spool_upload(file: UploadFile, max_bytes: Optional[int] = None) -> SpooledUpload:
+    """
+    Take over an uploaded file as a SpooledUpload, raising 413 past
+    `max_bytes` (default: the max_upload_bytes setting).
+    """
+    return await asyncio.to_thread(
+        _spool,
+        file.file,
+        file.filename or "",
+        max_bytes or settings.max_upload_bytes,
+        settings.upload_spool_memory_bytes,
+    )
+
+
+class UploadLimitMiddleware:
+    """
+    Rejects multipart/form-data requests whose body could not hold a file
+    of at most `max_bytes` with 413 before the body is read in full:
+    immediately when Content-Length says so, otherwise once the streamed
+    body passes the limit.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.max_body_bytes = max_bytes + MULTIPART_OVERHEAD_BYTES
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        if not headers.get(b"content-type", b"").startswith(b"multipart/form-data"):
+            return await self.app(scope, receive, send)
+
+        detail = _too_large_detail(self.max_bytes)
+        length = headers.get(b"content-length", b"")
+        if length.isdigit() and int(length) > self.max_body_bytes:
+            response = JSONResponse({"detail": detail}, status_code=413, headers={"Connection": "close"})
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_bytes:
+                    # Raised inside form parsing; the route turns it into a 413
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,122 @@
+"""Benchmark ResumeParser text processing on long resumes."""
+import asyncio
+import random
+import re
+import time
+
+from app.services.resume_parser import ResumeParser
+
+LINES = 600
+ROUNDS = 20
+
+HEADERS = [
+    "EXPERIENCE", "Professional Experience", "Education:", "TECHNICAL SKILLS",
+    "Projects", "Certifications:", "AWARDS", "Summary", "PUBLICATIONS", "Languages:",
+]
+BODY = [
+    "Senior Software Engineer | Acme Corp",
+    "Jan 2019 - Present",
+    "• Built microservices in Python and Go on AWS with Docker and Kubernetes",
+    "- Led migration from MySQL to PostgreSQL, cutting query latency by 40%",
+    "Software Engineer, Initech    2016 - 2019",
+    "• Shipped React and TypeScript dashboards used by 2M users",
+    "B.S. in Computer Science, State University, 2016, GPA: 3.8",
+    "Skills: JavaScript, Node.js, GraphQL, Redis, Terraform, CI/CD",
+    "SkillSurge (https://github.com/example/skillsurge)",
+    "Developed an interview coach with FastAPI, OpenAI and Supabase",
+    "AWS Certified Solutions Architect",
+    "Speaker at PyCon on async Python performance",
+    "",
+]
+
+
+def make_resume(lines: int, seed: int = 7) -> str:
+    rng = random.Random(seed)
+    out = ["Jane Doe", "jane@example.com | (555) 123-4567 | linkedin.com/in/janedoe"]
+    while len(out) < lines:
+        if rng.random() < 0.05:
+            out.append(rng.choice(HEADERS))
+        else:
+            out.append(rng.choice(BODY) + (" " * rng.randint(0, 5)))
+    return "\n".join(out)
+
+
+def legacy_detect_sections(text: str) -> dict:
+    """Section detection as it was before: every pattern, per line, via the re module cache."""
+    sections = {}
+    current_section = 'header'
+    current_content = []
+    for line in text.split('\n'):
+        line_stripped = line.strip()
+        section_found = None
+        for section_name, pattern in ResumeParser.SECTION_PATTERNS.items():
+            if re.match(pattern, line_stripped):
+                section_found = section_name
+                break
+        if not section_found and line_stripped:
+            if line_stripped.isupper() and len(line_stripped.split()) <= 4:
+                candidate = line_stripped
+            elif line_stripped.endswith(':'):
+                candidate = line_stripped[:-1]
+            else:
+                candidate = None
+            if candidate is not None:
+                for section_name, pattern in ResumeParser.SECTION_PATTERNS.items():
+                    if re.search(pattern, candidate):
+                        section_found = section_name
+                        break
+        if section_found:
+            if current_content:
+                sections[current_section] = '\n'.join(current_content)
+            current_section = section_found
+            current_content = []
+        else:
+            current_content.append(line)
+    if current_content:
+        sections[current_section] = '\n'.join(current_content)
+    return sections
+
+
+_LEGACY_SKILL_PATTERNS = [r'\b' + re.escape(skill) + r'\b' for skill in ResumeParser.TECH_SKILLS]
+
+
+def legacy_detect_skills(text: str) -> list:
+    """Skill detection as it was before: one case-insensitive search per skill."""
+    return [
+        skill for skill, pattern in zip(ResumeParser.TECH_SKILLS, _LEGACY_SKILL_PATTERNS)
+        if re.search(pattern, text, re.IGNORECASE)
+    ]
+
+
+def bench(label: str, fn, lines: int) -> float:
+    fn()  # warm up
+    started = time.perf_counter()
+    for _ in range(ROUNDS):
+        fn()
+    elapsed = (time.perf_counter() - started) / ROUNDS
+    print(f"{label:<28} {elapsed * 1000:8.2f} ms   {lines / elapsed:12,.0f} lines/s")
+    return elapsed
+
+
+def main():
+    parser = ResumeParser()
+    text = parser._clean_text(make_resume(LINES))
+    lines = text.count('\n') + 1
+    print(f"Resume: {lines} lines, {len(text):,} chars, {ROUNDS} rounds\n")
+
+    assert legacy_detect_sections(text) == parser._detect_sections(text), "section detection differs"
+
+    before = bench("sections (per pattern)", lambda: legacy_detect_sections(text), lines)
+    after = bench("sections (alternation)", lambda: parser._detect_sections(text), lines)
+    print(f"{'':<28} {before / after:8.1f}x faster\n")
+
+    before = bench("skills (per-skill regex)", lambda: legacy_detect_skills(text), lines)
+    after = bench("skills (automaton)", lambda: parser._detect_skills(text), lines)
+    print(f"{'':<28} {before / after:8.1f}x faster\n")
+
+    content = text.encode("utf-8")
+    bench("full parse (.txt)", lambda: asyncio.run(parser.parse(content, "resume.txt")), lines)
+
+
+if __name__ == "__main__":
+    main()
@@ -121,11 +121,22 @@ CREATE TABLE IF NOT EXISTS user_progress (
     UNIQUE(user_id, date)
 );
 
+-- Daily assignments table: Precomputed daily problem per user and day
+CREATE TABLE IF NOT EXISTS daily_assignments (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    date DATE NOT NULL,
+    assignment JSONB DEFAULT '{}'::jsonb,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE(user_id, date)
+);
+
 -- Create indexes for faster lookups
 CREATE INDEX IF NOT EXISTS idx_profiles_user_id ON profiles(user_id);
 CREATE INDEX IF NOT EXISTS idx_roadmaps_user_id ON roadmaps(user_id);
 CREATE INDEX IF NOT EXISTS idx_interview_sessions_user_id ON interview_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_progress_user_id ON user_progress(user_id);
+CREATE INDEX IF NOT EXISTS idx_user_progress_date ON user_progress(date);
 
 -- Create updated_at trigger function
 CREATE OR REPLACE FUNCTION update_updated_at_column()
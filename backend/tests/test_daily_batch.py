@@ -0,0 +1,31 @@
+import os
+from datetime import date
+
+from app.services import daily_batch
+from app.services.daily_batch import BatchCheckpoint
+
+DAY = date(2026, 10, 17)
+
+
+def test_relative_checkpoint_resumes_from_another_working_directory(tmp_path, monkeypatch):
+    monkeypatch.setattr(daily_batch, "BACKEND_DIR", str(tmp_path / "backend"))
+    os.makedirs(tmp_path / "backend")
+    os.makedirs(tmp_path / "cron")
+    os.makedirs(tmp_path / "elsewhere")
+
+    monkeypatch.chdir(tmp_path / "cron")
+    checkpoint = BatchCheckpoint("checkpoint.json", DAY)
+    checkpoint.done.update({"u1", "u2"})
+    checkpoint.save()
+    assert os.path.exists(tmp_path / "backend" / "checkpoint.json")
+
+    monkeypatch.chdir(tmp_path / "elsewhere")
+    assert BatchCheckpoint("checkpoint.json", DAY).done == {"u1", "u2"}
+
+
+def test_checkpoint_from_another_day_is_ignored(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = BatchCheckpoint(path, DAY)
+    checkpoint.done.add("u1")
+    checkpoint.save()
+    assert BatchCheckpoint(path, date(2026, 10, 18)).done == set()
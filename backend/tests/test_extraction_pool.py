@@ -0,0 +1,71 @@
+import asyncio
+import time
+
+from app.services import extraction_pool
+from app.services.extraction_pool import ExtractionPool
+
+
+def _fake_worker_main(conn, memory_limit_mb):
+    """Stands in for the extractor loop: b"hang" never returns, anything else is echoed."""
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        kind, content, options = job
+        if content == b"hang":
+            time.sleep(3600)
+        conn.send((True, (content.decode(), [])))
+
+
+def _run_against_pool(monkeypatch, hang):
+    """Run one job, then `hang(pool)`, then another job; returns the pool, the first worker and the last result."""
+    # Spawned children import this module by name to find the target
+    monkeypatch.setattr(extraction_pool, "_worker_main", _fake_worker_main)
+    pool = ExtractionPool(size=1, timeout=1.0, memory_limit_mb=0)
+
+    async def scenario():
+        assert await pool.run("pdf", b"first") == ("first", [])
+        original = pool._workers[0]
+        await hang(pool)
+        return original, await pool.run("pdf", b"second")
+
+    try:
+        original, result = asyncio.run(scenario())
+        assert not original.process.is_alive()
+        assert pool._workers[0] is not original
+        assert result == ("second", [])
+        return pool.get_stats()
+    finally:
+        pool.shutdown()
+
+
+def test_hung_extraction_is_killed_and_pool_recovers(monkeypatch):
+    async def hang(pool):
+        try:
+            await pool.run("pdf", b"hang")
+        except TimeoutError:
+            return
+        raise AssertionError("hung extraction did not time out")
+
+    stats = _run_against_pool(monkeypatch, hang)
+    assert stats["timeouts"] == 1
+    assert stats["workerRestarts"] == 1
+    assert stats["completed"] == 2
+    assert stats["busy"] == 0
+
+
+def test_cancelled_extraction_replaces_the_worker(monkeypatch):
+    async def hang(pool):
+        job = asyncio.create_task(pool.run("pdf", b"hang"))
+        await asyncio.sleep(0.2)
+        job.cancel()
+        try:
+            await job
+        except asyncio.CancelledError:
+            return
+        raise AssertionError("extraction was not cancelled")
+
+    stats = _run_against_pool(monkeypatch, hang)
+    assert stats["timeouts"] == 0
+    assert stats["workerRestarts"] == 1
+    assert stats["completed"] == 2
@@ -0,0 +1,59 @@
+import json
+
+import pytest
+
+from app.services.json_stream import JsonArrayStreamer, parse_truncated_json
+
+DOCUMENT = json.dumps({
+    "overview": {"weeks": [{"decoy": True}], "note": "a \"weeks\": [ in a string"},
+    "weeks": [
+        {"number": 1, "title": "Arrays { and [ brackets ]", "tasks": [{"title": "Two Sum"}]},
+        {"number": 2, "title": "Escaped \\\" quote", "tasks": []},
+        {"number": 3, "title": "Graphs", "tasks": [{"title": "Clone Graph", "tags": ["bfs", "dfs"]}]},
+    ],
+    "totalTasks": 2,
+})
+WEEKS = json.loads(DOCUMENT)["weeks"]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 7, 64, len(DOCUMENT)])
+def test_items_are_the_same_however_the_text_is_chunked(chunk_size):
+    streamer = JsonArrayStreamer("weeks")
+    items = []
+    for start in range(0, len(DOCUMENT), chunk_size):
+        items.extend(streamer.feed(DOCUMENT[start:start + chunk_size]))
+    assert items == WEEKS
+    assert streamer.text == DOCUMENT
+
+
+def test_items_are_emitted_as_soon_as_they_close():
+    streamer = JsonArrayStreamer("weeks")
+    end_of_first = DOCUMENT.index('"number": 2') - 2
+    assert [w["number"] for w in streamer.feed(DOCUMENT[:end_of_first])] == [1]
+    assert [w["number"] for w in streamer.feed(DOCUMENT[end_of_first:])] == [2, 3]
+
+
+def test_truncated_text_yields_only_complete_items():
+    cut = DOCUMENT.index("Clone Graph")
+    assert [w["number"] for w in JsonArrayStreamer("weeks").feed(DOCUMENT[:cut])] == [1, 2]
+
+
+def test_parse_truncated_json_keeps_the_complete_prefix():
+    cut = DOCUMENT.index("Clone Graph")
+    result = parse_truncated_json(DOCUMENT[:cut])
+    assert result["overview"] == json.loads(DOCUMENT)["overview"]
+    assert [w["number"] for w in result["weeks"][:2]] == [1, 2]
+    assert "totalTasks" not in result
+
+
+@pytest.mark.parametrize("text, expected", [
+    # The last number may itself be cut off ("2" of "25"), so it is dropped
+    ('{"a": 1, "b": [1, 2', {"a": 1, "b": [1]}),
+    ('{"a": "unfinished str', {}),
+    ('{"a": {"b": 1}}', {"a": {"b": 1}}),
+    ('{"a": 1, "b": tr', {"a": 1}),
+    ("no json here", None),
+    ("", None),
+])
+def test_parse_truncated_json_cases(text, expected):
+    assert parse_truncated_json(text) == expected
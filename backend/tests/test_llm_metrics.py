@@ -0,0 +1,27 @@
+import json
+
+from app.services import llm_metrics as llm_metrics_module
+from app.services.llm_metrics import LLMCall, LLMMetrics
+
+
+def _observe_one() -> LLMMetrics:
+    metrics = LLMMetrics()
+    metrics.observe(LLMCall("match_roles", "gpt-4o-mini", cache="miss", prompt_tokens=100, completion_tokens=50))
+    return metrics
+
+
+def test_calls_are_not_logged_by_default(capsys):
+    metrics = _observe_one()
+    assert capsys.readouterr().out == ""
+    assert metrics.get_stats()["match_roles"]["calls"] == 1
+
+
+def test_call_logging_prints_one_json_line(monkeypatch, capsys):
+    monkeypatch.setattr(llm_metrics_module.settings, "llm_call_logging", True)
+    _observe_one()
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert record["event"] == "llm_call"
+    assert record["caller"] == "match_roles"
+    assert record["promptTokens"] == 100
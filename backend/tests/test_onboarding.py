@@ -0,0 +1,65 @@
+import asyncio
+
+from fastapi import UploadFile
+from tempfile import SpooledTemporaryFile
+
+from app.api import onboarding
+from app.services import upload_spool
+
+
+def _upload(content: bytes) -> UploadFile:
+    file = SpooledTemporaryFile(max_size=1024 * 1024)
+    file.write(content)
+    file.seek(0)
+    return UploadFile(file=file, filename="resume.pdf", size=len(content))
+
+
+def _call_stream(upload: UploadFile):
+    return onboarding.stream_onboarding(
+        file=upload, resumeText=None, userId="u-test", targetRole=None,
+        weeks=12, hoursPerDay=2.0, intensity="moderate",
+    )
+
+
+def test_upload_is_closed_when_the_stream_is_never_read(monkeypatch):
+    monkeypatch.setattr(upload_spool.settings, "upload_spool_memory_bytes", 10)
+    spooled = []
+    real_spool = onboarding.spool_upload
+
+    async def spy(file):
+        spooled.append(await real_spool(file))
+        return spooled[-1]
+
+    async def failing_parse(content, filename):
+        raise Exception("unreadable")
+
+    monkeypatch.setattr(onboarding, "spool_upload", spy)
+    monkeypatch.setattr(onboarding, "parse_resume_file", failing_parse)
+
+    async def scenario():
+        await _call_stream(_upload(b"%PDF-" + b"x" * 100))
+        # The response is dropped without iterating its body
+        await asyncio.gather(*onboarding._pipelines, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert spooled[0].fd is None
+
+
+def test_cancelled_pipeline_reports_an_error_event(monkeypatch):
+    async def hanging_parse(content, filename):
+        await asyncio.sleep(3600)
+
+    monkeypatch.setattr(onboarding, "parse_resume_file", hanging_parse)
+
+    async def scenario():
+        response = await _call_stream(_upload(b"%PDF-1.4"))
+        body = response.body_iterator
+        first = await body.__anext__()
+        for pipeline in list(onboarding._pipelines):
+            pipeline.cancel()
+        return first, [chunk async for chunk in body]
+
+    first, rest = asyncio.run(scenario())
+    assert "start" in first
+    assert rest and rest[-1].startswith("event: error")
+    assert "cancelled" in rest[-1]
@@ -0,0 +1,298 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from openai import RateLimitError
+
+from app.api import roadmap as roadmap_api
+from app.services import openai_service
+from app.services.llm_metrics import LLMCall
+from app.services.rate_scheduler import RateScheduler
+
+MODEL = "test-model"
+KWARGS = {"model": MODEL, "messages": [{"role": "user", "content": "hi"}], "max_tokens": 500}
+
+
+def _rate_limit_error(retry_after=None) -> RateLimitError:
+    headers = {"retry-after": retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request("POST", "https://api.openai.com"))
+    return RateLimitError("rate limited", response=response, body=None)
+
+
+def _fake_client(create):
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def _tokens_available(scheduler: RateScheduler) -> int:
+    return scheduler.get_stats()["queues"][MODEL]["tokensAvailable"]
+
+
+def _run_request(monkeypatch, create) -> RateScheduler:
+    scheduler = RateScheduler()
+    monkeypatch.setattr(openai_service, "rate_scheduler", scheduler)
+    monkeypatch.setattr(openai_service, "client", _fake_client(create))
+
+    async def scenario():
+        try:
+            await openai_service._request_completion("test", "key", 0, dict(KWARGS), LLMCall("test", MODEL))
+        except Exception:
+            pass
+
+    asyncio.run(scenario())
+    return scheduler
+
+
+@pytest.mark.parametrize("error", [Exception("boom"), _rate_limit_error()])
+def test_failed_call_refunds_reserved_tokens(monkeypatch, error):
+    async def create(**kwargs):
+        raise error
+
+    scheduler = _run_request(monkeypatch, create)
+    assert _tokens_available(scheduler) == openai_service.settings.openai_tpm_limit
+
+
+def test_response_without_usage_refunds_reserved_tokens(monkeypatch):
+    async def create(**kwargs):
+        message = SimpleNamespace(content="{}")
+        return SimpleNamespace(usage=None, choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    scheduler = _run_request(monkeypatch, create)
+    assert _tokens_available(scheduler) == openai_service.settings.openai_tpm_limit
+
+
+def test_response_usage_is_charged(monkeypatch):
+    async def create(**kwargs):
+        message = SimpleNamespace(content="{}")
+        usage = SimpleNamespace(total_tokens=100, prompt_tokens=60, completion_tokens=40)
+        return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason="stop")])
+
+    scheduler = _run_request(monkeypatch, create)
+    # Only the 100 tokens really used stay spent (refill adds a little back)
+    assert openai_service.settings.openai_tpm_limit - 100 <= _tokens_available(scheduler) < openai_service.settings.openai_tpm_limit
+
+
+def test_retry_after_seconds():
+    assert openai_service.retry_after_seconds(_rate_limit_error("7")) == 7
+    assert openai_service.retry_after_seconds(_rate_limit_error("0.2")) == 1
+    assert openai_service.retry_after_seconds(_rate_limit_error()) == openai_service.DEFAULT_RETRY_AFTER_SECONDS
+
+
+def test_rate_limit_returns_429_with_retry_after(monkeypatch):
+    async def rate_limited(**kwargs):
+        raise _rate_limit_error("12")
+
+    monkeypatch.setattr(roadmap_api, "generate_comprehensive_roadmap", rate_limited)
+    monkeypatch.setattr(roadmap_api.prewarm_manager, "on_roadmap_request", lambda *args: None)
+    request = roadmap_api.ComprehensiveRoadmapRequest(
+        userId="u1",
+        targetRole="Backend Engineer",
+        skills=[],
+        missingSkills=[],
+        timeConstraint={"weeks": 4, "hoursPerDay": 1.0, "intensity": "moderate"},
+        resumeText="",
+    )
+    with pytest.raises(HTTPException) as caught:
+        asyncio.run(roadmap_api.create_comprehensive_roadmap(request))
+    assert caught.value.status_code == 429
+    assert caught.value.headers["Retry-After"] == "12"
+
+
+def _completion(content: str, finish_reason: str = "stop"):
+    message = SimpleNamespace(content=content)
+    usage = SimpleNamespace(total_tokens=10, prompt_tokens=5, completion_tokens=5)
+    return SimpleNamespace(usage=usage, choices=[SimpleNamespace(message=message, finish_reason=finish_reason)])
+
+
+def test_truncated_roadmap_weeks_are_normalized_and_continued(monkeypatch):
+    # Cut off inside week 3; the salvaged weeks carry the model's own IDs
+    truncated = json.dumps({
+        "targetRole": "Backend Engineer",
+        "weeks": [
+            {"id": "week-one", "number": 7, "title": "Arrays", "tasks": [{"id": "a", "title": "Two Sum"}]},
+            {"id": "week-two", "title": "Graphs", "tasks": [{"title": "Clone Graph"}, {"title": "Course Schedule"}]},
+            {"id": "week-three", "title": "DP", "tasks": [{"title": "Climbing Stairs"}]},
+        ],
+    })[:-40]
+    continuation = json.dumps({"weeks": [{"id": "x", "number": 1, "title": "DP", "tasks": [{"id": "y", "title": "House Robber"}]}]})
+    responses = [_completion(truncated, "length"), _completion(continuation)]
+
+    async def create(**kwargs):
+        return responses.pop(0)
+
+    monkeypatch.setattr(openai_service.settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(openai_service, "rate_scheduler", RateScheduler())
+    monkeypatch.setattr(openai_service, "client", _fake_client(create))
+
+    roadmap = asyncio.run(openai_service.generate_comprehensive_roadmap(
+        skills=[], target_role="Backend Engineer", missing_skills=[],
+        time_constraint={"weeks": 3, "hoursPerDay": 1, "intensity": "moderate"}, resume_text="",
+    ))
+
+    assert not responses
+    assert [w["id"] for w in roadmap["weeks"]] == ["w1", "w2", "w3"]
+    assert [w["number"] for w in roadmap["weeks"]] == [1, 2, 3]
+    assert [t["id"] for w in roadmap["weeks"] for t in w["tasks"]] == ["w1t1", "w2t1", "w2t2", "w3t1"]
+    assert all(t["completed"] is False for w in roadmap["weeks"] for t in w["tasks"])
+    assert roadmap["totalTasks"] == 4
+
+
+class _FakeStream:
+    """Async iterator of streamed completion chunks, like the SDK's AsyncStream."""
+
+    def __init__(self, text: str, chunk_size: int, finish_reason: str = "stop"):
+        self._chunks = [
+            SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + chunk_size]), finish_reason=None)])
+            for i in range(0, len(text), chunk_size)
+        ]
+        self._chunks.append(SimpleNamespace(usage=None, choices=[SimpleNamespace(delta=SimpleNamespace(content=None), finish_reason=finish_reason)]))
+        self._chunks.append(SimpleNamespace(usage=SimpleNamespace(total_tokens=50, prompt_tokens=20, completion_tokens=30), choices=[]))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._chunks:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        return self._chunks.pop(0)
+
+    async def close(self):
+        self._chunks = []
+
+
+def _use_fake_client(monkeypatch, create):
+    monkeypatch.setattr(openai_service.settings, "llm_cache_enabled", False)
+    monkeypatch.setattr(openai_service, "rate_scheduler", RateScheduler())
+    monkeypatch.setattr(openai_service, "client", _fake_client(create))
+
+
+def _collect(events):
+    async def scenario():
+        return [event async for event in events]
+    return asyncio.run(scenario())
+
+
+TIME_CONSTRAINT = {"weeks": 3, "hoursPerDay": 1, "intensity": "moderate"}
+
+
+def test_streamed_roadmap_yields_each_week_as_it_completes(monkeypatch):
+    roadmap = {
+        "overview": {"totalWeeks": 3},
+        "weeks": [{"id": f"w{n}", "number": n, "title": f"Week {n}", "tasks": [{"id": f"w{n}t1"}]} for n in (1, 2, 3)],
+        "totalTasks": 3.0,
+    }
+
+    async def create(stream=False, **kwargs):
+        assert stream
+        return _FakeStream(json.dumps(roadmap), chunk_size=7)
+
+    _use_fake_client(monkeypatch, create)
+    events = _collect(openai_service.stream_comprehensive_roadmap(
+        skills=[], target_role="Backend Engineer", missing_skills=[], time_constraint=TIME_CONSTRAINT, resume_text="",
+    ))
+
+    assert [e["type"] for e in events] == ["week", "week", "week", "complete"]
+    assert [e["week"]["number"] for e in events[:3]] == [1, 2, 3]
+    assert events[-1]["roadmap"]["weeks"] == roadmap["weeks"]
+    assert events[-1]["roadmap"]["totalTasks"] == 3
+
+
+def test_truncated_stream_is_continued(monkeypatch):
+    full = json.dumps({"weeks": [{"number": n, "title": f"Week {n}", "tasks": [{"title": "t"}]} for n in (1, 2, 3)]})
+    truncated = full[:full.index('"Week 3"')]
+    continuation = json.dumps({"weeks": [{"title": "Week 3", "tasks": [{"title": "t"}]}]})
+    calls = []
+
+    async def create(stream=False, **kwargs):
+        calls.append(stream)
+        if stream:
+            return _FakeStream(truncated, chunk_size=11, finish_reason="length")
+        return _completion(continuation)
+
+    _use_fake_client(monkeypatch, create)
+    events = _collect(openai_service.stream_comprehensive_roadmap(
+        skills=[], target_role="Backend Engineer", missing_skills=[], time_constraint=TIME_CONSTRAINT, resume_text="",
+    ))
+
+    assert calls == [True, False]
+    weeks = events[-1]["roadmap"]["weeks"]
+    assert [w["id"] for w in weeks] == ["w1", "w2", "w3"]
+    # Weeks 1-2 were streamed before the cut, week 3 came from the continuation
+    assert [e["week"]["number"] for e in events if e["type"] == "week"] == [1, 2, 3]
+
+
+def test_long_roadmap_fans_out_one_call_per_week(monkeypatch):
+    weeks = 8
+    monkeypatch.setattr(openai_service.settings, "roadmap_fanout_min_weeks", weeks)
+    monkeypatch.setattr(openai_service.settings, "roadmap_fanout_concurrency", 3)
+    in_flight = [0]
+    peak = [0]
+    week_calls = []
+
+    async def create(**kwargs):
+        prompt = kwargs["messages"][-1]["content"]
+        if prompt.startswith("Plan a"):
+            plan = [{"number": n, "title": f"Topic {n}", "focus": "DSA"} for n in range(1, weeks + 1)]
+            return _completion(json.dumps({"overview": {"totalWeeks": weeks}, "weekPlan": plan}))
+        number = int(prompt.split("Write week ")[1].split(" ")[0])
+        week_calls.append(number)
+        in_flight[0] += 1
+        peak[0] = max(peak[0], in_flight[0])
+        # Later weeks finish first
+        await asyncio.sleep(0.001 * (weeks - number))
+        in_flight[0] -= 1
+        return _completion(json.dumps({"title": f"Topic {number}", "tasks": [{"title": "a"}, {"title": "b"}]}))
+
+    _use_fake_client(monkeypatch, create)
+    roadmap = asyncio.run(openai_service.generate_comprehensive_roadmap(
+        skills=[], target_role="Backend Engineer", missing_skills=[],
+        time_constraint={"weeks": weeks, "hoursPerDay": 2, "intensity": "moderate"}, resume_text="",
+    ))
+
+    assert sorted(week_calls) == list(range(1, weeks + 1))
+    assert peak[0] == 3
+    assert [w["id"] for w in roadmap["weeks"]] == [f"w{n}" for n in range(1, weeks + 1)]
+    assert roadmap["weeks"][4]["tasks"][1]["id"] == "w5t2"
+    assert roadmap["totalTasks"] == 2 * weeks
+
+
+WEEK_PLAN = {"number": 4, "title": "Graphs", "focus": "DSA", "description": ""}
+FULL_WEEK = json.dumps({"title": "Graphs", "tasks": [{"title": "Clone Graph"}, {"title": "Course Schedule"}, {"title": "Word Ladder"}]})
+
+
+def _generate_week(monkeypatch, responses):
+    requested = []
+
+    async def create(**kwargs):
+        requested.append(kwargs["max_tokens"])
+        return responses.pop(0)
+
+    _use_fake_client(monkeypatch, create)
+    week = asyncio.run(openai_service._generate_roadmap_week(WEEK_PLAN, "", [], "Backend Engineer", 14))
+    return week, requested
+
+
+def test_truncated_week_is_retried_with_more_room(monkeypatch):
+    cut = FULL_WEEK[:FULL_WEEK.index("Word Ladder")]
+    week, requested = _generate_week(monkeypatch, [_completion(cut, "length"), _completion(FULL_WEEK)])
+    assert requested[1] == 2 * requested[0]
+    assert [t["id"] for t in week["tasks"]] == ["w4t1", "w4t2", "w4t3"]
+
+
+@pytest.mark.parametrize("wrap", [False, True])
+def test_week_truncated_twice_keeps_its_finished_tasks(monkeypatch, wrap):
+    text = json.dumps({"week": json.loads(FULL_WEEK)}) if wrap else FULL_WEEK
+    cut = text[:text.index("Word Ladder")]
+    week, _ = _generate_week(monkeypatch, [_completion(cut, "length"), _completion(cut, "length")])
+    assert week["id"] == "w4"
+    assert week["title"] == "Graphs"
+    assert [t["title"] for t in week["tasks"]] == ["Clone Graph", "Course Schedule"]
+
+
+def test_week_truncated_before_any_task_fails(monkeypatch):
+    cut = FULL_WEEK[:FULL_WEEK.index("Clone")]
+    with pytest.raises(Exception, match="truncated before its first task"):
+        _generate_week(monkeypatch, [_completion(cut, "length"), _completion(cut, "length")])
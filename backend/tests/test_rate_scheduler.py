@@ -0,0 +1,110 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import rate_scheduler as rate_scheduler_module
+from app.services.rate_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_DEFAULT,
+    PRIORITY_INTERACTIVE,
+    RateScheduler,
+    TokenBucket,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Manual clock for the buckets (asyncio keeps the real one)."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_scheduler_module, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_bucket_refills_continuously_up_to_capacity(clock):
+    bucket = TokenBucket(60)
+    bucket.consume(60)
+    assert bucket.time_until(15) == pytest.approx(15.0)
+
+    clock[0] += 30
+    assert bucket.time_until(30) == 0.0
+    assert bucket.tokens == pytest.approx(30.0)
+
+    clock[0] += 600
+    assert bucket.time_until(60) == 0.0
+    assert bucket.tokens == pytest.approx(60.0)
+
+
+def test_bucket_refund_is_capped_and_drain_empties(clock):
+    bucket = TokenBucket(100)
+    bucket.consume(40)
+    bucket.refund(1000)
+    assert bucket.tokens == pytest.approx(100.0)
+    bucket.drain()
+    assert bucket.tokens == 0.0
+    # Requests larger than the bucket wait for a full bucket, not forever
+    assert bucket.time_until(500) == pytest.approx(60.0)
+
+
+def test_release_refunds_the_unused_estimate(clock):
+    async def scenario():
+        scheduler = RateScheduler()
+        await scheduler.acquire("m", 1000)
+        tpm = scheduler._lane("m").tokens
+        start = tpm.tokens
+
+        scheduler.release("m", 1000, 400)
+        assert tpm.tokens == pytest.approx(start + 600)
+        # Usage above the estimate is not charged again
+        scheduler.release("m", 100, 400)
+        assert tpm.tokens == pytest.approx(start + 600)
+        # Missing usage (failed call) refunds everything
+        await scheduler.acquire("m", 1000)
+        scheduler.release("m", 1000, 0)
+        assert tpm.tokens == pytest.approx(start + 600)
+
+    asyncio.run(scenario())
+
+
+def test_queued_calls_are_admitted_in_priority_order(monkeypatch):
+    # 10 requests/second, so the drained bucket admits one call per 0.1s
+    monkeypatch.setitem(rate_scheduler_module.MODEL_LIMITS, "m", (600, 10 ** 6))
+
+    async def scenario():
+        scheduler = RateScheduler()
+        scheduler.penalize("m")
+        admitted = []
+
+        async def call(name, priority):
+            await scheduler.acquire("m", 10, priority)
+            admitted.append(name)
+
+        await asyncio.gather(
+            call("background", PRIORITY_BACKGROUND),
+            call("default-1", PRIORITY_DEFAULT),
+            call("interactive", PRIORITY_INTERACTIVE),
+            call("default-2", PRIORITY_DEFAULT),
+        )
+        return admitted, scheduler.get_stats()
+
+    admitted, stats = asyncio.run(scenario())
+    assert admitted == ["interactive", "default-1", "default-2", "background"]
+    assert stats["rateLimited"] == 1
+
+
+def test_cancelled_waiter_does_not_consume_tokens(monkeypatch):
+    monkeypatch.setitem(rate_scheduler_module.MODEL_LIMITS, "m", (600, 10 ** 6))
+
+    async def scenario():
+        scheduler = RateScheduler()
+        scheduler.penalize("m")
+        waiter = asyncio.create_task(scheduler.acquire("m", 5000))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        # The next caller gets the slot the cancelled one was waiting for
+        await asyncio.wait_for(scheduler.acquire("m", 10), timeout=1)
+        return scheduler._lane("m").tokens.tokens
+
+    tokens = asyncio.run(scenario())
+    assert tokens == pytest.approx(10 ** 6 - 10, abs=50)
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.services import resume_cache as resume_cache_module
+from app.services.openai_service import get_mock_skill_graph
+from app.services.resume_cache import ResumeCache, content_key
+
+
+def test_content_key_depends_on_parts_and_bytes():
+    assert content_key(b"abc", "1", "pdf") == content_key(b"abc", "1", "pdf")
+    assert content_key(b"abc", "1", "pdf") != content_key(b"abc", "2", "pdf")
+    assert content_key(b"abc", "1", "pdf") != content_key(b"abd", "1", "pdf")
+
+
+def test_failed_analysis_is_not_cached(monkeypatch):
+    calls = []
+
+    async def failing(resume_text, sections=None):
+        calls.append(resume_text)
+        raise Exception("timeout")
+
+    async def working(resume_text, sections=None):
+        calls.append(resume_text)
+        return {"skills": [{"name": "Go"}]}
+
+    cache = ResumeCache(enabled=True, max_entries=16, ttl=3600)
+
+    async def scenario():
+        monkeypatch.setattr(resume_cache_module, "analyze_resume", failing)
+        assert await cache.analyze("hash", "resume text") == get_mock_skill_graph()
+
+        monkeypatch.setattr(resume_cache_module, "analyze_resume", working)
+        first = await cache.analyze("hash", "resume text")
+        second = await cache.analyze("hash", "resume text")
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert first == second == {"skills": [{"name": "Go"}]}
+    # failure, then one real call; the second success came from the cache
+    assert len(calls) == 2
+
+
+def test_failed_analysis_raises_without_fallback(monkeypatch):
+    async def failing(resume_text, sections=None):
+        raise Exception("no key")
+
+    monkeypatch.setattr(resume_cache_module, "analyze_resume", failing)
+    cache = ResumeCache(enabled=True, max_entries=16, ttl=3600)
+    with pytest.raises(Exception, match="no key"):
+        asyncio.run(cache.analyze("hash", "resume text", fallback=False))
@@ -0,0 +1,78 @@
+from app.services.resume_merge import merge_resume_extractions
+
+
+def _parts():
+    first = {
+        "skills": [
+            {"id": "1", "name": "Python", "level": 70, "yearsOfExperience": 3, "category": "Other", "connections": ["2"]},
+            {"id": "2", "name": "Django", "level": 60, "evidence": "Built APIs"},
+        ],
+        "experience": [{"company": "Acme", "role": "Engineer", "highlights": ["Shipped X"], "duration": ""}],
+        "projects": [{"name": "Tracker", "technologies": ["Python"], "description": "short"}],
+        "strongestSkills": ["Python"],
+        "skillGaps": ["Kubernetes", "django"],
+        "totalYearsExperience": 3,
+        "seniorityLevel": "Mid",
+        "summary": "Backend developer",
+    }
+    second = {
+        "skills": [
+            # Same skills again under other ids and casing
+            {"id": "1", "name": "django", "level": 85, "evidence": "Led migration"},
+            {"id": "2", "name": "python ", "level": 65, "yearsOfExperience": 5, "category": "Language", "connections": ["1", "3"]},
+            {"id": "3", "name": "AWS", "level": 50},
+        ],
+        "experience": [{"company": "ACME", "role": "engineer", "highlights": ["shipped x", "Cut costs"], "duration": "2y"}],
+        "projects": [{"name": "tracker", "technologies": ["python", "Redis"], "description": "a longer description"}],
+        "strongestSkills": ["Django", "Python"],
+        "skillGaps": ["Kubernetes", "Terraform"],
+        "totalYearsExperience": "5",
+        "seniorityLevel": "Senior",
+        "summary": "Backend developer with five years of Python",
+    }
+    return [first, second]
+
+
+def test_skills_are_deduplicated_by_name():
+    merged = merge_resume_extractions(_parts())
+    skills = {s["name"].strip().lower(): s for s in merged["skills"]}
+
+    assert len(merged["skills"]) == 3
+    assert skills["django"]["level"] == 85
+    assert skills["django"]["evidence"] == "Built APIs; Led migration"
+    assert skills["python"]["level"] == 70
+    assert skills["python"]["yearsOfExperience"] == 5
+    assert skills["python"]["category"] == "Language"
+    # Strongest first, fresh ids, connections re-pointed at the merged ids
+    assert [s["id"] for s in merged["skills"]] == ["1", "2", "3"]
+    assert merged["skills"][0]["name"] == "Django"
+    assert sorted(skills["python"]["connections"]) == sorted([skills["django"]["id"], skills["aws"]["id"]])
+
+
+def test_records_are_deduplicated_and_combined():
+    merged = merge_resume_extractions(_parts())
+
+    assert len(merged["experience"]) == 1
+    assert merged["experience"][0]["highlights"] == ["Shipped X", "Cut costs"]
+    assert merged["experience"][0]["duration"] == "2y"
+
+    assert len(merged["projects"]) == 1
+    assert merged["projects"][0]["id"] == "p1"
+    assert merged["projects"][0]["technologies"] == ["Python", "Redis"]
+    assert merged["projects"][0]["description"] == "a longer description"
+
+
+def test_profile_level_fields_take_the_strongest_signal():
+    merged = merge_resume_extractions(_parts())
+
+    assert merged["totalYearsExperience"] == "5"
+    assert merged["seniorityLevel"] == "Senior"
+    assert merged["summary"] == "Backend developer with five years of Python"
+    assert merged["strongestSkills"] == ["Django", "Python"]
+    # Gaps the resume turned out to cover are dropped
+    assert merged["skillGaps"] == ["Kubernetes", "Terraform"]
+
+
+def test_single_and_empty_inputs():
+    assert merge_resume_extractions([])["skills"] == []
+    assert merge_resume_extractions([None, {"skills": [{"name": "Go"}]}])["skills"][0]["name"] == "Go"
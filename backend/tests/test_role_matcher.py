@@ -0,0 +1,32 @@
+import asyncio
+
+from app.services.role_matcher import RoleMatcher, score_requirements
+
+JOBS = [
+    {"id": "1", "title": "Backend Engineer", "skills": ["Python", "SQL", "Docker"]},
+    {"id": "2", "title": "Frontend Engineer", "skills": ["JavaScript", "React"]},
+]
+
+
+def test_roles_are_ranked_by_mean_coverage():
+    roles = RoleMatcher(JOBS).match([{"name": "Python", "proficiency": 70}, {"name": "SQL", "proficiency": 35}])
+    assert [r["title"] for r in roles] == ["Backend Engineer", "Frontend Engineer"]
+    # (1 + 0.5 + 0) / 3
+    assert roles[0]["matchScore"] == 50
+    assert roles[0]["gaps"] == ["SQL", "Docker"]
+    assert roles[1]["matchScore"] == 0
+
+
+def test_score_requirements_takes_plain_names_as_meeting_the_requirement():
+    assert score_requirements(["python", "React"], ["Python", "React", "Go", "Rust"]) == 50
+
+
+def test_role_market_agent_ranks_with_the_local_matcher(monkeypatch):
+    from app.agents.role_market_agent import role_market_agent
+    from app.services import role_matcher
+
+    monkeypatch.setattr(role_matcher, "_matcher", RoleMatcher(JOBS))
+    profile = {"skillGraph": [{"name": "React", "proficiency": 80}], "skills": ["Python"]}
+    result = asyncio.run(role_market_agent.find_matching_roles(profile))
+    assert result["data"]["topMatch"]["title"] == "Frontend Engineer"
+    assert result["data"]["totalMatches"] == 2
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    async def scenario():
+        group = SingleFlight("test-coalesce")
+        release = asyncio.Event()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await release.wait()
+            return {"answer": 42}
+
+        waiters = [asyncio.create_task(group.do("k", work)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters)
+
+        # Once finished the key is forgotten and the next call runs again
+        await group.do("k", work)
+        return runs, results, group.get_stats()
+
+    runs, results, stats = asyncio.run(scenario())
+    assert len(runs) == 2
+    assert results[0] is results[1] is results[2]
+    assert stats == {"calls": 4, "executions": 2, "coalesced": 2, "inFlight": 0}
+
+
+def test_different_keys_run_separately():
+    async def scenario():
+        group = SingleFlight("test-keys")
+
+        async def work(value):
+            await asyncio.sleep(0)
+            return value
+
+        return await asyncio.gather(group.do("a", lambda: work("a")), group.do("b", lambda: work("b")))
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    async def scenario():
+        group = SingleFlight("test-cancel-one")
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "done"
+
+        first = asyncio.create_task(group.do("k", work))
+        second = asyncio.create_task(group.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(scenario())
+    assert isinstance(first, asyncio.CancelledError)
+    assert second == "done"
+
+
+def test_work_is_cancelled_when_every_waiter_is_gone():
+    async def scenario():
+        group = SingleFlight("test-cancel-all")
+        cancelled = asyncio.Event()
+
+        async def work():
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        waiters = [asyncio.create_task(group.do("k", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        return group.get_stats()
+
+    assert asyncio.run(scenario())["inFlight"] == 0
+
+
+def test_errors_reach_every_waiter():
+    async def scenario():
+        group = SingleFlight("test-errors")
+
+        async def work():
+            await asyncio.sleep(0)
+            raise ValueError("upstream failed")
+
+        return await asyncio.gather(group.do("k", work), group.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert results[0] is results[1]
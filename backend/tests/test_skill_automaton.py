@@ -0,0 +1,42 @@
+from app.services.resume_parser import ResumeParser
+from app.services.skill_automaton import SkillAutomaton
+
+
+def test_aliases_report_the_canonical_skill():
+    automaton = SkillAutomaton(["React", "Node.js", "Go"], {"ReactJS": "React", "NodeJS": "Node.js", "Golang": "Go"})
+    assert automaton.find("ReactJS, NodeJS and golang") == ["React", "Node.js", "Go"]
+    # A skill found under two spellings is reported once
+    assert automaton.find("React (ReactJS)") == ["React"]
+
+
+def test_alias_of_an_unknown_skill_is_ignored():
+    automaton = SkillAutomaton(["React"], {"VueJS": "Vue"})
+    assert automaton.find("VueJS") == []
+
+
+def test_resume_parser_finds_js_spellings():
+    skills = ResumeParser()._detect_skills("Skills: ReactJS, NodeJS, React.js, Postgres, K8s")
+    assert skills == ["React", "Node.js", "PostgreSQL", "Kubernetes"]
+
+
+def test_matches_need_word_boundaries_on_both_sides():
+    automaton = SkillAutomaton(["Go", "Java", "R", "C++", "C#", "Node.js", "SQL"])
+    assert automaton.find("Google, JavaScript, Rust, MySQL, NoSQL") == []
+    assert automaton.find("Go, Java and R") == ["Go", "Java", "R"]
+    # Symbols inside a skill are part of it; punctuation after it is a boundary
+    assert automaton.find("Languages: C++, C#. Runtime: Node.js.") == ["C++", "C#", "Node.js"]
+    assert automaton.find("go_lang java2") == []
+
+
+def test_overlapping_skills_are_all_found_in_taxonomy_order():
+    automaton = SkillAutomaton(["React Native", "React", "Native", "Machine Learning", "Learning"])
+    assert automaton.find("Built apps in react native; machine learning") == [
+        "React Native", "React", "Native", "Machine Learning", "Learning",
+    ]
+
+
+def test_empty_text_and_duplicate_skills():
+    automaton = SkillAutomaton(["Python", "python", ""])
+    assert automaton.skills == ["Python"]
+    assert automaton.find("") == []
+    assert automaton.find("PYTHON python Python") == ["Python"]
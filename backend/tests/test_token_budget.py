@@ -0,0 +1,92 @@
+import pytest
+
+from app.services import token_budget
+from app.services.token_budget import (
+    MAX_COMPLETION_TOKENS,
+    allocate_budget,
+    chunk_sections,
+    count_tokens,
+    estimate_roadmap_output_tokens,
+    fit_items,
+    truncate_to_tokens,
+)
+
+MODEL = "gpt-4o-mini"
+
+
+@pytest.fixture(params=["tokenizer", "estimate"])
+def tokenizer(request, monkeypatch):
+    """Run each test with tiktoken (when it can load) and with the 4-chars-per-token fallback."""
+    if request.param == "estimate":
+        monkeypatch.setattr(token_budget, "_get_encoding", lambda model: None)
+    elif token_budget._get_encoding(MODEL) is None:
+        pytest.skip("tiktoken encoding not available")
+
+
+def _text(words: int, word: str = "experience") -> str:
+    return " ".join(f"{word}{i}" for i in range(words))
+
+
+def test_allocation_keeps_important_sections_whole_then_truncates(tokenizer):
+    skills, experience, projects = _text(20, "skill"), _text(200), _text(50, "project")
+    budget = count_tokens(skills, MODEL) + 30
+    fitted = allocate_budget(
+        [("experience", experience, 2), ("skills", skills, 1), ("projects", projects, 3)], budget, MODEL
+    )
+    # Original order, the higher priority section whole, the next one cut to what is left
+    assert list(fitted) == ["experience", "skills"]
+    assert fitted["skills"] == skills
+    assert experience.startswith(fitted["experience"])
+    assert count_tokens(fitted["experience"], MODEL) <= 30
+    assert sum(count_tokens(text, MODEL) for text in fitted.values()) <= budget
+
+
+def test_allocation_with_room_for_everything(tokenizer):
+    sections = [("a", "alpha", 1), ("b", "beta", 2), ("empty", "", 3)]
+    assert allocate_budget(sections, 1000, MODEL) == {"a": "alpha", "b": "beta"}
+    assert allocate_budget(sections, 0, MODEL) == {}
+
+
+def test_truncate_to_tokens(tokenizer):
+    text = _text(100)
+    assert truncate_to_tokens(text, 10_000, MODEL) == text
+    assert count_tokens(truncate_to_tokens(text, 12, MODEL), MODEL) <= 12
+    assert truncate_to_tokens(text, 0, MODEL) == ""
+
+
+def test_small_sections_share_a_chunk(tokenizer):
+    chunks = chunk_sections([("skills", "Python, SQL"), ("education", "BSc CS")], 500, MODEL)
+    assert chunks == ["=== SKILLS ===\nPython, SQL\n\n=== EDUCATION ===\nBSc CS"]
+
+
+def test_oversized_section_is_split_by_line_with_its_heading(tokenizer):
+    lines = [f"Built service {i} handling {i * 1000} requests per second" for i in range(60)]
+    chunks = chunk_sections([("experience", "\n".join(lines)), ("skills", "Python")], 120, MODEL)
+
+    assert len(chunks) > 2
+    for chunk in chunks:
+        assert count_tokens(chunk, MODEL) <= 120
+        assert chunk.startswith("=== EXPERIENCE ===")
+    # Every line survives, in order, and the small section joins the last piece
+    body = [line for chunk in chunks for line in chunk.splitlines() if line and not line.startswith("===")]
+    assert body == lines + ["Python"]
+    assert "=== SKILLS ===" in chunks[-1]
+
+
+def test_a_single_huge_line_is_hard_split(tokenizer):
+    chunks = chunk_sections([("summary", _text(400))], 100, MODEL)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk, MODEL) <= 100 for chunk in chunks)
+
+
+def test_fit_items_stops_at_the_budget(tokenizer):
+    items = [f"Skill{i}" for i in range(100)]
+    kept = fit_items(items, 20, MODEL)
+    assert kept == items[:len(kept)]
+    assert 0 < len(kept) < 100
+    assert count_tokens(", ".join(kept), MODEL) <= 20
+
+
+def test_roadmap_output_estimate_grows_with_weeks_and_is_capped():
+    assert estimate_roadmap_output_tokens(4) < estimate_roadmap_output_tokens(12)
+    assert estimate_roadmap_output_tokens(500) == MAX_COMPLETION_TOKENS
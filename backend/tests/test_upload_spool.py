@@ -0,0 +1,75 @@
+import asyncio
+import os
+from tempfile import SpooledTemporaryFile
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.services import upload_spool
+from app.services.extraction_pool import ExtractionPool
+from app.services.upload_spool import spool_upload
+
+
+def _pdf_bytes(text: str) -> bytes:
+    fitz = pytest.importorskip("fitz")
+    doc = fitz.open()
+    doc.new_page().insert_text((72, 72), text)
+    return doc.tobytes()
+
+
+def _upload(content: bytes, filename: str = "resume.pdf") -> UploadFile:
+    # What Starlette's form parser hands the route
+    file = SpooledTemporaryFile(max_size=1024 * 1024)
+    file.write(content)
+    file.seek(0)
+    return UploadFile(file=file, filename=filename, size=len(content))
+
+
+def _spool(upload: UploadFile, memory_bytes: int, monkeypatch, max_bytes=None):
+    monkeypatch.setattr(upload_spool.settings, "upload_spool_memory_bytes", memory_bytes)
+    return asyncio.run(spool_upload(upload, max_bytes))
+
+
+def test_small_upload_is_kept_in_memory(monkeypatch):
+    content = _pdf_bytes("Jane Doe")
+    spooled = _spool(_upload(content), len(content), monkeypatch)
+    assert spooled.fd is None
+    assert spooled.source == spooled.view == content
+
+
+def test_large_upload_reuses_the_parser_temp_file(monkeypatch):
+    content = _pdf_bytes("Jane Doe")
+    upload = _upload(content)
+    spooled = _spool(upload, 100, monkeypatch)
+    try:
+        assert isinstance(spooled.source, int)
+        # Rolled over in place: the form's file and the spool are the same inode
+        assert os.fstat(spooled.fd).st_ino == os.fstat(upload.file.fileno()).st_ino
+        assert spooled.view[:] == content
+        # Outlives the form closing its file
+        upload.file.close()
+        assert spooled.view[:] == content
+    finally:
+        spooled.close()
+    assert spooled.fd is None
+
+
+@pytest.mark.parametrize("pool_size", [0, 1])
+def test_large_upload_is_extracted_from_the_descriptor(monkeypatch, pool_size):
+    content = _pdf_bytes("Jane Doe Python Engineer")
+    spooled = _spool(_upload(content), 100, monkeypatch)
+    pool = ExtractionPool(size=pool_size, timeout=30.0, memory_limit_mb=0)
+    try:
+        text, attempts = asyncio.run(pool.run("pdf", spooled.source))
+        assert "Jane Doe Python Engineer" in text
+        # The worker closes its copy; ours stays usable
+        assert spooled.view[:] == content
+    finally:
+        pool.shutdown()
+        spooled.close()
+
+
+def test_upload_over_the_cap_is_rejected(monkeypatch):
+    with pytest.raises(HTTPException) as caught:
+        _spool(_upload(b"x" * 2048), 100, monkeypatch, max_bytes=1024)
+    assert caught.value.status_code == 413